@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scoring throughput of the ML_EXECUTION_BACKEND options
+(inline, thread, process) with concurrent request threads, as a threaded
+gunicorn worker would issue them.
+
+Usage:
+    python benchmarks/execution_backends.py [--documents 800] [--threads 8] [--workers N]
+
+Each backend runs in a fresh interpreter (the backend is read at import
+time); the prediction cache is disabled so every document is scored.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def run_backend(documents, threads):
+    """Child mode: score with the backend from the environment and print docs/s"""
+    from ml import model
+
+    model.warm_up()
+    texts = [p.read_text(encoding="utf-8") for p in sorted((BASE_DIR / "examples").glob("*.txt"))]
+    docs = [f"{texts[i % len(texts)]} document{i}" for i in range(documents)]
+    model.predict_batch(docs[:32])  # start the pool
+
+    with ThreadPoolExecutor(threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(model.predict_fake_news, docs))
+        concurrent = documents / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict_batch(docs)
+    batch = documents / (time.perf_counter() - start)
+    print(f"{concurrent:.1f} {batch:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=800)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_backend(args.documents, args.threads)
+        return
+
+    print(f"{args.documents} documents, {args.threads} request threads, {args.workers} workers")
+    for backend in ("inline", "thread", "process"):
+        env = {
+            **os.environ,
+            "ML_EXECUTION_BACKEND": backend,
+            "ML_EXECUTION_WORKERS": str(args.workers),
+            "PREDICTION_CACHE_BACKEND": "none",
+        }
+        command = [
+            sys.executable,
+            __file__,
+            "--child",
+            f"--documents={args.documents}",
+            f"--threads={args.threads}",
+        ]
+        output = subprocess.run(
+            command, env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        concurrent, batch = output[-2:]
+        print(f"  {backend:8s}: {concurrent:>8s} docs/s concurrent requests, {batch:>8s} docs/s batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: scoring latency of the sklearn `CalibratedClassifierCV`
+wrapper versus the collapsed linear engine in `ml/engine.py`.
+
+Usage:
+    python benchmarks/inference_latency.py [--repeat 500] [--batch 256]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from ml.engine import LinearEnsemble  # noqa: E402
+from ml.model import MODEL_PATH, VECTORIZER_PATH, preprocess_text  # noqa: E402
+
+
+def measure(func, matrix, repeat):
+    """Return the mean latency per call, in microseconds"""
+    func(matrix)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(matrix)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    engine = LinearEnsemble.from_calibrated(model)
+
+    documents = [
+        preprocess_text(p.read_text(encoding="utf-8"))
+        for p in sorted((BASE_DIR / "examples").glob("*.txt"))
+    ]
+    single = vectorizer.transform(documents[:1])
+    batch = vectorizer.transform((documents * args.batch)[: args.batch])
+
+    difference = np.abs(model.predict_proba(batch) - engine.predict_proba(batch)).max()
+    assert difference < 1e-12, f"engine diverges from sklearn: max |Δp| = {difference:.3g}"
+
+    for name, matrix in (("1 document", single), (f"batch of {args.batch}", batch)):
+        before = measure(model.predict_proba, matrix, args.repeat)
+        after = measure(engine.predict_proba, matrix, args.repeat)
+        n = matrix.shape[0]
+        print(f"{name}:")
+        print(f"  sklearn predict_proba : {before / n:10.2f} µs/doc")
+        print(f"  ml.engine             : {after / n:10.2f} µs/doc ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Load generator: many concurrent clients against the coalesced async API
+(`/api/predict`) and, for comparison, one-at-a-time scoring
+(`/api/predict/batch` with a single text per request).
+
+Start a local ASGI server first, e.g.:
+    uvicorn fakenews_detector.asgi:application --port 8000
+
+Usage:
+    python benchmarks/load_generator.py [--url http://127.0.0.1:8000]
+        [--clients 200] [--requests 2000] [--endpoint both|coalesced|single]
+
+Every request carries a distinct text so the prediction cache never answers.
+Only the standard library is used (asyncio streams, HTTP/1.1 keep-alive).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_texts():
+    """Example articles; a unique suffix is appended per request"""
+    return [p.read_text(encoding="utf-8") for p in sorted((BASE_DIR / "examples").glob("*.txt"))]
+
+
+async def post_json(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode("ascii")
+        + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def client(url, path, wrap, texts, counter, total, latencies, errors):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        while (n := next(counter)) < total:
+            text = f"{texts[n % len(texts)]} request{n}"
+            start = time.perf_counter()
+            status = await post_json(reader, writer, parts.netloc, path, wrap(text))
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url, path, wrap, clients, total):
+    texts = load_texts()
+    counter = itertools.count()
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client(url, path, wrap, texts, counter, total, latencies, errors) for _ in range(clients))
+    )
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def report(name, latencies, errors, elapsed):
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"{name}:")
+    print(f"  requests   : {len(latencies)} ({len(errors)} errors) in {elapsed:.2f}s")
+    print(f"  throughput : {len(latencies) / elapsed:8.1f} req/s")
+    print(
+        f"  latency    : p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms, "
+        f"p99 {quantiles[98] * 1000:.1f} ms"
+    )
+    return len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--endpoint", choices=("both", "coalesced", "single"), default="both"
+    )
+    args = parser.parse_args()
+
+    scenarios = {
+        "coalesced (/api/predict)": ("/api/predict", lambda text: {"text": text}),
+        "one at a time (/api/predict/batch)": ("/api/predict/batch", lambda text: {"texts": [text]}),
+    }
+    if args.endpoint == "coalesced":
+        scenarios.pop("one at a time (/api/predict/batch)")
+    elif args.endpoint == "single":
+        scenarios.pop("coalesced (/api/predict)")
+
+    throughput = {}
+    for name, (path, wrap) in scenarios.items():
+        latencies, errors, elapsed = asyncio.run(
+            run(args.url, path, wrap, args.clients, args.requests)
+        )
+        throughput[name] = report(name, latencies, errors, elapsed)
+
+    if len(throughput) == 2:
+        coalesced, single = throughput.values()
+        print(f"coalescing speed-up: {coalesced / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
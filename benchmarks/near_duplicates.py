@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: near-duplicate answers (MinHash/LSH index) against full scoring.
+
+Usage:
+    python benchmarks/near_duplicates.py [--copies 200] [--edit-rate 0.01]
+
+Scores the example articles once, then submits lightly edited copies of them
+(new headline, a fraction of the words replaced) with the index disabled and
+enabled. Reports the latency of both paths, the time spent in the index
+itself (signature + lookup), the share of copies recognized, and the false
+matches among distinct synthetic documents filling the index.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+os.environ["PREDICTION_CACHE_BACKEND"] = "none"
+os.environ["ML_EXECUTION_BACKEND"] = "inline"
+
+import ml.model as ml_model  # noqa: E402
+from ml.near_duplicates import NearDuplicateIndex  # noqa: E402
+
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {q: float(np.percentile(ms, q)) for q in (50, 95, 99)}
+
+
+def edited_copy(text, rate, rng):
+    words = text.split()
+    for _ in range(max(1, int(len(words) * rate))):
+        words[rng.randrange(len(words))] = rng.choice(["exclusive", "update", "watch"])
+    return "UPDATE: " + " ".join(words[rng.randrange(1, 6):])
+
+
+def timed(func, inputs):
+    timings, results = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        results.append(func(item))
+        timings.append(time.perf_counter() - start)
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--edit-rate", type=float, default=0.01)
+    parser.add_argument("--distinct", type=int, default=5000)
+    args = parser.parse_args()
+
+    ml_model.ensure_models_loaded()
+    rng = random.Random(42)
+    articles = [
+        p.read_text(encoding="utf-8") for p in sorted((BASE_DIR / "examples").glob("*.txt"))
+    ]
+    copies = [edited_copy(articles[i % len(articles)], args.edit_rate, rng) for i in range(args.copies)]
+
+    ml_model.NEAR_DUPLICATES = False
+    scoring, _ = timed(ml_model.predict_fake_news, copies)
+
+    index = NearDuplicateIndex(threshold=ml_model.NEAR_DUPLICATE_THRESHOLD)
+    ml_model.NEAR_DUPLICATES = True
+    ml_model._near_duplicates, ml_model._near_duplicates_pid = index, os.getpid()
+    # Index rempli de documents distincts, puis des originaux
+    vocabulary = [f"word{i}" for i in range(5000)]
+    fingerprint = ml_model._active.fingerprint
+    for i in range(args.distinct):
+        tokens = rng.sample(vocabulary, 150)
+        index.add(index.signature(tokens), fingerprint, {"label": "Real", "probability": 0.5, "model_version": "synthetic"})
+    false_matches = sum(
+        index.lookup(index.signature(rng.sample(vocabulary, 150)), fingerprint) is not None
+        for _ in range(500)
+    )
+    for article in articles:
+        ml_model.predict_fake_news(article)
+
+    answered, results = timed(ml_model.predict_fake_news, copies)
+    processed = [ml_model.preprocess_text(text).split() for text in copies]
+    lookups, _ = timed(lambda tokens: index.lookup(index.signature(tokens), fingerprint), processed)
+    hits = sum("near_duplicate" in result for result in results)
+
+    print(f"{args.copies} edited copies ({args.edit_rate:.0%} of words replaced), "
+          f"index of {len(index)} entries")
+    for name, timings in (("full scoring", scoring), ("with index", answered), ("index only", lookups)):
+        p = percentiles(timings)
+        print(f"  {name:13s} p50 {p[50]:7.3f} ms  p95 {p[95]:7.3f} ms  p99 {p[99]:7.3f} ms")
+    print(f"  recognized copies: {hits}/{args.copies}; false matches: {false_matches}/500")
+    ml_model._near_duplicates = None
+
+
+if __name__ == "__main__":
+    main()
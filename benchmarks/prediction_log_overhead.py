@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request cost of the prediction log, buffered vs synchronous.
+
+Usage:
+    python benchmarks/prediction_log_overhead.py [--requests 2000]
+
+Scores the example articles, then times what logging adds to each request:
+`log_predictions` (records buffered in memory, written by a background
+thread with `bulk_create`) against one `PredictionLog.objects.create` per
+request, both on a temporary SQLite database. Overheads are reported as
+latency percentiles and relative to the median scoring latency; the buffered
+records are then flushed and counted to check none was lost.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fakenews_detector.settings")
+os.environ["PREDICTION_CACHE_BACKEND"] = "none"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+
+
+def percentiles(seconds):
+    us = np.asarray(seconds) * 1e6
+    return {q: float(np.percentile(us, q)) for q in (50, 95, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    settings.DATABASES["default"]["NAME"] = str(Path(tmp.name) / "bench.sqlite3")
+    settings.PREDICTION_LOG = True
+    call_command("migrate", verbosity=0)
+
+    from detector.models import PredictionLog
+    from detector.prediction_log import get_writer, log_predictions
+    from ml.model import predict_fake_news
+
+    articles = [
+        p.read_text(encoding="utf-8") for p in sorted((BASE_DIR / "examples").glob("*.txt"))
+    ]
+    texts = [f"{articles[i % len(articles)]} {i}" for i in range(args.requests)]
+
+    scoring, results = [], []
+    for text in texts:
+        start = time.perf_counter()
+        results.append(predict_fake_news(text))
+        scoring.append(time.perf_counter() - start)
+    scoring_p50 = percentiles(scoring)[50]
+
+    buffered = []
+    for text, result in zip(texts, results):
+        start = time.perf_counter()
+        log_predictions([text], [result], "api")
+        buffered.append(time.perf_counter() - start)
+
+    # Même contenu, écrit pendant la requête
+    writer = get_writer()
+    writer.flush()
+    records = [{**record, "source": "web"} for record in _records(texts, results)]
+    synchronous = []
+    for record in records:
+        start = time.perf_counter()
+        PredictionLog.objects.create(**record)
+        synchronous.append(time.perf_counter() - start)
+
+    print(f"{args.requests} requests, median scoring latency {scoring_p50 / 1000:.2f} ms")
+    for name, timings in (("buffered", buffered), ("synchronous", synchronous)):
+        p = percentiles(timings)
+        print(
+            f"  {name:12s} p50 {p[50]:8.1f} µs  p95 {p[95]:8.1f} µs  p99 {p[99]:8.1f} µs  "
+            f"({p[50] / scoring_p50:.2%} of scoring)"
+        )
+
+    stats = writer.stats()
+    logged = PredictionLog.objects.filter(source="api").count()
+    print(
+        f"  background writer: {stats['flushes']} bulk_create calls, "
+        f"{logged}/{args.requests} records written, {stats['dropped']} dropped"
+    )
+    writer.close()
+
+
+def _records(texts, results):
+    """The PredictionLog fields log_predictions would queue"""
+    from detector import prediction_log
+
+    captured = []
+
+    class Capture:
+        def add(self, records):
+            captured.extend(records)
+
+    original = prediction_log.get_writer
+    prediction_log.get_writer = Capture
+    try:
+        for text, result in zip(texts, results):
+            prediction_log.log_predictions([text], [result], "web")
+    finally:
+        prediction_log.get_writer = original
+    return captured
+
+
+if __name__ == "__main__":
+    main()
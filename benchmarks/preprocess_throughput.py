@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: preprocessing throughput (MB/s) of the legacy four-`re.sub`
+pipeline versus the shared normalizer in `ml/normalizer.py`.
+
+Usage:
+    python benchmarks/preprocess_throughput.py [--repeat 20] [--no-lemmatize]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from ml.normalizer import make_lemma_cache, normalize_text  # noqa: E402
+from ml.resources import load_lemmatizer, load_stop_words  # noqa: E402
+
+
+def legacy_clean_text(text, stop_words, lemmatize):
+    """Pre-normalizer implementation, kept verbatim as the 'before' reference"""
+    text = re.sub(r"<.*?>", " ", text)
+    text = re.sub(r"http\S+|www\S+", " ", text)
+    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    words = [w for w in text.split() if w not in stop_words]
+    words = [lemmatize(w) for w in words]
+    return " ".join(words)
+
+
+def load_corpus():
+    """Example articles plus a synthetic long HTML page with links"""
+    examples = [
+        (BASE_DIR / "examples" / name).read_text(encoding="utf-8")
+        for name in ("fake_news.txt", "real_news.txt")
+    ]
+    page = "".join(
+        f"<p class='body'>{paragraph} See https://example.com/story/{i} "
+        f"or www.example.org/{i}.</p>\n"
+        for i, paragraph in enumerate(examples * 50)
+    )
+    return examples + [page]
+
+
+def load_resources(lemmatize_enabled):
+    """Return (stop_words, lemmatize), with WordNet as the reference lemmatizer"""
+    stop_words = load_stop_words()
+
+    lemmatize = None
+    if lemmatize_enabled:
+        from nltk.stem import WordNetLemmatizer
+
+        lemmatize = WordNetLemmatizer().lemmatize
+    return stop_words, lemmatize
+
+
+def measure(func, corpus, repeat):
+    """Return throughput in MB/s of `func` over `corpus`"""
+    size_mb = sum(len(doc.encode("utf-8")) for doc in corpus) / 1e6
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for doc in corpus:
+            func(doc)
+    elapsed = time.perf_counter() - start
+    return size_mb * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-lemmatize", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    stop_words, lemmatize = load_resources(not args.no_lemmatize)
+    legacy_lemmatize = lemmatize or (lambda w: w)
+
+    for doc in corpus:
+        assert legacy_clean_text(doc, stop_words, legacy_lemmatize) == normalize_text(
+            doc, stop_words, lemmatize
+        ), "normalizer output diverges from the legacy pipeline"
+
+    before = measure(
+        lambda d: legacy_clean_text(d, stop_words, legacy_lemmatize), corpus, args.repeat
+    )
+    after = measure(lambda d: normalize_text(d, stop_words, lemmatize), corpus, args.repeat)
+
+    print(f"legacy re.sub pipeline : {before:8.2f} MB/s")
+    print(f"ml.normalizer          : {after:8.2f} MB/s ({after / before:.2f}x)")
+
+    if lemmatize is not None:
+        cached = make_lemma_cache(lemmatize)
+        with_cache = measure(
+            lambda d: normalize_text(d, stop_words, cached), corpus, args.repeat
+        )
+        print(f"  + lemma LRU cache     : {with_cache:8.2f} MB/s ({with_cache / before:.2f}x)")
+
+        table = make_lemma_cache(load_lemmatizer())
+        with_table = measure(
+            lambda d: normalize_text(d, stop_words, table), corpus, args.repeat
+        )
+        print(f"  + bundled lemma table : {with_table:8.2f} MB/s ({with_table / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: per-stage latency percentiles, throughput and peak memory of
+the scoring pipeline, with an optional comparison against a stored baseline.
+
+Usage:
+    python benchmarks/suite.py                              # print the report
+    python benchmarks/suite.py --output results.json        # save the results
+    python benchmarks/suite.py --save-baseline              # refresh benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --threshold 0.25
+
+Stages (each timed per document, on the same corpus):
+    preprocess    ml.model.preprocess_text
+    vectorize     vectorizer.transform on one preprocessed document
+    inference     model.predict_proba on one vectorized row
+    explain       top-k n-grams per class from the same row (ml/explain.py)
+    predict       predict_fake_news end to end (prediction cache disabled)
+    predict_explain  predict_fake_news(..., explain=True) end to end
+    batch         predict_batch over the whole corpus (throughput only)
+
+The corpus is `examples/fake_news.txt`, `examples/real_news.txt` and seeded
+synthetic documents of 200 to 100 000 characters built from their vocabulary
+(with HTML tags and URLs), so runs are reproducible offline. With
+`--baseline`, the exit status is 1 when a stage's p50 or p95 latency or its
+peak memory grows, or its throughput drops, by more than `--threshold`. The
+explanation overhead (explain p50 relative to predict p50) is printed after
+the stages.
+Baselines are machine-specific: refresh them on the machine that compares.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Mesurer le pipeline lui-même : pas de cache, scoring sur ce thread
+os.environ["PREDICTION_CACHE_BACKEND"] = "none"
+os.environ["ML_EXECUTION_BACKEND"] = "inline"
+
+import numpy as np  # noqa: E402
+import sklearn  # noqa: E402
+
+from ml import model as ml_model  # noqa: E402
+from ml.explain import explainer_for  # noqa: E402
+
+DEFAULT_BASELINE = BASE_DIR / "benchmarks" / "baseline.json"
+SYNTHETIC_LENGTHS = (200, 2_000, 20_000, 100_000)
+SEED = 42
+
+# Compared against the baseline; "higher" metrics regress when they drop
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "peak_alloc_mb")
+HIGHER_IS_BETTER = ("docs_per_s",)
+
+
+def build_corpus(seed=SEED):
+    """Example articles plus synthetic documents of increasing length"""
+    examples = [
+        (BASE_DIR / "examples" / name).read_text(encoding="utf-8")
+        for name in ("fake_news.txt", "real_news.txt")
+    ]
+    words = " ".join(examples).split()
+    rng = random.Random(seed)
+
+    documents = list(examples)
+    for length in SYNTHETIC_LENGTHS:
+        parts, size = [], 0
+        while size < length:
+            sentence = " ".join(rng.choices(words, k=rng.randint(8, 30))) + "."
+            if rng.random() < 0.1:
+                sentence = f"<p>{sentence}</p> https://example.com/{rng.randint(0, 999)}"
+            parts.append(sentence)
+            size += len(sentence) + 1
+        documents.append(" ".join(parts)[:length])
+    return documents
+
+
+def summarize(latencies, documents, elapsed):
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "docs_per_s": round(documents / elapsed, 2),
+    }
+
+
+def measure(func, inputs, repeat):
+    """Time `func(x)` for every input, `repeat` times; returns the stage metrics"""
+    for x in inputs:
+        func(x)
+
+    gc.collect()
+    tracemalloc.start()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for x in inputs:
+            t = time.perf_counter()
+            func(x)
+            latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = summarize(latencies, len(latencies), elapsed)
+    stats["peak_alloc_mb"] = round(peak / 2**20, 3)
+    return stats
+
+
+def measure_batch(documents, repeat):
+    """Throughput of one predict_batch call over the whole corpus"""
+    ml_model.predict_batch(documents)
+
+    gc.collect()
+    tracemalloc.start()
+    latencies = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        ml_model.predict_batch(documents)
+        latencies.append(time.perf_counter() - t)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = summarize(latencies, len(documents) * repeat, sum(latencies))
+    stats["peak_alloc_mb"] = round(peak / 2**20, 3)
+    return stats
+
+
+def stages(documents):
+    """(name, callable, inputs) for every per-document stage"""
+    processed = [ml_model.preprocess_text(doc) for doc in documents]
+    rows = [ml_model.vectorizer.transform([doc]) for doc in processed]
+    explainer = explainer_for(ml_model.model, ml_model.vectorizer)
+    return [
+        ("preprocess", ml_model.preprocess_text, documents),
+        ("vectorize", lambda doc: ml_model.vectorizer.transform([doc]), processed),
+        ("inference", ml_model.model.predict_proba, rows),
+        (
+            "explain",
+            lambda item: explainer.explain(item[0], 0, item[1], ml_model.EXPLANATION_TOP_K),
+            list(zip(rows, processed)),
+        ),
+        ("predict", ml_model.predict_fake_news, documents),
+        ("predict_explain", lambda doc: ml_model.predict_fake_news(doc, explain=True), documents),
+    ]
+
+
+def run(repeat=20, only=None):
+    if not ml_model.ensure_models_loaded():
+        raise SystemExit("Models could not be loaded")
+
+    documents = build_corpus()
+    results = {}
+    for name, func, inputs in stages(documents):
+        if only and name not in only:
+            continue
+        results[name] = measure(func, inputs, repeat)
+        print_stage(name, results[name])
+    if not only or "batch" in only:
+        results["batch"] = measure_batch(documents, max(1, repeat // 4))
+        print_stage("batch", results["batch"])
+    if "explain" in results and "predict" in results:
+        overhead = results["explain"]["p50_ms"] / results["predict"]["p50_ms"]
+        print(f"explanation overhead: {overhead:.1%} of the predict p50 latency")
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "model_format": ml_model.model_format,
+            "features": ml_model.feature_pipeline,
+            "documents": len(documents),
+            "corpus_chars": sum(len(doc) for doc in documents),
+            "repeat": repeat,
+        },
+        "stages": results,
+        # ru_maxrss is in KiB on Linux
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def print_stage(name, stats):
+    print(
+        f"{name:15s} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+        f"p99 {stats['p99_ms']:9.3f} ms  {stats['docs_per_s']:10.1f} docs/s  "
+        f"peak {stats['peak_alloc_mb']:7.2f} MB"
+    )
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regression messages (empty when within `threshold`)"""
+    regressions = []
+    for name, base in baseline.get("stages", {}).items():
+        stats = current["stages"].get(name)
+        if stats is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if metric in base and base[metric] > 0:
+                ratio = stats[metric] / base[metric]
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        f"{name}.{metric}: {stats[metric]} vs {base[metric]} (+{ratio - 1:.0%})"
+                    )
+        for metric in HIGHER_IS_BETTER:
+            if metric in base and stats[metric] > 0:
+                ratio = base[metric] / stats[metric]
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        f"{name}.{metric}: {stats[metric]} vs {base[metric]} "
+                        f"(-{1 - 1 / ratio:.0%})"
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the corpus per stage")
+    parser.add_argument("--stage", action="append", help="run only these stages")
+    parser.add_argument("--output", type=Path, help="write the results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against this results JSON")
+    parser.add_argument(
+        "--save-baseline",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        type=Path,
+        help=f"write the results as the new baseline (default {DEFAULT_BASELINE.name})",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(repeat=args.repeat, only=args.stage)
+    print(f"max RSS {results['max_rss_mb']} MB")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"✓ No stage regressed beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PredictionLog
+
+
+@admin.register(PredictionLog)
+class PredictionLogAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "source", "label", "probability", "model_version", "input_chars")
+    list_filter = ("source", "label", "model_version", "truncated")
+    search_fields = ("text_hash", "text_preview")
+    date_hierarchy = "created_at"
+    readonly_fields = [field.name for field in PredictionLog._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DetectorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "detector"
+
+    def ready(self):
+        """Optionally warm up the ML layer (see ML_WARMUP in settings)"""
+        from ml.model import start_registry_watcher, warm_up
+
+        mode = getattr(settings, "ML_WARMUP", "off")
+        if mode in ("eager", "background"):
+            warm_up(background=(mode == "background"))
+
+        # Rechargement à chaud quand la version active du registre change ;
+        # sous gunicorn_conf.py, seuls les workers surveillent (post_fork)
+        if getattr(settings, "ML_REGISTRY_WATCHER", "ready") == "ready":
+            start_registry_watcher()
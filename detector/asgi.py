@@ -0,0 +1,102 @@
+"""
+ASGI fast path for the coalesced prediction API.
+
+An async Django view still crosses every `MiddlewareMixin` middleware
+through `sync_to_async` (two thread hops each), which under hundreds of
+concurrent clients costs more than scoring the text. `POST /api/predict` is
+therefore answered here, directly on the event loop, and every other request
+goes to Django unchanged. Validation and scoring are shared with
+`detector.views.predict_api`.
+
+Because it bypasses `MIDDLEWARE`, this endpoint gets none of what the
+middleware adds: no Server-Timing header or sampled profile, no
+SecurityMiddleware headers (HSTS, SSL redirect), no session or
+authentication. The view is `csrf_exempt` anyway. The Host header is still
+checked against `ALLOWED_HOSTS`, as `HttpRequest.get_host` does; anything
+else this endpoint must enforce has to be added here as well.
+"""
+
+import json
+
+from django.conf import settings
+from django.http.request import split_domain_port, validate_host
+from django.urls import reverse
+
+from detector.views import parse_predict_payload, predict_coalesced
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"x-content-type-options", b"nosniff"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def host_allowed(scope):
+    """Whether the request Host matches `ALLOWED_HOSTS` (see `HttpRequest.get_host`)"""
+    headers = dict(scope.get("headers") or [])
+    host = headers.get(b"host", b"").decode("latin-1")
+    if settings.USE_X_FORWARDED_HOST and b"x-forwarded-host" in headers:
+        host = headers[b"x-forwarded-host"].decode("latin-1")
+    if not host:
+        server_name, server_port = scope.get("server") or ("unknown", "80")
+        host = f"{server_name}:{server_port}"
+
+    allowed_hosts = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed_hosts:
+        allowed_hosts = [".localhost", "127.0.0.1", "[::1]"]
+    domain, _ = split_domain_port(host)
+    return bool(domain) and validate_host(domain, allowed_hosts)
+
+
+async def predict_endpoint(scope, receive, send):
+    """Read the JSON body, then score it through the micro-batcher"""
+    if not host_allowed(scope):
+        await _send_json(send, 400, {"error": "Hôte non autorisé"})
+        return
+
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        if size > settings.DATA_UPLOAD_MAX_MEMORY_SIZE:
+            await _send_json(send, 413, {"error": "Corps de requête trop volumineux"})
+            return
+        more_body = message.get("more_body", False)
+
+    text, explain, error = parse_predict_payload(b"".join(chunks))
+    if error:
+        await _send_json(send, 400, {"error": error})
+        return
+    await _send_json(send, 200, await predict_coalesced(text, explain))
+
+
+def with_prediction_endpoint(django_application):
+    """Wrap the Django ASGI application so POST /api/predict skips the middleware chain"""
+    predict_path = reverse("detector:predict")
+
+    async def application(scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] == predict_path
+        ):
+            await predict_endpoint(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
+
+    return application
@@ -0,0 +1,69 @@
+"""
+Manage the versioned model registry (`ml/registry.py`).
+
+    python manage.py publish_model                       # publish ml/models/ and activate it
+    python manage.py publish_model --source /tmp/run42 --name v42 --no-activate
+    python manage.py publish_model --activate 20261018-140512   # roll back / forward
+    python manage.py publish_model --list
+
+Workers running with ML_REGISTRY_POLL pick up the new active version on their
+own; otherwise POST /api/model/reload triggers the swap.
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml import registry
+
+
+class Command(BaseCommand):
+    help = "Publish trained artifacts to the model registry, switch or list versions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            default=str(registry.BASE_DIR / "ml" / "models"),
+            help="directory holding the trained artifacts (default: ml/models)",
+        )
+        parser.add_argument("--name", help="version name (default: a timestamp)")
+        parser.add_argument("--notes", default="", help="free text stored in the manifest")
+        parser.add_argument(
+            "--no-activate",
+            action="store_true",
+            help="publish without making the version active",
+        )
+        parser.add_argument("--activate", metavar="VERSION", help="activate an existing version")
+        parser.add_argument("--list", action="store_true", help="list the published versions")
+        parser.add_argument("--registry", help="registry directory (default: ML_MODEL_REGISTRY)")
+
+    def handle(self, *args, **options):
+        root = options["registry"]
+        try:
+            if options["list"]:
+                self._list(root)
+            elif options["activate"]:
+                registry.activate(options["activate"], root=root)
+                self.stdout.write(self.style.SUCCESS(f"Version {options['activate']} active"))
+            else:
+                version = registry.publish(
+                    Path(options["source"]),
+                    version=options["name"],
+                    root=root,
+                    activate=not options["no_activate"],
+                    notes=options["notes"],
+                )
+                state = "active" if registry.active_version(root) == version else "published"
+                self.stdout.write(self.style.SUCCESS(f"Version {version} {state}"))
+        except registry.RegistryError as e:
+            raise CommandError(str(e))
+
+    def _list(self, root):
+        manifest = registry.read_manifest(root)
+        if not manifest:
+            self.stdout.write("No published version (models are loaded from ml/models)")
+            return
+        for version, info in sorted(manifest["versions"].items()):
+            marker = "*" if version == manifest["active"] else " "
+            notes = f"  {info['notes']}" if info.get("notes") else ""
+            self.stdout.write(f"{marker} {version}  {info['created']}{notes}")
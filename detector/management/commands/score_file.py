@@ -0,0 +1,222 @@
+"""
+Score a JSONL or CSV file of articles offline, without going through HTTP.
+
+    python manage.py score_file archive.jsonl --output scores.jsonl
+    python manage.py score_file archive.csv --text-field title --text-field text \\
+        --id-field id --output scores.csv --jobs 8 --batch-size 512
+
+Input is read as a stream and scored in batches (`predict_batch`) on a pool
+of worker processes that each load the artifacts once. At most a few batches
+per worker are in flight, and results are written in input order as soon as
+they are ready, so memory stays constant whatever the size of the file.
+Throughput (docs/sec) is reported on stderr while it runs.
+"""
+
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Articles can be far longer than the csv module's default 128 KB field limit
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+OUTPUT_FIELDS = ["id", "label", "probability", "truncated", "error"]
+
+
+def _detect_format(path, requested):
+    if requested != "auto":
+        return requested
+    return "csv" if str(path).lower().endswith(".csv") else "jsonl"
+
+
+def read_records(stream, input_format):
+    """Yield one dict per input record (JSONL lines or CSV rows)"""
+    if input_format == "csv":
+        yield from csv.DictReader(stream)
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = {"_error": f"line {number}: invalid JSON"}
+        yield record if isinstance(record, dict) else {"_error": f"line {number}: not an object"}
+
+
+def _load_models_quietly():
+    """Load the artifacts with their status messages sent to stderr, not to the results"""
+    from ml.model import ensure_models_loaded
+
+    with redirect_stdout(sys.stderr):
+        ensure_models_loaded()
+
+
+def _init_worker():
+    sys.stdout = sys.stderr
+    _load_models_quietly()
+
+
+def score_texts(texts):
+    """Worker: score one batch, keeping only the fields written to the output"""
+    from ml.model import predict_batch
+
+    return [
+        {
+            "label": result["label"],
+            "probability": result["probability"],
+            "truncated": result.get("analyzed", {}).get("truncated", False),
+            "error": result.get("error", ""),
+        }
+        for result in predict_batch(texts)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Score a JSONL or CSV file of articles in batches, streaming the results"
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="JSONL or CSV file ('-' for stdin)")
+        parser.add_argument("--output", default="-", help="output file ('-' for stdout)")
+        parser.add_argument("--input-format", choices=("auto", "jsonl", "csv"), default="auto")
+        parser.add_argument("--output-format", choices=("auto", "jsonl", "csv"), default="auto")
+        parser.add_argument(
+            "--text-field",
+            action="append",
+            dest="text_fields",
+            help="field(s) holding the text, joined with a space (default: text)",
+        )
+        parser.add_argument(
+            "--id-field", help="field copied to the output 'id' (default: record number)"
+        )
+        parser.add_argument("--batch-size", type=int, default=256)
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=0,
+            help="scoring processes (0 = all CPU cores, 1 = in this process)",
+        )
+        parser.add_argument(
+            "--progress-every",
+            type=float,
+            default=10.0,
+            help="seconds between progress reports on stderr",
+        )
+
+    def handle(self, *args, **options):
+        input_path = options["input"]
+        output_path = options["output"]
+        input_format = _detect_format(input_path, options["input_format"])
+        output_format = _detect_format(output_path, options["output_format"])
+        text_fields = options["text_fields"] or ["text"]
+        id_field = options["id_field"]
+        batch_size = options["batch_size"]
+        jobs = options["jobs"] or os.cpu_count() or 1
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        try:
+            source = (
+                sys.stdin
+                if input_path == "-"
+                else open(input_path, encoding="utf-8", newline="")
+            )
+            sink = (
+                self.stdout
+                if output_path == "-"
+                else open(output_path, "w", encoding="utf-8", newline="")
+            )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        try:
+            writer = self._writer(sink, output_format)
+            records = read_records(source, input_format)
+            batches = self._batches(records, text_fields, id_field, batch_size)
+            self._run(batches, writer, sink, jobs, options["progress_every"])
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if output_path != "-":
+                sink.close()
+
+    @staticmethod
+    def _batches(records, text_fields, id_field, batch_size):
+        """Yield (ids, texts, errors) per batch of input records"""
+        numbered = enumerate(records, start=1)
+        while chunk := list(itertools.islice(numbered, batch_size)):
+            ids, texts, errors = [], [], []
+            for number, record in chunk:
+                ids.append(record.get(id_field, number) if id_field else number)
+                values = [record.get(field) for field in text_fields]
+                texts.append(" ".join(v for v in values if isinstance(v, str)))
+                errors.append(
+                    record.get("_error")
+                    or ("" if any(isinstance(v, str) for v in values) else "missing text field")
+                )
+            yield ids, texts, errors
+
+    @staticmethod
+    def _writer(sink, output_format):
+        if output_format == "csv":
+            writer = csv.DictWriter(sink, fieldnames=OUTPUT_FIELDS)
+            writer.writeheader()
+            return writer.writerow
+        return lambda row: sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def _run(self, batches, write, sink, jobs, progress_every):
+        start = last_report = time.perf_counter()
+        scored = last_scored = 0
+
+        def emit(ids, errors, results):
+            nonlocal scored, last_report, last_scored
+            for record_id, error, result in zip(ids, errors, results):
+                row = {"id": record_id, **result}
+                if error:
+                    row.update(label="Erreur", probability=0.0, error=error)
+                write(row)
+            sink.flush()
+            scored += len(ids)
+
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                recent = (scored - last_scored) / (now - last_report)
+                self.stderr.write(
+                    f"{scored} documents scored, {recent:.1f} docs/sec "
+                    f"(average {scored / (now - start):.1f})"
+                )
+                last_report, last_scored = now, scored
+
+        if jobs == 1:
+            _load_models_quietly()
+            for ids, texts, errors in batches:
+                emit(ids, errors, score_texts(texts))
+        else:
+            # A bounded window of in-flight batches keeps memory constant and
+            # lets results be written in input order
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+                for ids, texts, errors in batches:
+                    pending.append((ids, errors, pool.submit(score_texts, texts)))
+                    if len(pending) >= 2 * jobs:
+                        ids, errors, future = pending.popleft()
+                        emit(ids, errors, future.result())
+                while pending:
+                    ids, errors, future = pending.popleft()
+                    emit(ids, errors, future.result())
+
+        elapsed = time.perf_counter() - start
+        rate = scored / elapsed if elapsed else 0.0
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Scored {scored} documents in {elapsed:.1f}s ({rate:.1f} docs/sec, jobs={jobs})"
+            )
+        )
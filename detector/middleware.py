@@ -0,0 +1,139 @@
+"""
+Per-request latency diagnostics.
+
+`ServerTimingMiddleware` adds a `Server-Timing` header to every response with
+the time spent in each scoring stage (preprocess, near-duplicate lookup,
+vectorize, inference, explanation), in template rendering and in total, so a
+slow request can be broken down from the browser's network panel or
+`curl -D -`.
+
+`SamplingProfilerMiddleware` runs cProfile on a random fraction of requests
+(`PROFILE_SAMPLE_RATE`, off by default) and writes each profile to
+`PROFILE_DIR` as a `.prof` file (`python -m pstats file.prof`, snakeviz...).
+Only one request is profiled at a time, so the overhead stays bounded
+whatever the traffic.
+
+Configuration (environment variables, read in settings):
+    SERVER_TIMING         1 (default) adds the header, 0 disables it
+    PROFILE_SAMPLE_RATE   fraction of requests profiled, e.g. 0.01 (default 0)
+    PROFILE_DIR           where the profiles are written (default: profiles/)
+"""
+
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from ml.metrics import collect_timings
+
+# Ordre d'affichage des étapes dans l'en-tête
+STAGES = ("preprocess", "near_duplicate", "vectorize", "inference", "explain", "template")
+
+
+def server_timing_header(timings, total):
+    """`Server-Timing` value for {stage: seconds} and the total duration"""
+    metrics = [
+        f"{stage};dur={timings[stage] * 1000:.2f}" for stage in STAGES if stage in timings
+    ]
+    metrics.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """Report the per-stage durations of the request in a `Server-Timing` header"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.SERVER_TIMING
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            response = self.get_response(request)
+        response["Server-Timing"] = server_timing_header(timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            response = await self.get_response(request)
+        response["Server-Timing"] = server_timing_header(timings, time.perf_counter() - start)
+        return response
+
+
+class SamplingProfilerMiddleware:
+    """Profile a random fraction of the requests with cProfile.
+
+    Async requests are passed through: a profile of a coroutine would mix the
+    other requests served by the event loop meanwhile.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    # cProfile ne supporte qu'un profileur actif à la fois
+    _lock = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.directory = Path(settings.PROFILE_DIR)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.get_response(request)
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+        if not self._lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            self._dump(profiler, request, time.perf_counter() - start)
+        finally:
+            self._lock.release()
+        return response
+
+    def _dump(self, profiler, request, elapsed):
+        """Write the profile as <timestamp>-<ms>ms-<method>-<path>-<pid>.prof"""
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+        now = time.time()
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}-"
+            f"{elapsed * 1000:.0f}ms-"
+            f"{request.method}-{slug[:60]}-{os.getpid()}.prof"
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(self.directory / name)
+        except OSError as e:
+            print(f"Warning: could not write profile {name}: {e}")
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('source', models.CharField(choices=[('web', 'Web form'), ('api', 'JSON API'), ('batch', 'Batch API')], max_length=8)),
+                ('label', models.CharField(max_length=16)),
+                ('probability', models.FloatField()),
+                ('model_version', models.CharField(blank=True, max_length=64)),
+                ('text_hash', models.CharField(db_index=True, max_length=32)),
+                ('text_preview', models.CharField(blank=True, max_length=280)),
+                ('input_chars', models.PositiveIntegerField()),
+                ('truncated', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['model_version', 'created_at'], name='detector_pr_model_v_201f1c_idx')],
+            },
+        ),
+    ]
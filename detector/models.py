@@ -1,3 +1,33 @@
 from django.db import models
 
-# Create your models here.
+
+class PredictionLog(models.Model):
+    """One scored article, kept for auditing and drift analysis.
+
+    Rows are written in batches by `detector.prediction_log`, never during
+    the request. The text itself is not stored: a hash identifies repeated
+    submissions and a short preview helps reading the log.
+    """
+
+    SOURCE_CHOICES = [
+        ("web", "Web form"),
+        ("api", "JSON API"),
+        ("batch", "Batch API"),
+    ]
+
+    created_at = models.DateTimeField(db_index=True)
+    source = models.CharField(max_length=8, choices=SOURCE_CHOICES)
+    label = models.CharField(max_length=16)
+    probability = models.FloatField()
+    model_version = models.CharField(max_length=64, blank=True)
+    text_hash = models.CharField(max_length=32, db_index=True)
+    text_preview = models.CharField(max_length=280, blank=True)
+    input_chars = models.PositiveIntegerField()
+    truncated = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["model_version", "created_at"])]
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M:%S} {self.label} ({self.probability:.2f})"
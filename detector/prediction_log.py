@@ -0,0 +1,177 @@
+"""
+Buffered, asynchronous writer for `PredictionLog`.
+
+Views call `log_predictions(...)`, which only builds small dicts and appends
+them to an in-memory buffer: no database round trip happens on the request.
+A daemon thread turns the buffer into `PredictionLog` rows with one
+`bulk_create` whenever `PREDICTION_LOG_BATCH_SIZE` records are waiting or
+`PREDICTION_LOG_FLUSH_SECONDS` have passed, and once more at exit.
+
+The buffer is bounded (`PREDICTION_LOG_MAX_PENDING`): if the database falls
+behind, new records are dropped and counted rather than growing memory or
+slowing requests down. The writer is recreated after a fork, so each
+gunicorn worker has its own.
+
+Settings (environment variables of the same name):
+    PREDICTION_LOG                 1 (default) logs predictions, 0 disables it
+    PREDICTION_LOG_BATCH_SIZE      records per bulk_create (500)
+    PREDICTION_LOG_FLUSH_SECONDS   maximum delay before a flush (2)
+    PREDICTION_LOG_MAX_PENDING     records buffered at most (20000)
+"""
+
+import atexit
+import hashlib
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+PREVIEW_CHARS = 280
+
+
+class PredictionLogWriter:
+    """Collect prediction records in memory and write them in batches"""
+
+    def __init__(self, batch_size=500, flush_interval=2.0, max_pending=20000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.errors = 0
+        self.last_error = None
+        self._thread = threading.Thread(
+            target=self._run, name="prediction-log", daemon=True
+        )
+        self._thread.start()
+
+    def add(self, records):
+        """Queue `records` (dicts of PredictionLog fields); never blocks"""
+        if len(self._buffer) + len(records) > self.max_pending:
+            # Unlocked increments: a lost update only skews the statistics
+            self.dropped += len(records)
+            return
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every buffered record now (called by the writer thread and at exit)"""
+        from detector.models import PredictionLog
+
+        with self._flush_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                try:
+                    PredictionLog.objects.bulk_create(
+                        [PredictionLog(**record) for record in batch]
+                    )
+                except Exception as e:
+                    self.errors += 1
+                    self.dropped += len(batch)
+                    if str(e) != self.last_error:
+                        print(f"⚠️  Prediction log: {len(batch)} records lost: {e}")
+                    self.last_error = str(e)
+                    connection.close()
+                    return
+                self.written += len(batch)
+                self.flushes += 1
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def stats(self):
+        return {
+            "pending": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Writer of this process (created on first use, recreated after a fork)"""
+    global _writer, _writer_pid
+
+    if _writer is not None and _writer_pid == os.getpid():
+        return _writer
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = PredictionLogWriter(
+                batch_size=settings.PREDICTION_LOG_BATCH_SIZE,
+                flush_interval=settings.PREDICTION_LOG_FLUSH_SECONDS,
+                max_pending=settings.PREDICTION_LOG_MAX_PENDING,
+            )
+            _writer_pid = os.getpid()
+    return _writer
+
+
+def flush_prediction_log():
+    """Write the pending records of this process"""
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.close()
+
+
+atexit.register(flush_prediction_log)
+
+
+def prediction_log_info():
+    if not settings.PREDICTION_LOG:
+        return {"enabled": False}
+    if _writer is None or _writer_pid != os.getpid():
+        return {"enabled": True, "pending": 0, "written": 0, "dropped": 0}
+    return {"enabled": True, **_writer.stats()}
+
+
+def log_predictions(texts, results, source):
+    """Queue one PredictionLog record per (text, result); errors are not logged"""
+    if not settings.PREDICTION_LOG:
+        return
+
+    now = timezone.now()
+    records = []
+    for text, result in zip(texts, results):
+        if "error" in result or not isinstance(text, str):
+            continue
+        analyzed = result.get("analyzed", {})
+        records.append(
+            {
+                "created_at": now,
+                "source": source,
+                "label": result["label"],
+                "probability": result["probability"],
+                "model_version": result.get("model_version") or "",
+                "text_hash": hashlib.blake2b(
+                    text.encode("utf-8", "surrogatepass"), digest_size=16
+                ).hexdigest(),
+                "text_preview": text[:PREVIEW_CHARS],
+                "input_chars": analyzed.get("original_chars", len(text)),
+                "truncated": analyzed.get("truncated", False),
+            }
+        )
+    if records:
+        get_writer().add(records)
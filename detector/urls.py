@@ -8,4 +8,8 @@ urlpatterns = [
     path("analyze/", views.analyze, name="analyze"),
     path("about/", views.about, name="about"),
     path("health/", views.health, name="health"),
+    path("metrics", views.metrics, name="metrics"),
+    path("api/model/reload", views.reload_model, name="reload_model"),
+    path("api/predict", views.predict_api, name="predict"),
+    path("api/predict/batch", views.predict_batch_api, name="predict_batch"),
 ]
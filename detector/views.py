@@ -1,8 +1,19 @@
+import hmac
+import json
+import time
+
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
-from ml.model import predict_fake_news
+from ml import metrics as ml_metrics
+from ml.metrics import add_timing
+from ml.batcher import MicroBatcher, batcher_for_running_loop, batcher_stats
+from ml.model import predict_fake_news, predict_batch
+
+from .prediction_log import log_predictions, prediction_log_info
 
 
 def home(request):
@@ -21,8 +32,9 @@ def home(request):
                 "error": "Veuillez entrer du texte à analyser",
             }
         else:
-            # Effectuer la prédiction
-            prediction = predict_fake_news(news_text)
+            # Effectuer la prédiction (avec les n-grammes déterminants)
+            prediction = predict_fake_news(news_text, explain=True)
+            log_predictions([news_text], [prediction], "web")
 
         # Ajouter des informations supplémentaires pour l'affichage
         if prediction and prediction.get("label") != "Erreur":
@@ -32,10 +44,13 @@ def home(request):
 
         submitted_text = news_text
 
-    return render(request, "detector/home.html", {
+    start = time.perf_counter()
+    response = render(request, "detector/home.html", {
         "prediction": prediction,
         "submitted_text": submitted_text
     })
+    add_timing("template", time.perf_counter() - start)
+    return response
 
 
 def analyze(request):
@@ -60,12 +75,238 @@ def about(request):
 
 
 def health(request):
-    """Health endpoint to check models status"""
-    from ml.model import model, vectorizer
+    """Health endpoint to check models status (does not trigger loading)"""
+    from ml.model import (
+        model,
+        vectorizer,
+        model_format,
+        feature_pipeline,
+        candidate_info,
+        execution_backend_info,
+        lemma_cache_info,
+        model_version_info,
+        near_duplicate_info,
+        prediction_cache_info,
+        text_resources_info,
+    )
 
     model_status = "loaded" if model is not None else "not loaded"
     vectorizer_status = "loaded" if vectorizer is not None else "not loaded"
 
     return JsonResponse(
-        {"status": "OK", "model": model_status, "vectorizer": vectorizer_status}
+        {
+            "status": "OK",
+            "model": model_status,
+            "vectorizer": vectorizer_status,
+            "model_format": model_format,
+            "features": feature_pipeline,
+            "model_version": model_version_info(),
+            "candidate": candidate_info(),
+            "execution": execution_backend_info(),
+            "lemma_cache": lemma_cache_info(),
+            "prediction_cache": prediction_cache_info(),
+            "near_duplicates": near_duplicate_info(),
+            "text_resources": text_resources_info(),
+            "coalescing": batcher_stats(),
+            "prediction_log": prediction_log_info(),
+        }
+    )
+
+
+def _may_reload(request):
+    """Staff users, or callers presenting MODEL_RELOAD_TOKEN as a bearer token"""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    token = settings.MODEL_RELOAD_TOKEN
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
+
+
+@csrf_exempt
+@require_POST
+def reload_model(request):
+    """Load the registry's active model version in this worker and swap it in.
+
+    Only reloads the process that answers; with several workers, set
+    ML_REGISTRY_POLL so each of them picks up a new version on its own.
+    """
+    if not _may_reload(request):
+        return JsonResponse({"error": "Accès refusé"}, status=403)
+
+    from ml.model import model_version_info, reload_models
+
+    force = request.GET.get("force") == "1"
+    reloaded = reload_models(force=force)
+    return JsonResponse({"reloaded": reloaded, "model_version": model_version_info()})
+
+
+def metrics(request):
+    """Prometheus metrics of this worker (404 when ML_METRICS=0)"""
+    if not ml_metrics.METRICS_ENABLED:
+        raise Http404("Metrics are disabled")
+
+    from ml.model import (
+        candidate_info,
+        lemma_cache_info,
+        model_version_info,
+        near_duplicate_info,
+        prediction_cache_info,
+    )
+
+    caches = {
+        "prediction": prediction_cache_info(),
+        "lemma": lemma_cache_info(),
+        "near_duplicate": near_duplicate_info(),
+    }
+    extra = [
+        (name, kind, documentation, [
+            ((("cache", cache),), stats[field]) for cache, stats in caches.items() if field in stats
+        ])
+        for field, name, kind, documentation in (
+            ("hits", "fakenews_cache_hits", "counter", "Lookups answered by the cache."),
+            ("misses", "fakenews_cache_misses", "counter", "Lookups that missed the cache."),
+            ("size", "fakenews_cache_entries", "gauge", "Entries held by the cache."),
+        )
+    ]
+
+    coalescing = batcher_stats()
+    for field in ("batches", "items"):
+        extra.append(
+            (
+                f"fakenews_coalesced_{field}",
+                "counter",
+                f"{field.capitalize()} scored by the /api/predict micro-batcher.",
+                [((), coalescing[field])],
+            )
+        )
+
+    candidate = candidate_info()
+    if candidate["version"] is not None:
+        versions = {"active": model_version_info()["active"], "candidate": candidate["version"]}
+        arms = [(("model", arm), ("version", version)) for arm, version in versions.items()]
+        extra.append(
+            (
+                "fakenews_experiment_requests",
+                "counter",
+                "Predictions scored by the active model and by the candidate.",
+                [(labels, candidate[labels[0][1]]["requests"]) for labels in arms],
+            )
+        )
+        extra.append(
+            (
+                "fakenews_experiment_latency_p95_seconds",
+                "gauge",
+                "95th percentile scoring latency over the last predictions, per model.",
+                [(labels, candidate[labels[0][1]]["p95_ms"] / 1000) for labels in arms],
+            )
+        )
+        if candidate["agreement"] is not None:
+            extra.append(
+                (
+                    "fakenews_experiment_agreement_ratio",
+                    "gauge",
+                    "Share of shadow comparisons where both models gave the same label.",
+                    [((("version", candidate["version"]),), candidate["agreement"])],
+                )
+            )
+
+    return HttpResponse(
+        ml_metrics.render(extra), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@csrf_exempt
+@require_POST
+def predict_batch_api(request):
+    """JSON API: score a list of texts in a single vectorized call.
+
+    Expects a body like ``{"texts": ["...", "..."]}`` and returns the
+    predictions in the same order; ``"explain": true`` adds the top n-grams
+    toward each class to every prediction.
+    """
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "Corps JSON invalide"}, status=400)
+
+    texts = payload.get("texts") if isinstance(payload, dict) else None
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return JsonResponse(
+            {"error": "Le champ 'texts' doit être une liste de chaînes"}, status=400
+        )
+
+    max_size = settings.PREDICT_BATCH_MAX_SIZE
+    if len(texts) > max_size:
+        return JsonResponse(
+            {"error": f"Lot trop volumineux ({len(texts)} > {max_size})"}, status=400
+        )
+
+    explain = payload.get("explain") is True
+    results = [
+        {key: value for key, value in result.items() if key != "processed_text"}
+        for result in predict_batch(texts, explain=explain)
+    ]
+    log_predictions(texts, results, "batch")
+
+    return JsonResponse({"count": len(results), "results": results})
+
+
+def _score_coalesced(requests):
+    """Score (text, explain) requests; explanations are only returned where asked"""
+    texts = [text for text, _ in requests]
+    results = predict_batch(texts, explain=any(explain for _, explain in requests))
+    for (_, explain), result in zip(requests, results):
+        if not explain:
+            result.pop("explanation", None)
+    return results
+
+
+def _prediction_batcher():
+    return MicroBatcher(
+        _score_coalesced,
+        max_batch_size=settings.PREDICT_COALESCE_SIZE,
+        max_wait=settings.PREDICT_COALESCE_WAIT_MS / 1000,
     )
+
+
+def parse_predict_payload(body):
+    """Return (text, explain, error message) for a ``{"text": "..."}`` request body"""
+    try:
+        payload = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return None, False, "Corps JSON invalide"
+
+    text = payload.get("text") if isinstance(payload, dict) else None
+    if not isinstance(text, str):
+        return None, False, "Le champ 'text' doit être une chaîne"
+    return text, payload.get("explain") is True, None
+
+
+async def predict_coalesced(text, explain=False):
+    """Score `text` together with the texts submitted concurrently on this event loop"""
+    result = await batcher_for_running_loop(_prediction_batcher).submit((text, explain))
+    log_predictions([text], [result], "api")
+    return {key: value for key, value in result.items() if key != "processed_text"}
+
+
+async def predict_api(request):
+    """Async JSON API: score one text, coalesced with concurrent requests.
+
+    Expects ``{"text": "..."}`` (``"explain": true`` adds the top n-grams
+    toward each class). Texts arriving within a few milliseconds of
+    each other are scored together by one vectorized call on a worker thread
+    (see `ml/batcher.py`). Under ASGI, `detector/asgi.py` answers this URL
+    before the middleware chain; this view serves WSGI and the test client.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    text, explain, error = parse_predict_payload(request.body)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+    return JsonResponse(await predict_coalesced(text, explain))
+
+
+# csrf_exempt() only wraps async views correctly from Django 5.0 on
+predict_api.csrf_exempt = True
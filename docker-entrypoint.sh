@@ -0,0 +1,5 @@
+#!/bin/sh
+# Create or update the database tables (PredictionLog) before starting the server
+set -e
+python manage.py migrate --noinput
+exec "$@"
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fakenews_detector.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# POST /api/predict est servi directement sur la boucle d'événements (lots)
+from detector.asgi import with_prediction_endpoint  # noqa: E402
+
+application = with_prediction_endpoint(django_application)
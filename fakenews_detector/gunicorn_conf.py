@@ -0,0 +1,64 @@
+"""
+Gunicorn configuration for fakenews_detector.
+
+Usage:
+    gunicorn -c python:fakenews_detector.gunicorn_conf fakenews_detector.wsgi:application
+
+The Django app and the ML artifacts (model, vectorizer, lemma table) are
+loaded once in the master process. The heap is then frozen with
+`gc.freeze()` so the garbage collector of each forked worker never touches
+those objects, and their memory pages stay shared copy-on-write instead of
+being duplicated per worker. Workers boot without unpickling anything.
+
+Environment variables:
+    PORT               listening port (default 8080)
+    WEB_CONCURRENCY    number of worker processes (default: CPU count)
+    GUNICORN_THREADS   threads per worker (default 2)
+    GUNICORN_TIMEOUT   worker timeout in seconds (default 120)
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# Scoring is CPU-bound: one process per core, a few threads to overlap I/O
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", "2"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+
+preload_app = True
+
+# The registry watcher (ML_REGISTRY_POLL) runs in the workers only, started by
+# post_fork: the master serves nothing, and a reload in progress at fork time
+# would hand the worker a held lock (see detector/apps.py)
+os.environ["ML_REGISTRY_WATCHER"] = "post_fork"
+
+# Collecting before the fork would only rewrite reference-counted pages that
+# are about to be shared; the collector is re-enabled in each worker.
+gc.disable()
+
+
+def when_ready(server):
+    """Load the ML artifacts in the master, then freeze the heap before forking"""
+    from ml.model import warm_up
+
+    warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info("ML artifacts preloaded in master; %d objects frozen", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+    # Threads do not survive the fork: each worker watches the model registry
+    from ml.model import get_near_duplicate_index, start_registry_watcher
+
+    start_registry_watcher()
+
+    # Each worker loads (and saves at exit) its own near-duplicate index; the
+    # master never builds one, so it cannot overwrite theirs when it exits last
+    get_near_duplicate_index()
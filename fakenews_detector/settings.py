@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "detector.middleware.ServerTimingMiddleware",
+    "detector.middleware.SamplingProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -131,6 +133,67 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ML warm-up
+# "off" : les modèles sont chargés à la première prédiction (démarrage rapide)
+# "background" : chargement dans un thread dès le démarrage de Django
+# "eager" : chargement bloquant au démarrage
+ML_WARMUP = os.environ.get("ML_WARMUP", "off")
+
+# Surveillance du registre des modèles (ML_REGISTRY_POLL)
+# "ready" : démarrée par AppConfig.ready (runserver, uvicorn, gunicorn sans préchargement)
+# "post_fork" : démarrée dans chaque worker par gunicorn_conf.py, jamais dans le
+# master préchargé, qui ne sert aucune requête
+ML_REGISTRY_WATCHER = os.environ.get("ML_REGISTRY_WATCHER", "ready")
+
+# Caches
+# L'alias "predictions" est utilisé quand PREDICTION_CACHE_BACKEND=django ;
+# remplacer le backend (fichier, Redis...) pour partager le cache entre workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "predictions": {
+        "BACKEND": os.environ.get(
+            "PREDICTION_CACHE_DJANGO_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("PREDICTION_CACHE_LOCATION", "predictions"),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("PREDICTION_CACHE_SIZE", "10000")),
+        },
+    },
+}
+
+# Prediction API
+# Nombre maximal de textes acceptés par /api/predict/batch
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", "1000"))
+
+# /api/predict (async) : les requêtes concurrentes sont regroupées en lots
+# d'au plus PREDICT_COALESCE_SIZE textes, après au plus PREDICT_COALESCE_WAIT_MS
+PREDICT_COALESCE_SIZE = int(os.environ.get("PREDICT_COALESCE_SIZE", "64"))
+PREDICT_COALESCE_WAIT_MS = float(os.environ.get("PREDICT_COALESCE_WAIT_MS", "5"))
+
+# Journal des prédictions (detector/prediction_log.py) : écrit par lots en
+# arrière-plan, jamais pendant la requête
+PREDICTION_LOG = os.environ.get("PREDICTION_LOG", "1") != "0"
+PREDICTION_LOG_BATCH_SIZE = int(os.environ.get("PREDICTION_LOG_BATCH_SIZE", "500"))
+PREDICTION_LOG_FLUSH_SECONDS = float(os.environ.get("PREDICTION_LOG_FLUSH_SECONDS", "2"))
+PREDICTION_LOG_MAX_PENDING = int(os.environ.get("PREDICTION_LOG_MAX_PENDING", "20000"))
+
+# manage.py test : journal désactivé pendant les tests (voir test_runner.py)
+TEST_RUNNER = "fakenews_detector.test_runner.TestRunner"
+
+# Rechargement à chaud du modèle (POST /api/model/reload) : utilisateurs staff,
+# ou en-tête "Authorization: Bearer <MODEL_RELOAD_TOKEN>" si défini
+MODEL_RELOAD_TOKEN = os.environ.get("MODEL_RELOAD_TOKEN", "")
+
+# Diagnostic de latence (detector/middleware.py)
+# En-tête Server-Timing : durée de chaque étape du scoring et du rendu
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") != "0"
+# Fraction des requêtes profilées avec cProfile (0 = désactivé), écrites dans PROFILE_DIR
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", str(BASE_DIR / "profiles"))
+
 # Configuration pour Heroku
 if os.environ.get("DATABASE_URL"):
     DATABASES["default"] = dj_database_url.config(conn_max_age=600, ssl_require=True)
@@ -140,7 +203,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATIC_URL = "/static/"
 
 # Configuration pour Whitenoise (servir les fichiers statiques)
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
 
 # Sécurité pour Heroku
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -0,0 +1,24 @@
+"""
+Test runner for `python manage.py test`.
+
+The prediction log (`detector/prediction_log.py`) writes from a background
+thread, outside the transactions Django wraps each test in, so it is turned
+off for the whole run; `tests.test_prediction_log` enables it explicitly
+with `override_settings(PREDICTION_LOG=True)`.
+"""
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner with the prediction log disabled"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._prediction_log_off = override_settings(PREDICTION_LOG=False)
+        self._prediction_log_off.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._prediction_log_off.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,124 @@
+"""
+Request coalescing for the asynchronous prediction API.
+
+Scoring one article at a time pays the Python overhead of preprocessing,
+vectorizing and `predict_proba` per request. Under concurrent load the
+`MicroBatcher` collects texts submitted from many coroutines for at most
+`max_wait` seconds (or until `max_batch_size` texts are pending), then scores
+them with a single vectorized call (`ml.model.predict_batch`) on a worker
+thread, so the event loop keeps accepting requests meanwhile:
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=64, max_wait=0.005)
+    result = await batcher.submit(text)
+
+A batcher belongs to one event loop; `batcher_for_running_loop` keeps one
+per loop (ASGI servers run one loop per worker process).
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """Coalesce concurrent `submit` calls into batched calls of `score_batch`"""
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait=0.005, workers=1):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ml-batcher"
+        )
+        self._pending = []
+        self._timer = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, text):
+        """Queue `text` and wait for its prediction"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        loop = asyncio.get_running_loop()
+        texts = [text for text, _ in batch]
+        scoring = loop.run_in_executor(self._executor, self.score_batch, texts)
+        scoring.add_done_callback(lambda done: self._deliver(batch, done))
+
+    @staticmethod
+    def _deliver(batch, done):
+        error = done.exception()
+        results = None if error is not None else done.result()
+        for i, (_, future) in enumerate(batch):
+            # The client may have gone away (cancelled future)
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_batchers = weakref.WeakKeyDictionary()
+_batchers_lock = threading.Lock()
+
+
+def batcher_for_running_loop(factory):
+    """Return the batcher of the current event loop, creating it with `factory()`"""
+    loop = asyncio.get_running_loop()
+    with _batchers_lock:
+        batcher = _batchers.get(loop)
+        if batcher is None:
+            batcher = _batchers[loop] = factory()
+            weakref.finalize(loop, batcher.close)
+    return batcher
+
+
+def batcher_stats():
+    """Counters summed over the batchers of all live event loops"""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    totals = {"loops": len(batchers), "batches": 0, "items": 0, "largest_batch": 0}
+    for batcher in batchers:
+        stats = batcher.stats()
+        totals["batches"] += stats["batches"]
+        totals["items"] += stats["items"]
+        totals["largest_batch"] = max(totals["largest_batch"], stats["largest_batch"])
+    totals["mean_batch_size"] = (
+        round(totals["items"] / totals["batches"], 2) if totals["batches"] else 0.0
+    )
+    return totals
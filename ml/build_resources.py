@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Regenerate the bundled NLP resources in `ml/resources/` from local NLTK data.
+
+The lemma table lists every lowercase ASCII word whose WordNet noun lemma
+(`WordNetLemmatizer().lemmatize(word)`) differs from the word. NLTK's morphy
+applies a single suffix substitution or an exception-list lookup, so the
+candidates are exactly: each single-word noun lemma inflected by the inverse
+of every substitution rule, plus the exception forms.
+
+Usage (requires the WordNet corpus, and optionally stopwords, locally):
+    python ml/build_resources.py
+"""
+
+import gzip
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ml.resources import (  # noqa: E402
+    LEMMA_TABLE_FILE,
+    STOPWORDS_FILE,
+    RESOURCES_DIR,
+    find_nltk_resource,
+)
+
+_WORD_RE = re.compile(r"[a-z]+\Z")
+
+
+def lemma_candidates(wordnet):
+    """All ASCII words that WordNet's noun morphy could map to another lemma"""
+    substitutions = wordnet.MORPHOLOGICAL_SUBSTITUTIONS["n"]
+    candidates = set(wordnet._exception_map["n"])
+
+    for lemma, pos in wordnet._lemma_pos_offset_map.items():
+        if "n" not in pos or not _WORD_RE.match(lemma):
+            continue
+        for old, new in substitutions:
+            if lemma.endswith(new):
+                candidates.add(lemma[: len(lemma) - len(new)] + old)
+
+    return sorted(c for c in candidates if _WORD_RE.match(c))
+
+
+def build_lemma_table():
+    from nltk.corpus import wordnet
+    from nltk.stem import WordNetLemmatizer
+
+    lemmatize = WordNetLemmatizer().lemmatize
+    rows = []
+    for word in lemma_candidates(wordnet):
+        lemma = lemmatize(word)
+        if lemma != word:
+            rows.append(f"{word}\t{lemma}\n")
+
+    # mtime=0 keeps the archive byte-for-byte reproducible
+    with open(LEMMA_TABLE_FILE, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write("".join(rows).encode("utf-8"))
+    print(f"✓ {len(rows)} lemmas -> {LEMMA_TABLE_FILE}")
+
+
+def build_stop_words():
+    from nltk.corpus import stopwords
+
+    words = stopwords.words("english")
+    STOPWORDS_FILE.write_text(
+        "# NLTK English stop words\n" + "\n".join(words) + "\n", encoding="utf-8"
+    )
+    print(f"✓ {len(words)} stop words -> {STOPWORDS_FILE}")
+
+
+def main():
+    RESOURCES_DIR.mkdir(parents=True, exist_ok=True)
+
+    if find_nltk_resource("corpora/wordnet", "wordnet"):
+        build_lemma_table()
+    else:
+        print("✗ WordNet not found locally: lemma table not rebuilt")
+
+    if find_nltk_resource("corpora/stopwords", "stopwords"):
+        build_stop_words()
+    else:
+        print("✗ NLTK stopwords not found locally: stop word list not rebuilt")
+
+
+if __name__ == "__main__":
+    main()
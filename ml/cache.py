@@ -0,0 +1,152 @@
+"""
+Prediction cache placed in front of `predict_fake_news`.
+
+The same wire stories are submitted many times by different aggregators.
+Results are cached under a hash of the (whitespace-normalized) input text and
+the version of the model artifacts, so a retrained model never serves stale
+verdicts. Two backends are available:
+
+- ``memory``: in-process LRU with TTL and a size bound (default);
+- ``django``: any Django cache alias (locmem, file-based, Redis, ...), so
+  several workers can share entries.
+
+Configuration (environment variables):
+    PREDICTION_CACHE_BACKEND   memory | django | none   (default: memory)
+    PREDICTION_CACHE_SIZE      maximum entries for the memory backend (10000)
+    PREDICTION_CACHE_TTL       seconds before an entry expires (3600)
+    PREDICTION_CACHE_ALIAS     Django cache alias for the django backend
+                               (default: predictions)
+"""
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+PREDICTION_CACHE_BACKEND = os.environ.get("PREDICTION_CACHE_BACKEND", "memory")
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_ALIAS = os.environ.get("PREDICTION_CACHE_ALIAS", "predictions")
+
+
+def prediction_key(text, version):
+    """Cache key for `text` scored by artifacts `version`.
+
+    Whitespace is collapsed first so that copies differing only in layout
+    share an entry; the key is computed without running the full
+    preprocessing pipeline, which keeps cache hits cheap.
+    """
+    normalized = " ".join(text.split()).encode("utf-8", "surrogatepass")
+    digest = hashlib.blake2b(normalized, digest_size=16).hexdigest()
+    return f"prediction:{version}:{digest}"
+
+
+class _CacheStats:
+    """Hit/miss counters shared by the cache backends"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        # Unlocked increments: a lost update only skews the statistics
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryPredictionCache:
+    """In-process LRU cache with a per-entry TTL and a maximum size"""
+
+    backend = "memory"
+
+    def __init__(self, maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+
+    def get(self, key):
+        """Return a copy of the cached prediction for `key`, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self._stats.record(entry is not None)
+        return copy.copy(entry[1]) if entry is not None else None
+
+    def set(self, key, prediction):
+        """Store `prediction`, evicting the least recently used entries if full"""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, copy.copy(prediction))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            **self._stats.as_dict(),
+        }
+
+
+class DjangoPredictionCache:
+    """Prediction cache stored in a Django cache alias (TTL and eviction by the backend)"""
+
+    backend = "django"
+
+    def __init__(self, alias=PREDICTION_CACHE_ALIAS, ttl=PREDICTION_CACHE_TTL):
+        from django.core.cache import caches
+
+        self.alias = alias
+        self.ttl = ttl
+        self._cache = caches[alias]
+        self._stats = _CacheStats()
+
+    def get(self, key):
+        prediction = self._cache.get(key)
+        self._stats.record(prediction is not None)
+        return prediction
+
+    def set(self, key, prediction):
+        self._cache.set(key, prediction, timeout=self.ttl)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return {"backend": self.backend, "alias": self.alias, **self._stats.as_dict()}
+
+
+def create_prediction_cache(backend=PREDICTION_CACHE_BACKEND):
+    """Build the configured prediction cache, or return None when disabled"""
+    if backend == "none":
+        return None
+    if backend == "django":
+        return DjangoPredictionCache()
+    if backend == "memory":
+        return MemoryPredictionCache()
+    raise ValueError(f"Unknown prediction cache backend: {backend!r}")
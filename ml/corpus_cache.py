@@ -0,0 +1,101 @@
+"""
+On-disk cache of the preprocessed training corpus.
+
+Cleaning the full True.csv + Fake.csv corpus is the slowest step of
+`ml/train.py`, yet it only depends on the source files and on the
+normalizer. The cleaned `content` column and the labels are stored in a flat,
+memory-mappable layout so hyperparameter iterations can go straight to
+`TfidfVectorizer.fit_transform`:
+
+    <cache dir>/<key>/content.bin    UTF-8 documents, concatenated
+    <cache dir>/<key>/offsets.npy    int64 offsets into content.bin (n + 1)
+    <cache dir>/<key>/label.npy      int8 labels
+    <cache dir>/<key>/meta.json      key inputs, for inspection
+
+The key hashes the source CSV contents, the normalizer version, the stop word
+list and the sampling parameters; any change produces a new entry.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml.normalizer import NORMALIZER_VERSION
+
+CORPUS_CACHE_DIR = Path(
+    os.environ.get("CORPUS_CACHE_DIR", Path(__file__).resolve().parent / ".cache" / "corpus")
+)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """blake2b digest of a file's contents, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def corpus_key(source_files, stop_words, **params):
+    """Cache key for a corpus built from `source_files` with the current normalizer"""
+    inputs = {
+        "sources": {Path(p).name: file_digest(p) for p in source_files},
+        "normalizer": NORMALIZER_VERSION,
+        "stop_words": hashlib.blake2b(
+            "\n".join(sorted(stop_words)).encode(), digest_size=8
+        ).hexdigest(),
+        "params": params,
+    }
+    key = hashlib.blake2b(
+        json.dumps(inputs, sort_keys=True).encode(), digest_size=12
+    ).hexdigest()
+    return key, inputs
+
+
+def save_corpus(key, df, inputs=None, cache_dir=CORPUS_CACHE_DIR):
+    """Persist the `content`/`label` columns of `df` under `key`"""
+    target = Path(cache_dir) / key
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    encoded = [text.encode("utf-8") for text in df["content"]]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    (tmp / "content.bin").write_bytes(b"".join(encoded))
+    np.save(tmp / "offsets.npy", offsets)
+    np.save(tmp / "label.npy", df["label"].to_numpy(dtype=np.int8))
+    (tmp / "meta.json").write_text(json.dumps(inputs or {}, indent=2, sort_keys=True))
+
+    # Rename last so a crashed run never leaves a half-written entry behind
+    if target.exists():
+        for child in target.iterdir():
+            child.unlink()
+        target.rmdir()
+    tmp.rename(target)
+    return target
+
+
+def load_corpus(key, cache_dir=CORPUS_CACHE_DIR):
+    """Return the cached DataFrame for `key`, or None if there is no valid entry"""
+    target = Path(cache_dir) / key
+    try:
+        offsets = np.load(target / "offsets.npy", mmap_mode="r")
+        labels = np.load(target / "label.npy", mmap_mode="r")
+        content = np.memmap(target / "content.bin", dtype=np.uint8, mode="r") if offsets[-1] else b""
+    except (OSError, ValueError):
+        return None
+
+    if len(labels) + 1 != len(offsets):
+        return None
+
+    buffer = memoryview(content)
+    texts = [
+        bytes(buffer[start:end]).decode("utf-8")
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+    return pd.DataFrame({"content": texts, "label": np.asarray(labels, dtype=np.int64)})
@@ -0,0 +1,116 @@
+"""
+Collapsed linear scoring engine for the calibrated SVM ensemble.
+
+`CalibratedClassifierCV(LinearSVC(), method="sigmoid", cv=5)` keeps five
+(LinearSVC, sigmoid) pairs; its `predict_proba` walks them one by one, each
+computing a decision function, a sigmoid and a probability matrix, then
+averages. Every member is affine before its sigmoid:
+
+    p_k(x) = expit(-(a_k * (w_k . x + c_k) + b_k))
+           = expit(-(x . (a_k * w_k) + (a_k * c_k + b_k)))
+
+so the calibration slopes can be folded into the weights once. Scoring a
+batch is then a single sparse-dense product against an (n_features, 5)
+matrix, one vectorized `expit` and a row mean.
+"""
+
+import numpy as np
+
+
+def calibrated_parameters(model):
+    """Stacked member parameters of a CalibratedClassifierCV(LinearSVC, sigmoid)"""
+    if isinstance(model, LinearEnsemble):
+        return model.parameters()
+    if getattr(model, "method", None) != "sigmoid" or len(model.classes_) != 2:
+        raise ValueError("Only binary sigmoid-calibrated linear models are supported")
+
+    members = model.calibrated_classifiers_
+    return {
+        "coef": np.vstack(
+            [np.asarray(m.estimator.coef_, dtype=np.float64).ravel() for m in members]
+        ),
+        "intercept": np.array([float(np.ravel(m.estimator.intercept_)[0]) for m in members]),
+        "calibration_a": np.array([m.calibrators[0].a_ for m in members], dtype=np.float64),
+        "calibration_b": np.array([m.calibrators[0].b_ for m in members], dtype=np.float64),
+        "classes": np.asarray(model.classes_),
+    }
+
+
+class LinearEnsemble:
+    """Drop-in `predict_proba` for a binary sigmoid-calibrated linear ensemble"""
+
+    def __init__(self, coef, intercept, calibration_a, calibration_b, classes):
+        coef = np.asarray(coef, dtype=np.float64)
+        calibration_a = np.asarray(calibration_a, dtype=np.float64)
+
+        self.classes_ = np.asarray(classes)
+        self.n_members = coef.shape[0]
+        # (n_features, n_members), C-contiguous so a row gather is one slice
+        self.weights = np.ascontiguousarray((coef * calibration_a[:, None]).T)
+        self.bias = calibration_a * np.asarray(intercept, dtype=np.float64) + np.asarray(
+            calibration_b, dtype=np.float64
+        )
+
+    @classmethod
+    def from_calibrated(cls, model):
+        """Build from a fitted CalibratedClassifierCV over linear estimators"""
+        return cls(**calibrated_parameters(model))
+
+    @classmethod
+    def from_weights(cls, weights, bias, classes):
+        """Wrap already folded (n_features, k) weights as they are, without copying.
+
+        Memory-mapped arrays of a flat model file stay shared between processes.
+        """
+        ensemble = cls.__new__(cls)
+        ensemble.classes_ = np.asarray(classes)
+        ensemble.n_members = weights.shape[1]
+        ensemble.weights = weights
+        ensemble.bias = bias
+        return ensemble
+
+    @classmethod
+    def from_artifacts(cls, artifacts):
+        """Build from the arrays of a flat model file (see `ml/flat_model.py`)"""
+        if hasattr(artifacts, "weights"):
+            return cls.from_weights(artifacts.weights, artifacts.bias, artifacts.classes)
+        # Format 1 : coefficients par membre, repliés à chaque chargement
+        return cls(
+            artifacts.coef,
+            artifacts.intercept,
+            artifacts.calibration_a,
+            artifacts.calibration_b,
+            artifacts.classes,
+        )
+
+    def parameters(self):
+        """Constructor arguments reproducing this ensemble (slopes already folded in)"""
+        return {
+            "coef": self.weights.T,
+            "intercept": self.bias,
+            "calibration_a": np.ones(self.n_members),
+            "calibration_b": np.zeros(self.n_members),
+            "classes": self.classes_,
+        }
+
+    def positive_scores(self, X):
+        """Calibrated probability of the positive class, per member (n, k)"""
+        if X.shape[1] != self.weights.shape[0]:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but LinearEnsemble is expecting "
+                f"{self.weights.shape[0]} features as input"
+            )
+        # Import différé : scipy.special pèse plus que le reste de ml.model
+        from scipy.special import expit
+
+        if X.shape[0] == 1 and getattr(X, "format", None) == "csr":
+            # One document: gathering its few rows beats the sparse product
+            logits = X.data @ self.weights[X.indices] + self.bias
+            return expit(-logits)[None, :]
+        return expit(-(X @ self.weights + self.bias))
+
+    def predict_proba(self, X):
+        probabilities = np.empty((X.shape[0], 2))
+        probabilities[:, 1] = self.positive_scores(X).mean(axis=1)
+        probabilities[:, 0] = 1.0 - probabilities[:, 1]
+        return probabilities
@@ -0,0 +1,123 @@
+"""
+Live comparison of the active model with a candidate.
+
+`ml/model.py` can keep a second model/vectorizer pair resident (e.g. a registry
+version trained with a larger vocabulary) and, for a sampled fraction of
+`predict_fake_news` calls, either:
+
+- ``ab``: answer with the candidate instead of the active model;
+- ``shadow``: answer with the active model and score the candidate off the
+  request path (`ShadowScorer`), comparing the two verdicts.
+
+`ModelComparison` keeps what is needed to decide on a promotion: requests
+and latency per model (mean and percentiles over a sliding window) and, in
+shadow mode, how often the labels agree and how far the probabilities are.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ARMS = ("active", "candidate")
+
+
+class ModelComparison:
+    """Per-model latency and active/candidate agreement counters"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.latencies = {arm: deque(maxlen=window) for arm in ARMS}
+        self.requests = dict.fromkeys(ARMS, 0)
+        self.labels = {arm: {} for arm in ARMS}
+        self.compared = 0
+        self.agreed = 0
+        self.probability_delta = 0.0
+
+    def record(self, arm, seconds, result):
+        # Unlocked increments: a lost update only skews the statistics
+        self.requests[arm] += 1
+        self.latencies[arm].append(seconds)
+        label = result.get("label")
+        self.labels[arm][label] = self.labels[arm].get(label, 0) + 1
+
+    def compare(self, active, candidate):
+        """Record one pair of verdicts for the same text"""
+        if "error" in active or "error" in candidate:
+            return
+        self.compared += 1
+        self.agreed += active["label"] == candidate["label"]
+        self.probability_delta += abs(
+            _fake_probability(active) - _fake_probability(candidate)
+        )
+
+    def stats(self):
+        arms = {}
+        for arm in ARMS:
+            latencies = np.fromiter(self.latencies[arm], dtype=float) * 1000
+            arms[arm] = {
+                "requests": self.requests[arm],
+                "labels": dict(self.labels[arm]),
+                "mean_ms": round(float(latencies.mean()), 3) if len(latencies) else 0.0,
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else 0.0,
+                "p95_ms": round(float(np.percentile(latencies, 95)), 3) if len(latencies) else 0.0,
+            }
+        return {
+            **arms,
+            "compared": self.compared,
+            "agreement": round(self.agreed / self.compared, 4) if self.compared else None,
+            "mean_probability_delta": (
+                round(self.probability_delta / self.compared, 4) if self.compared else None
+            ),
+        }
+
+
+def _fake_probability(result):
+    """Probability of "Fake", whichever label the result carries"""
+    p = result["probability"]
+    return p if result["label"] == "Fake" else 1.0 - p
+
+
+class ShadowScorer:
+    """Score texts with the candidate on a background thread.
+
+    At most `max_pending` texts wait for the shadow model; beyond that new
+    ones are dropped (and counted), so a slow candidate never builds an
+    unbounded backlog or delays the answers.
+    """
+
+    def __init__(self, score, comparison, max_pending=100):
+        self.score = score
+        self.comparison = comparison
+        self.max_pending = max_pending
+        self.pending = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-shadow")
+
+    def submit(self, text, active_result):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self.pending += 1
+        self._executor.submit(self._run, text, active_result)
+        return True
+
+    def _run(self, text, active_result):
+        try:
+            seconds, result = self.score(text)
+            self.comparison.record("candidate", seconds, result)
+            self.comparison.compare(active_result, result)
+        except Exception as e:
+            print(f"⚠️  Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self):
+        return {"pending": self.pending, "dropped": self.dropped}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
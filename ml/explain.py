@@ -0,0 +1,106 @@
+"""
+Per-prediction explanations for the linear model: top n-grams per class.
+
+The served model is linear before its sigmoids (see `ml/engine.py`): member k
+scores a document x as expit(-(x . w_k + b_k)). Averaging the members gives
+one coefficient per TF-IDF column, and the contribution of an n-gram of the
+document to the averaged logit is its TF-IDF value times that coefficient.
+An explanation therefore only needs the document's sparse row, already
+computed for scoring: a gather over its non-zero columns, a product and a
+partial sort, where a model-agnostic explainer (LIME, SHAP) would re-score
+hundreds of perturbed copies of the text.
+
+Column names come from the vectorizer's vocabulary (read from the mapped
+term buffer for a flat export). Hashed features (`ml/hashing.py`) have no
+vocabulary: the n-grams of the document are hashed again and matched to the
+selected columns.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from ml.engine import LinearEnsemble
+
+
+class LinearExplainer:
+    """Top-k n-grams pushing a document toward each class"""
+
+    def __init__(self, model, vectorizer):
+        if not isinstance(model, LinearEnsemble):
+            model = LinearEnsemble.from_calibrated(model)
+        # Logit moyen de classes_[1] : -(x . w_k + b_k), moyenné sur les membres
+        self.coefficients = -model.weights.mean(axis=1)
+        positive = "Fake" if model.classes_[1] == 1 else "Real"
+        self.labels = ("Real" if positive == "Fake" else "Fake", positive)
+        self.vectorizer = vectorizer
+        self._terms = None
+
+    @property
+    def terms(self):
+        """Column -> n-gram array, or None without a vocabulary dict"""
+        vocabulary = getattr(self.vectorizer, "vocabulary_", None)
+        if self._terms is None and vocabulary is not None:
+            terms = np.empty(len(self.coefficients), dtype=object)
+            terms[list(vocabulary.values())] = list(vocabulary.keys())
+            self._terms = terms
+        return self._terms
+
+    def _hashed_names(self, document, columns):
+        """Names of hashed `columns`, found by hashing the n-grams of `document`"""
+        from sklearn.utils import murmurhash3_32
+
+        vectorizer = self.vectorizer
+        wanted = set(columns.tolist())
+        names = {}
+        for gram in vectorizer._hasher.build_analyzer()(document):
+            column = abs(murmurhash3_32(gram, positive=False)) % vectorizer.n_features
+            if column in wanted:
+                names.setdefault(column, set()).add(gram)
+        return {column: " | ".join(sorted(grams)) for column, grams in names.items()}
+
+    def explain(self, matrix, row, document, top_k=10):
+        """Top n-grams of row `row` of `matrix` toward each label.
+
+        Returns {"Fake": [{"ngram": ..., "weight": ...}, ...], "Real": [...]},
+        each list sorted by decreasing contribution to the averaged logit.
+        `document` is the preprocessed text (only read for hashed features).
+        """
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        columns = matrix.indices[start:end]
+        contributions = matrix.data[start:end] * self.coefficients[columns]
+
+        # Un seul tri : les plus négatives au début, les plus positives à la fin
+        order = np.argsort(contributions)
+        negative, positive = order[:top_k], order[: -top_k - 1 : -1]
+        selected = {
+            self.labels[0]: negative[contributions[negative] < 0],
+            self.labels[1]: positive[contributions[positive] > 0],
+        }
+
+        terms = self.terms
+        term_names = getattr(self.vectorizer, "term_names", None)
+        if terms is None and term_names is None:
+            chosen = columns[np.concatenate(list(selected.values()))]
+            names = self._hashed_names(document, chosen)
+        explanation = {}
+        for label, indices in selected.items():
+            selected_columns = columns[indices]
+            if terms is not None:
+                grams = terms[selected_columns].tolist()
+            elif term_names is not None:
+                # Export à plat : termes lus dans le fichier mappé
+                grams = term_names(selected_columns.tolist())
+            else:
+                grams = [names.get(column, f"#{column}") for column in selected_columns.tolist()]
+            weights = np.abs(contributions[indices]).round(4).tolist()
+            explanation[label] = [
+                {"ngram": gram, "weight": weight} for gram, weight in zip(grams, weights)
+            ]
+        return explanation
+
+
+@lru_cache(maxsize=4)
+def explainer_for(model, vectorizer):
+    """Explainer of a loaded model/vectorizer pair (active and candidate stay cached)"""
+    return LinearExplainer(model, vectorizer)
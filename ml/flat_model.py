@@ -0,0 +1,318 @@
+"""
+Flat, memory-mapped export of the TF-IDF vectorizer and calibrated SVM.
+
+The joblib artifacts hold a `TfidfVectorizer` (Python dict vocabulary) and a
+`CalibratedClassifierCV` wrapping five `LinearSVC` folds. Unpickling them in
+every process is slow and each copy is private to its process. This module
+stores the parameters that inference actually needs in a single flat file:
+
+    magic (8 bytes) | header length (uint64) | JSON header | aligned arrays
+
+Arrays (vocabulary terms and an open-addressing table over them, idf, and
+the (n_features, k) weights with the sigmoid slopes already folded in, see
+`ml/engine.py`) are read with `np.memmap` and used in place: no process
+rebuilds a vocabulary dict or refolds the weights, so every process scores
+from the same read-only pages and load time does not depend on pickle.
+Models trained with the hashing pipeline (`ml/hashing.py`) have no
+vocabulary; only their idf and hashing parameters are stored.
+
+`FlatVectorizer.transform` and the `LinearEnsemble` built from the file
+(`ml/engine.py`) reproduce the sklearn objects they were exported from (see
+`verify_flat`).
+"""
+
+import json
+import operator
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from ml.engine import LinearEnsemble, calibrated_parameters
+from ml.hashing import HashingTfidfVectorizer
+
+MAGIC = b"FNDFLAT1"
+# 2 : poids repliés et table de hachage du vocabulaire (1 : coefficients par membre)
+FORMAT_VERSION = 2
+_ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_flat(path, header, arrays):
+    """Write `arrays` (name -> ndarray) and a JSON `header` to one flat file"""
+    layout = {}
+    offset = 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        offset = _align(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        contiguous[name] = array
+        offset += array.nbytes
+
+    header_bytes = json.dumps({**header, "arrays": layout}, sort_keys=True).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        for name, array in contiguous.items():
+            f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    tmp.replace(path)
+
+
+def read_flat(path):
+    """Return (header, arrays) with arrays memory-mapped read-only"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a flat model file")
+        header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_length))
+
+    data_start = _align(len(MAGIC) + 8 + header_length)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header.pop("arrays").items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(spec["shape"])
+    return header, arrays
+
+
+_reverse = operator.itemgetter(slice(None, None, -1))
+_PRIME = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def token_keys(tokens):
+    """64-bit key of each token: crc32 of its UTF-8 bytes and of their reverse"""
+    encoded = list(map(str.encode, tokens))
+    high = np.fromiter(map(zlib.crc32, encoded), dtype=np.uint64, count=len(encoded))
+    low = np.fromiter(map(zlib.crc32, map(_reverse, encoded)), dtype=np.uint64, count=len(encoded))
+    return (high << np.uint64(32)) | low
+
+
+def ngram_keys(keys, n):
+    """Keys of the n-grams of a token key sequence (polynomial, wraps mod 2**64)"""
+    count = len(keys) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    grams = keys[:count].copy()
+    for offset in range(1, n):
+        grams = grams * _PRIME + keys[offset : offset + count]
+    return grams
+
+
+def build_term_table(terms, term_offsets):
+    """Open-addressing table (slot keys, slot terms) over the vocabulary.
+
+    The key of a term is `ngram_keys` of its tokens, so n-grams are looked up
+    from their token keys without building their strings. A term goes to the
+    slot given by the top bits of its mixed key, or the next free one; empty
+    slots hold -1. The table has at least twice as many slots as terms.
+    """
+    blob = terms.tobytes()
+    offsets = term_offsets.tolist()
+    names = [blob[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+    keys = [int(ngram_keys(token_keys(name.split(" ")), name.count(" ") + 1)[0]) for name in names]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Two vocabulary terms share a key; the flat vocabulary cannot be built")
+
+    bits = max(4, (2 * len(keys)).bit_length())
+    mask = (1 << bits) - 1
+    slot_keys = np.zeros(mask + 1, dtype=np.uint64)
+    slot_terms = np.full(mask + 1, -1, dtype=np.int32)
+    for index, key in enumerate(keys):
+        slot = ((key * int(_MIX)) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+        while slot_terms[slot] >= 0:
+            slot = (slot + 1) & mask
+        slot_keys[slot], slot_terms[slot] = key, index
+    return slot_keys, slot_terms
+
+
+def export_flat(model, vectorizer, path, source_version=None):
+    """Export a fitted TF-IDF or hashing vectorizer + CalibratedClassifierCV(LinearSVC, sigmoid)"""
+    parameters = calibrated_parameters(model)
+    arrays = {}
+
+    if getattr(vectorizer, "kind", None) == HashingTfidfVectorizer.kind:
+        # Pas de vocabulaire : seuls l'IDF et les paramètres de hachage sont exportés
+        vectorizer_header = {"kind": "hashing", **vectorizer.get_params()}
+    else:
+        if vectorizer.analyzer != "word" or vectorizer.stop_words is not None:
+            raise ValueError("Only word analyzers without stop words can be exported")
+
+        terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        encoded = [term.encode("utf-8") for term in terms]
+        term_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=term_offsets[1:])
+
+        vectorizer_header = {
+            "kind": "vocabulary",
+            "ngram_range": list(vectorizer.ngram_range),
+            "token_pattern": vectorizer.token_pattern,
+            "lowercase": vectorizer.lowercase,
+            "sublinear_tf": vectorizer.sublinear_tf,
+            "norm": vectorizer.norm,
+        }
+        arrays["terms"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        arrays["term_offsets"] = term_offsets
+        arrays["slot_keys"], arrays["slot_terms"] = build_term_table(
+            arrays["terms"], term_offsets
+        )
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "source_version": source_version,
+        "vectorizer": vectorizer_header,
+    }
+    # Pentes de calibration repliées une fois ici, pas à chaque chargement
+    engine = LinearEnsemble(**parameters)
+    arrays.update(
+        {
+            "idf": np.asarray(vectorizer.idf_, dtype=np.float64),
+            "weights": engine.weights,
+            "bias": engine.bias,
+            "classes": parameters["classes"].astype(np.int64),
+        }
+    )
+    write_flat(path, header, arrays)
+
+
+class FlatArtifacts:
+    """Memory-mapped inference parameters read from a flat model file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        header, arrays = read_flat(self.path)
+        self.header = header
+        self.source_version = header.get("source_version")
+        self.vectorizer_params = header["vectorizer"]
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+
+class FlatVectorizer:
+    """Drop-in replacement for the fitted TfidfVectorizer's `transform`.
+
+    N-grams are looked up in the mapped term table (`build_term_table`)
+    rather than in a per-process dict: tokens are hashed once, n-gram keys
+    are combined with numpy and the whole batch is probed at once.
+    """
+
+    def __init__(self, artifacts):
+        params = artifacts.vectorizer_params
+        self.idf_ = artifacts.idf
+        self._terms = artifacts.terms
+        self._term_offsets = artifacts.term_offsets
+        self._term_bytes = memoryview(artifacts.terms)
+        self._names = {}
+        if hasattr(artifacts, "slot_terms"):
+            self._slot_keys, self._slot_terms = artifacts.slot_keys, artifacts.slot_terms
+        else:
+            # Format 1 : table construite à la lecture
+            self._slot_keys, self._slot_terms = build_term_table(
+                artifacts.terms, artifacts.term_offsets
+            )
+        self._shift = np.uint64(64 - (len(self._slot_terms).bit_length() - 1))
+        self.ngram_range = tuple(params["ngram_range"])
+        self.lowercase = params["lowercase"]
+        self.sublinear_tf = params["sublinear_tf"]
+        self.norm = params["norm"]
+        self._token_re = re.compile(params["token_pattern"])
+
+    def _ngram_keys(self, doc):
+        """Keys of the word n-grams of `doc`, as sklearn's `_word_ngrams` builds them"""
+        if self.lowercase:
+            doc = doc.lower()
+        keys = token_keys(self._token_re.findall(doc))
+        min_n, max_n = self.ngram_range
+        return np.concatenate([ngram_keys(keys, n) for n in range(min_n, max_n + 1)])
+
+    def term_names(self, columns):
+        """Vocabulary terms of the feature `columns`"""
+        names = self._names
+        missing = [column for column in columns if column not in names]
+        if missing:
+            # Décodés à la demande : seuls les termes déjà expliqués sont gardés
+            offsets = self._term_offsets
+            for column in missing:
+                start, end = int(offsets[column]), int(offsets[column + 1])
+                names[column] = str(self._term_bytes[start:end], "utf-8")
+        return [names[column] for column in columns]
+
+    def _lookup(self, keys):
+        """Feature index of each n-gram key, -1 when it is not in the vocabulary"""
+        mask = len(self._slot_terms) - 1
+        slots = ((keys * _MIX) >> self._shift).astype(np.intp)
+        columns = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        while len(pending):
+            terms = self._slot_terms[slots[pending]]
+            found = (terms >= 0) & (self._slot_keys[slots[pending]] == keys[pending])
+            columns[pending[found]] = terms[found]
+            pending = pending[(terms >= 0) & ~found]
+            slots[pending] = (slots[pending] + 1) & mask
+        return columns
+
+    def transform(self, raw_documents):
+        documents = [self._ngram_keys(doc) for doc in raw_documents]
+        columns = self._lookup(np.concatenate(documents)) if documents else np.empty(0, np.int64)
+        rows = np.repeat(np.arange(len(documents)), [len(keys) for keys in documents])
+        known = columns >= 0
+        X = sp.csr_matrix(
+            (np.ones(int(known.sum())), (rows[known], columns[known])),
+            shape=(len(documents), len(self.idf_)),
+        )
+        X.sum_duplicates()
+        X.sort_indices()
+
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        X.data *= self.idf_[X.indices]
+
+        if self.norm == "l2":
+            norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            norms[norms == 0.0] = 1.0
+            X.data /= np.repeat(norms, np.diff(X.indptr))
+        elif self.norm is not None:
+            raise ValueError(f"Unsupported norm: {self.norm}")
+        return X
+
+
+def load_flat(path):
+    """Return (LinearEnsemble, vectorizer, source_version) for a flat model file"""
+    artifacts = FlatArtifacts(path)
+    params = dict(artifacts.vectorizer_params)
+    if params.pop("kind", "vocabulary") == "hashing":
+        vectorizer = HashingTfidfVectorizer.from_idf(artifacts.idf, **params)
+    else:
+        vectorizer = FlatVectorizer(artifacts)
+    return LinearEnsemble.from_artifacts(artifacts), vectorizer, artifacts.source_version
+
+
+def verify_flat(model, vectorizer, flat_model, flat_vectorizer, documents, atol=1e-9):
+    """Largest absolute probability difference between the sklearn and flat paths.
+
+    Raises AssertionError when it exceeds `atol`.
+    """
+    expected = model.predict_proba(vectorizer.transform(documents))
+    actual = flat_model.predict_proba(flat_vectorizer.transform(documents))
+    difference = float(np.max(np.abs(expected - actual))) if len(documents) else 0.0
+    if difference > atol:
+        raise AssertionError(
+            f"Flat model diverges from sklearn: max |Δp| = {difference:.3g} > {atol:g}"
+        )
+    return difference
@@ -0,0 +1,146 @@
+"""
+Feature-hashing TF-IDF pipeline with an incrementally computed IDF.
+
+`TfidfVectorizer(ngram_range=(1, 3), max_features=5000)` keeps every
+candidate n-gram of the corpus in a Python dict during `fit_transform` before
+pruning, so training memory grows with the corpus. Here n-grams are hashed
+straight to one of `n_features` columns (sklearn `HashingVectorizer`,
+murmurhash in C), and document frequencies are accumulated in a fixed-size
+array batch by batch:
+
+    vectorizer = HashingTfidfVectorizer(n_features=2**18)
+    for batch in batches:
+        vectorizer.partial_fit(batch)
+    X = vectorizer.transform(documents)
+
+Memory is bounded by `n_features` whatever the corpus size, and serving does
+not look up n-grams in a vocabulary dict. The output matches
+`TfidfTransformer(sublinear_tf=True)` applied to the hashed counts.
+"""
+
+import itertools
+
+import numpy as np
+
+DEFAULT_N_FEATURES = 2**18
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class HashingTfidfVectorizer:
+    """Hashed n-gram counts weighted by a smoothed IDF learned incrementally.
+
+    `min_df` (document count) and `max_df` (document proportion) prune
+    columns by zeroing their IDF, like the vocabulary-based pipeline does.
+    """
+
+    kind = "hashing"
+
+    def __init__(
+        self,
+        n_features=DEFAULT_N_FEATURES,
+        ngram_range=(1, 3),
+        min_df=1,
+        max_df=1.0,
+        sublinear_tf=True,
+        norm="l2",
+        token_pattern=TOKEN_PATTERN,
+        lowercase=True,
+    ):
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+        self.min_df = min_df
+        self.max_df = max_df
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+
+        self.n_documents_ = 0
+        self.document_counts_ = np.zeros(self.n_features, dtype=np.int64)
+        self._idf = None
+        self._hashing_vectorizer = None
+
+    @property
+    def _hasher(self):
+        """sklearn HashingVectorizer, built on first use"""
+        if getattr(self, "_hashing_vectorizer", None) is None:
+            # Import différé : sklearn double le temps d'import de ml.model
+            from sklearn.feature_extraction.text import HashingVectorizer
+
+            self._hashing_vectorizer = HashingVectorizer(
+                n_features=self.n_features,
+                ngram_range=self.ngram_range,
+                token_pattern=self.token_pattern,
+                lowercase=self.lowercase,
+                alternate_sign=False,
+                norm=None,
+                dtype=np.float64,
+            )
+        return self._hashing_vectorizer
+
+    @classmethod
+    def from_idf(cls, idf, **params):
+        """Serving-only instance with a precomputed IDF (see `ml/flat_model.py`)"""
+        vectorizer = cls(n_features=len(idf), **params)
+        vectorizer.document_counts_ = None
+        vectorizer._idf = idf
+        return vectorizer
+
+    def counts(self, raw_documents):
+        """Hashed raw n-gram counts (CSR)"""
+        return self._hasher.transform(raw_documents)
+
+    def partial_fit(self, raw_documents):
+        """Add one batch of documents to the document frequencies"""
+        X = self.counts(raw_documents)
+        self.document_counts_ += np.bincount(X.indices, minlength=self.n_features)
+        self.n_documents_ += X.shape[0]
+        self._idf = None
+        return self
+
+    def fit(self, raw_documents, batch_size=10000):
+        """Learn the IDF from any iterable of documents, one batch at a time"""
+        documents = iter(raw_documents)
+        while batch := list(itertools.islice(documents, batch_size)):
+            self.partial_fit(batch)
+        return self
+
+    @property
+    def idf_(self):
+        if self._idf is None:
+            n = self.n_documents_
+            df = self.document_counts_
+            idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+
+            max_count = self.max_df if isinstance(self.max_df, int) else self.max_df * n
+            idf[(df < self.min_df) | (df > max_count)] = 0.0
+            self._idf = idf
+        return self._idf
+
+    def transform(self, raw_documents):
+        X = self.counts(raw_documents)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        X.data *= self.idf_[X.indices]
+        X.eliminate_zeros()
+
+        if self.norm is not None:
+            from sklearn.preprocessing import normalize
+
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+    def fit_transform(self, raw_documents):
+        raw_documents = list(raw_documents)
+        return self.fit(raw_documents).transform(raw_documents)
+
+    def get_params(self):
+        """Parameters needed to rebuild the serving transform"""
+        return {
+            "ngram_range": list(self.ngram_range),
+            "token_pattern": self.token_pattern,
+            "lowercase": self.lowercase,
+            "sublinear_tf": self.sublinear_tf,
+            "norm": self.norm,
+        }
@@ -0,0 +1,237 @@
+"""
+In-process metrics of the scoring hot path, rendered in the Prometheus text
+exposition format (served on `/metrics`).
+
+`ml/model.py` records the duration of each scoring stage (preprocess,
+near_duplicate, vectorize, inference, explain) for every scoring call, the
+end-to-end latency and outcome (scored, cached, near_duplicate, error) of
+`predict_fake_news` / `predict_batch`, and the size of the submitted texts.
+An observation is a bucket search and a few unlocked increments, so the
+overhead is well under a microsecond per call; cache statistics are read
+only when `/metrics` is scraped.
+
+Stage durations are also added to the timings collected for the current
+request, if any (`collect_timings`), which `detector.middleware` reports in a
+`Server-Timing` header; that part does not depend on `ML_METRICS`.
+
+Metrics are kept per process: with several gunicorn workers, each scrape
+reports the worker that answered it.
+
+Configuration (environment variables):
+    ML_METRICS   1 (default) records and serves the metrics, 0 turns both off
+"""
+
+import contextvars
+import math
+import os
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.environ.get("ML_METRICS", "1").lower() not in ("0", "false", "off", "no")
+
+# Secondes : de 50 µs (inférence d'une ligne) à 10 s (gros lot)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Caractères soumis, avant troncature
+SIZE_BUCKETS = (100, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 1_000_000)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """Monotonic counter, one series per label values"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        # Unlocked increments: a lost update only skews the statistics
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def clear(self):
+        self._values.clear()
+
+    def samples(self):
+        for labelvalues, value in sorted(self._values.items()):
+            yield self.name + "_total", tuple(zip(self.labelnames, labelvalues)), value
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, one series per label values"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+
+    def observe(self, value, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series.setdefault(
+                labelvalues, _HistogramSeries(len(self.buckets) + 1)
+            )
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def count(self, *labelvalues):
+        series = self._series.get(labelvalues)
+        return sum(series.counts) if series is not None else 0
+
+    def clear(self):
+        self._series.clear()
+
+    def samples(self):
+        for labelvalues, series in sorted(self._series.items()):
+            labels = tuple(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series.counts):
+                cumulative += count
+                yield self.name + "_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield self.name + "_count", labels, cumulative
+            yield self.name + "_sum", labels, series.sum
+
+
+stage_seconds = Histogram(
+    "fakenews_stage_duration_seconds",
+    "Duration of one scoring stage for one scoring call (a call may score a batch).",
+    LATENCY_BUCKETS,
+    ("stage",),
+)
+prediction_seconds = Histogram(
+    "fakenews_prediction_duration_seconds",
+    "End-to-end latency of predict_fake_news (single) and predict_batch (batch) calls.",
+    LATENCY_BUCKETS,
+    ("entry",),
+)
+predictions = Counter(
+    "fakenews_predictions",
+    "Texts answered, by outcome (scored, cached, near_duplicate, error).",
+    ("outcome",),
+)
+input_chars = Histogram(
+    "fakenews_input_chars",
+    "Length in characters of the submitted texts, before truncation.",
+    SIZE_BUCKETS,
+)
+truncated = Counter("fakenews_truncated_inputs", "Texts reduced to their head and tail windows.")
+
+REGISTRY = (stage_seconds, prediction_seconds, predictions, input_chars, truncated)
+
+
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Collect the {stage: seconds} durations spent in this context (one request)"""
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def add_timing(stage, seconds):
+    """Add `seconds` to `stage` in the timings being collected, if any"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def observe_stages(timings):
+    """Record the {stage: seconds} durations of one scoring call"""
+    collected = _request_timings.get()
+    if collected is not None:
+        for stage, seconds in timings.items():
+            collected[stage] = collected.get(stage, 0.0) + seconds
+    if METRICS_ENABLED:
+        for stage, seconds in timings.items():
+            stage_seconds.observe(seconds, stage)
+
+
+def observe_inputs(reports):
+    """Record the truncation reports of the submitted texts"""
+    if METRICS_ENABLED:
+        for report in reports:
+            input_chars.observe(report["original_chars"])
+            if report["truncated"]:
+                truncated.inc()
+
+
+def observe_prediction(entry, seconds, results):
+    """Record one predict call and the outcome of each of its texts"""
+    if METRICS_ENABLED:
+        prediction_seconds.observe(seconds, entry)
+        for outcome in results:
+            predictions.inc(outcome)
+
+
+def _family_lines(name, kind, documentation, samples):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return lines
+
+
+def render(extra=()):
+    """Prometheus text exposition of the registry plus the `extra` families.
+
+    `extra` holds ``(name, kind, documentation, [(labels, value), ...])``
+    tuples computed by the caller at scrape time (cache statistics...), with
+    `labels` a tuple of (name, value) pairs.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(
+            _family_lines(metric.name, metric.kind, metric.documentation, metric.samples())
+        )
+    for name, kind, documentation, values in extra:
+        sample_name = name + "_total" if kind == "counter" else name
+        samples = [(sample_name, labels, value) for labels, value in values]
+        lines.extend(_family_lines(name, kind, documentation, samples))
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Forget every observation (used by the tests)"""
+    for metric in REGISTRY:
+        metric.clear()
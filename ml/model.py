@@ -1,147 +1,913 @@
 import os
+import atexit
+import hashlib
+import itertools
+import multiprocessing
+import random
+import threading
+import time
+from collections import namedtuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import joblib
-import re
+import numpy as np
 from pathlib import Path
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+
+from ml import metrics
+from ml.cache import create_prediction_cache, prediction_key
+from ml.engine import LinearEnsemble
+from ml.experiments import ModelComparison, ShadowScorer
+from ml.explain import explainer_for
+from ml.flat_model import load_flat
+from ml.near_duplicates import NearDuplicateIndex
+from ml.registry import RegistryError, active_artifacts, version_artifacts
+from ml.registry import active_version as registry_active_version
+from ml.truncation import truncate_text
+from ml.resources import load_lemmatizer, load_stop_words, resource_sources
+from ml.normalizer import (
+    NORMALIZER_VERSION,
+    lemma_cache_stats,
+    make_lemma_cache,
+    normalize_text,
+)
 
 # Configuration des chemins
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_PATH = BASE_DIR / "ml" / "models" / "fake_news_model.pkl"
 VECTORIZER_PATH = BASE_DIR / "ml" / "models" / "tfidf_vectorizer.pkl"
+FLAT_MODEL_PATH = BASE_DIR / "ml" / "models" / "fake_news_model.flat"
+
+# auto : export à plat (mmap) s'il correspond aux pickles, sinon pickles
+# flat : export à plat même sans pickles ; pickle : joblib uniquement
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "auto")
+
+# Backend d'exécution du scoring : inline (thread de la requête), thread
+# (pool de threads) ou process (pool de processus, modèles préchargés)
+EXECUTION_BACKEND = os.environ.get("ML_EXECUTION_BACKEND", "inline")
+EXECUTION_WORKERS = int(os.environ.get("ML_EXECUTION_WORKERS", "0")) or os.cpu_count() or 1
+EXECUTION_START_METHOD = os.environ.get("ML_EXECUTION_START_METHOD", "forkserver")
+# Taille minimale des sous-lots répartis entre processus
+PROCESS_CHUNK_SIZE = 8
+
+# Rechargement à chaud : intervalle de lecture du manifeste du registre
+# (secondes, 0 = pas de surveillance ; voir ml/registry.py)
+REGISTRY_POLL_SECONDS = float(os.environ.get("ML_REGISTRY_POLL", "0"))
+
+# Modèle candidat (version du registre) évalué sur le trafic réel :
+# shadow (score en arrière-plan, comparé) ou ab (répond à la place de l'actif)
+# pour une fraction ML_CANDIDATE_FRACTION des appels à predict_fake_news
+CANDIDATE_VERSION = os.environ.get("ML_CANDIDATE_VERSION", "")
+CANDIDATE_MODE = os.environ.get("ML_CANDIDATE_MODE", "shadow")
+CANDIDATE_FRACTION = float(os.environ.get("ML_CANDIDATE_FRACTION", "0.1"))
+
+# Quasi-doublons (MinHash/LSH, voir ml/near_duplicates.py) : un article proche
+# d'un article déjà analysé reçoit son verdict sans vectorisation ni inférence
+NEAR_DUPLICATES = os.environ.get("ML_NEAR_DUPLICATES", "0") == "1"
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("ML_NEAR_DUPLICATE_THRESHOLD", "0.8"))
+NEAR_DUPLICATE_SIZE = int(os.environ.get("ML_NEAR_DUPLICATE_SIZE", "50000"))
+NEAR_DUPLICATE_PATH = Path(
+    os.environ.get("ML_NEAR_DUPLICATE_PATH", BASE_DIR / "ml" / ".cache" / "near_duplicates.npz")
+)
+
+# Explications (predict_*(..., explain=True)) : n-grammes les plus influents
+# vers chaque classe, calculés sur la ligne TF-IDF déjà vectorisée
+EXPLANATION_TOP_K = int(os.environ.get("ML_EXPLANATION_TOP_K", "10"))
+
+# A loaded model/vectorizer pair; scoring reads `_active` once per call, so
+# a reload never pairs one version's model with another's vectorizer
+LoadedModels = namedtuple(
+    "LoadedModels", "model vectorizer version fingerprint format features"
+)
 
 # Variables globales pour les modèles
+_active = None
 model = None
 vectorizer = None
-lemmatizer = None
+model_format = None  # "flat" or "pickle" once loaded
+feature_pipeline = None  # "vocabulary" (TF-IDF) or "hashing" once loaded
+lemmatize = None  # noun lemmatizer behind a bounded LRU cache
 stop_words = None
+model_version = None  # hash of the artifacts, part of the prediction cache key
+active_version = None  # registry version (or artifact hash) reported with predictions
+prediction_cache = None
+_prediction_cache_ready = False
 
+# Chargement paresseux : les artefacts sont chargés au premier usage (ou par
+# warm_up), jamais à l'import du module.
+_load_lock = threading.RLock()
+_load_attempted = False
 
-def initialize_nltk():
-    """Initialize NLTK and download necessary resources"""
-    try:
-        nltk.data.path.append(str(BASE_DIR / "nltk_data"))
-        nltk.download("stopwords", quiet=True)
-        nltk.download("wordnet", quiet=True)
-        nltk.download("omw-1.4", quiet=True)
-    except Exception as e:
-        print(f"Warning: Could not download NLTK resources: {e}")
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
 
+_reload_lock = threading.Lock()
+_watcher = None
+_watcher_pid = None
 
-def load_models():
-    """Load ML models and vectorizer"""
-    global model, vectorizer, lemmatizer, stop_words
+_candidate = None  # LoadedModels of the candidate, if any
+_candidate_mode = CANDIDATE_MODE
+_candidate_fraction = CANDIDATE_FRACTION
+_comparison = None
+_shadow = None
+_in_scoring_process = False  # pool workers never load the candidate
+
+_near_duplicates = None
+_near_duplicates_pid = None
+_near_duplicates_lock = threading.Lock()
+
+
+def initialize_text_resources():
+    """Resolve stop words and the lemmatizer without network access.
 
+    See `ml/resources.py`: local NLTK data or the bundled files are used, and
+    NLTK downloads only happen when NLTK_DOWNLOAD=1.
+    """
+    global lemmatize, stop_words
+
+    if stop_words is None:
+        stop_words = load_stop_words()
+    if lemmatize is None:
+        lemmatize = make_lemma_cache(load_lemmatizer())
+
+
+def _artifact_paths(fallback=True):
+    """Return (registry version or None, model, vectorizer and flat paths) to load.
+
+    An unusable registry falls back to `ml/models/` when `fallback` is true and
+    raises `RegistryError` otherwise.
+    """
     try:
-        # Initialiser NLTK
-        initialize_nltk()
+        registered = active_artifacts()
+    except RegistryError as e:
+        if not fallback:
+            raise
+        print(f"⚠️  Model registry unusable, loading {MODEL_PATH.parent}: {e}")
+        registered = None
+
+    if registered is None:
+        return None, MODEL_PATH, VECTORIZER_PATH, FLAT_MODEL_PATH
+    version, paths = registered
+    return version, paths["model"], paths["vectorizer"], paths["flat"]
+
+
+def _load_artifacts(model_path, vectorizer_path, flat_path):
+    """Load one model/vectorizer pair without publishing it; None on failure"""
+    source_version = None
+    if model_path.exists() and vectorizer_path.exists():
+        source_version = artifact_version(model_path, vectorizer_path)
+
+    # Export à plat : pages partagées entre processus, pas de pickle
+    if MODEL_FORMAT != "pickle" and flat_path.exists():
+        flat_model, flat_vectorizer, flat_version = load_flat(flat_path)
+        if MODEL_FORMAT == "flat" or flat_version == source_version:
+            print("✓ Flat model and vectorizer loaded (memory-mapped)")
+            fingerprint = flat_version or source_version
+            return LoadedModels(
+                flat_model,
+                flat_vectorizer,
+                fingerprint,
+                fingerprint,
+                "flat",
+                getattr(flat_vectorizer, "kind", "vocabulary"),
+            )
+        print("⚠️  Flat export is out of date, using the pickled artifacts")
+
+    # Charger le modèle
+    if model_path.exists():
+        new_model = joblib.load(model_path)
+        print("✓ Model loaded successfully")
+    else:
+        print(f"✗ Modèle non trouvé: {model_path}")
+        return None
+
+    # Charger le vectorizer
+    if vectorizer_path.exists():
+        new_vectorizer = joblib.load(vectorizer_path)
+        print("✓ Vectorizer loaded successfully")
+    else:
+        print(f"✗ Vectorizer non trouvé: {vectorizer_path}")
+        return None
+
+    # Moteur linéaire compacté : un seul produit au lieu de 5 membres
+    try:
+        new_model = LinearEnsemble.from_calibrated(new_model)
+    except (AttributeError, ValueError) as e:
+        print(f"⚠️  Linear engine unavailable, using sklearn predict_proba: {e}")
+
+    return LoadedModels(
+        new_model,
+        new_vectorizer,
+        source_version,
+        source_version,
+        "pickle",
+        getattr(new_vectorizer, "kind", "vocabulary"),
+    )
 
-        # Initialiser le lemmatizer et les stop words
-        lemmatizer = WordNetLemmatizer()
-        stop_words = set(stopwords.words("english"))
 
-        # Charger le modèle
-        if MODEL_PATH.exists():
-            model = joblib.load(MODEL_PATH)
-            print("✓ Model loaded successfully")
-        else:
-            print(f"✗ Modèle non trouvé: {MODEL_PATH}")
+def _publish(loaded):
+    """Make `loaded` the pair used by every later prediction"""
+    global _active, model, vectorizer, model_version, model_format, feature_pipeline
+    global active_version
+
+    with _load_lock:
+        _active = loaded
+        model, vectorizer = loaded.model, loaded.vectorizer
+        model_version = loaded.fingerprint
+        model_format = loaded.format
+        feature_pipeline = loaded.features
+        active_version = loaded.version
+
+
+def load_models():
+    """Load ML models and vectorizer.
+
+    The active version of the model registry is loaded when there is one
+    (`ml/registry.py`), otherwise the artifacts of `ml/models/`. They are
+    loaded into locals and published together at the end, so concurrent
+    readers never see a model without its vectorizer.
+    """
+    global _load_attempted
+
+    with _load_lock:
+        _load_attempted = True
+        try:
+            # Initialiser le lemmatizer et les stop words (sans réseau)
+            initialize_text_resources()
+
+            version, *paths = _artifact_paths()
+            loaded = _load_artifacts(*paths)
+            if loaded is None:
+                return False
+            _publish(loaded._replace(version=version or loaded.fingerprint))
+            if CANDIDATE_VERSION and _candidate is None and not _in_scoring_process:
+                load_candidate(CANDIDATE_VERSION)
+            return True
+
+        except Exception as e:
+            print(f"✗ Erreur lors du chargement des modèles: {e}")
             return False
 
-        # Charger le vectorizer
-        if VECTORIZER_PATH.exists():
-            vectorizer = joblib.load(VECTORIZER_PATH)
-            print("✓ Vectorizer loaded successfully")
-        else:
-            print(f"✗ Vectorizer non trouvé: {VECTORIZER_PATH}")
+
+def _warm_up(loaded):
+    """Score a short text with `loaded`; raises ValueError if the pair cannot predict.
+
+    `_score_texts` reports failures in its results rather than raising, so a
+    mismatched model/vectorizer pair is only caught by looking at the result.
+    """
+    result = _score_texts(["warm up"], loaded=loaded)[0]
+    if "error" in result:
+        raise ValueError(f"warm-up prediction failed: {result['error']}")
+    if result["label"] not in ("Fake", "Real"):
+        raise ValueError(f"warm-up prediction returned label {result['label']!r}")
+
+
+def reload_models(force=False):
+    """Load the active registry version and swap it in without downtime.
+
+    The new pair is loaded and warmed up on the calling thread while requests
+    keep being served by the current one, then both references are replaced
+    at once. Returns True when a new version was activated; on failure the
+    current version stays active. The process pool (if any) is restarted so
+    its workers load the new version too.
+    """
+    with _reload_lock:
+        try:
+            version, *paths = _artifact_paths(fallback=False)
+            if not force and version is not None and version == active_version:
+                return False
+
+            initialize_text_resources()
+            loaded = _load_artifacts(*paths)
+            if loaded is None:
+                print(f"✗ Reload failed, keeping model version {active_version}")
+                return False
+            loaded = loaded._replace(version=version or loaded.fingerprint)
+            _warm_up(loaded)
+        except Exception as e:
+            print(f"✗ Reload failed, keeping model version {active_version}: {e}")
             return False
 
+        previous = active_version
+        _publish(loaded)
+        shutdown_executor()
+        print(f"✓ Model version {loaded.version} active (was {previous})")
         return True
 
+
+def _watch_registry(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            version = registry_active_version()
+        except RegistryError as e:
+            print(f"⚠️  Model registry unreadable: {e}")
+            continue
+        if version is not None and version != active_version and models_loaded():
+            reload_models()
+
+
+def start_registry_watcher(interval=None):
+    """Reload the models whenever the registry's active version changes.
+
+    Polls the manifest every `interval` seconds (ML_REGISTRY_POLL by default)
+    from a daemon thread; one watcher per process, restarted after a fork.
+    Returns the thread, or None when polling is disabled.
+    """
+    global _watcher, _watcher_pid
+
+    interval = REGISTRY_POLL_SECONDS if interval is None else interval
+    if interval <= 0:
+        return None
+    with _reload_lock:
+        if _watcher is None or _watcher_pid != os.getpid():
+            _watcher = threading.Thread(
+                target=_watch_registry, args=(interval,), name="ml-registry", daemon=True
+            )
+            _watcher.start()
+            _watcher_pid = os.getpid()
+    return _watcher
+
+
+def _reset_reload_lock():
+    """Fork handler: a child never inherits a reload lock held by another thread"""
+    global _reload_lock
+    _reload_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_reload_lock)
+
+
+def model_version_info():
+    """Active model version and where it comes from"""
+    try:
+        registered = registry_active_version()
+    except RegistryError:
+        registered = None
+    return {
+        "active": active_version,
+        "source": "registry" if registered is not None else "ml/models",
+        "registry_active": registered,
+        "watch_interval": REGISTRY_POLL_SECONDS,
+    }
+
+
+def _timed_score(text, loaded, explain=False):
+    """Return (scoring seconds, result) of `text` on `loaded`.
+
+    The explanation stage is left out of the seconds, so both arms of a
+    comparison are timed on scoring alone.
+    """
+    timings = {}
+    start = time.perf_counter()
+    result = _score_texts([text], timings, loaded=loaded, explain=explain)[0]
+    return time.perf_counter() - start - timings.get("explain", 0.0), result
+
+
+def load_candidate(version, mode=None, fraction=None):
+    """Keep registry `version` resident next to the active model.
+
+    A `fraction` of the `predict_fake_news` calls is answered by it (mode
+    "ab") or also scored by it in the background and compared (mode
+    "shadow"). Replaces any previous candidate and its statistics; returns
+    False (keeping the previous candidate) when the version cannot be loaded.
+    """
+    global _candidate, _candidate_mode, _candidate_fraction, _comparison, _shadow
+
+    mode = mode or CANDIDATE_MODE
+    fraction = CANDIDATE_FRACTION if fraction is None else fraction
+    if mode not in ("shadow", "ab"):
+        raise ValueError(f"Unknown candidate mode: {mode!r}")
+
+    try:
+        paths = version_artifacts(version)
+        initialize_text_resources()
+        loaded = _load_artifacts(paths["model"], paths["vectorizer"], paths["flat"])
+        if loaded is None:
+            return False
+        loaded = loaded._replace(version=version)
+        _warm_up(loaded)
     except Exception as e:
-        print(f"✗ Erreur lors du chargement des modèles: {e}")
+        print(f"✗ Candidate {version} not loaded: {e}")
         return False
 
+    comparison = ModelComparison()
+    previous = _shadow
+    with _load_lock:
+        _comparison = comparison
+        _shadow = ShadowScorer(lambda text: _timed_score(text, loaded), comparison)
+        _candidate_mode, _candidate_fraction = mode, fraction
+        _candidate = loaded
+    if previous is not None:
+        previous.close()
+    print(f"✓ Candidate model {version} loaded ({mode}, {fraction:.0%} of requests)")
+    return True
+
+
+def clear_candidate():
+    """Stop evaluating the candidate and release it"""
+    global _candidate, _shadow
+
+    with _load_lock:
+        _candidate, shadow, _shadow = None, _shadow, None
+    if shadow is not None:
+        shadow.close()
+
+
+def candidate_info():
+    """Candidate version, routing and its comparison with the active model"""
+    candidate, comparison, shadow = _candidate, _comparison, _shadow
+    if candidate is None:
+        return {"version": None}
+    return {
+        "version": candidate.version,
+        "mode": _candidate_mode,
+        "fraction": _candidate_fraction,
+        **comparison.stats(),
+        "shadow_queue": shadow.stats(),
+    }
+
+
+def models_loaded():
+    """True when both the model and the vectorizer are available"""
+    return model is not None and vectorizer is not None
+
+
+def ensure_models_loaded():
+    """Load the artifacts on first use (thread-safe) and report availability.
+
+    Only the first caller pays the loading cost; the others wait on the lock.
+    A failed load is not retried on every request; call `load_models()`
+    explicitly to try again.
+    """
+    if models_loaded():
+        return True
+
+    with _load_lock:
+        if not _load_attempted and not load_models():
+            print(
+                "⚠️  Warning: Models could not be loaded. The application may not work correctly."
+            )
+    return models_loaded()
+
+
+def warm_up(background=False):
+    """Load the artifacts and run one prediction so the first request is fast.
+
+    With `background=True` the work happens in a daemon thread and the call
+    returns immediately (requests arriving meanwhile wait on the load lock).
+    """
+    if background:
+        thread = threading.Thread(target=warm_up, name="ml-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    # Scoring inline : aucun pool n'est créé ici (gunicorn préchargé forke ensuite),
+    # ni d'index des quasi-doublons (propre à chaque processus qui sert)
+    if ensure_models_loaded():
+        _score_texts(["warm up"], loaded=_active)
+    return None
+
+
+def artifact_version(*paths):
+    """Short content hash of the artifact files and the normalizer version"""
+    digest = hashlib.blake2b(NORMALIZER_VERSION.encode(), digest_size=8)
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def get_prediction_cache():
+    """Return the configured prediction cache (created on first use), or None"""
+    global prediction_cache, _prediction_cache_ready
+
+    if not _prediction_cache_ready:
+        try:
+            prediction_cache = create_prediction_cache()
+        except Exception as e:
+            print(f"Warning: prediction cache disabled: {e}")
+            prediction_cache = None
+        _prediction_cache_ready = True
+    return prediction_cache
+
+
+def prediction_cache_info():
+    """Hit/miss counters of the prediction cache"""
+    cache = get_prediction_cache()
+    if cache is None:
+        return {"backend": "none"}
+    return cache.stats()
+
+
+def get_near_duplicate_index():
+    """Near-duplicate index (loaded from disk on first use), or None if disabled.
+
+    The index belongs to the process that built it: after a fork, the child
+    loads its own instead of adding to the parent's copy.
+    """
+    global _near_duplicates, _near_duplicates_pid
+
+    if not NEAR_DUPLICATES:
+        return None
+    if _near_duplicates is not None and _near_duplicates_pid == os.getpid():
+        return _near_duplicates
+    with _near_duplicates_lock:
+        if _near_duplicates is None or _near_duplicates_pid != os.getpid():
+            index = NearDuplicateIndex(
+                threshold=NEAR_DUPLICATE_THRESHOLD, max_entries=NEAR_DUPLICATE_SIZE
+            )
+            if NEAR_DUPLICATE_PATH.exists():
+                try:
+                    count = index.load(NEAR_DUPLICATE_PATH)
+                    print(f"✓ Near-duplicate index: {count} entries loaded")
+                except Exception as e:
+                    print(f"⚠️  Near-duplicate index not loaded: {e}")
+            _near_duplicates, _near_duplicates_pid = index, os.getpid()
+    return _near_duplicates
+
+
+def save_near_duplicate_index():
+    """Persist the near-duplicate index of this process, if it was used.
+
+    Only the process that built the index saves it: a parent exiting after
+    its forked workers would otherwise overwrite their entries with its own.
+    """
+    if _near_duplicates is None or _near_duplicates_pid != os.getpid():
+        return
+    if not len(_near_duplicates):
+        return
+    try:
+        _near_duplicates.save(NEAR_DUPLICATE_PATH)
+    except Exception as e:
+        print(f"⚠️  Near-duplicate index not saved: {e}")
+
+
+atexit.register(save_near_duplicate_index)
+
+
+def near_duplicate_info():
+    """Size and hit/miss counters of the near-duplicate index"""
+    if not NEAR_DUPLICATES:
+        return {"enabled": False}
+    return {"enabled": True, **get_near_duplicate_index().stats()}
+
 
 def preprocess_text(text):
     """Preprocess text the same way as during training.
 
     This function is robust to being called before models are loaded by
-    initializing `lemmatizer` and `stop_words` lazily.
+    initializing `lemmatize` and `stop_words` lazily.
     """
-    global lemmatizer, stop_words
-
     if not isinstance(text, str) or not text.strip():
         return ""
 
     # Ensure local resources are initialized
-    if lemmatizer is None:
-        lemmatizer = WordNetLemmatizer()
-    if stop_words is None:
-        try:
-            stop_words = set(stopwords.words("english"))
-        except Exception:
-            # Fallback to an empty set if NLTK resources are missing
-            stop_words = set()
+    if lemmatize is None or stop_words is None:
+        initialize_text_resources()
 
-    # Remove HTML tags
-    text = re.sub(r"<.*?>", " ", text)
+    return normalize_text(text, stop_words, lemmatize)
 
-    # Remove URLs
-    text = re.sub(r"http\S+|www\S+", " ", text)
 
-    # Keep letters and whitespace only
-    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+def lemma_cache_info():
+    """Hit/miss counters of the lemma cache used by `preprocess_text`"""
+    return lemma_cache_stats(lemmatize)
 
-    # Collapse whitespace and lowercase
-    text = re.sub(r"\s+", " ", text).strip().lower()
 
-    # Tokenize, remove stop words, lemmatize
-    words = [w for w in text.split() if w not in stop_words]
-    words = [lemmatizer.lemmatize(w) for w in words]
+def text_resources_info():
+    """Where the stop words and the lemmatizer were loaded from"""
+    return dict(resource_sources)
 
-    return " ".join(words)
 
+def _label_from_probabilities(probabilities, classes):
+    """Return (labels, probabilities of the predicted class) from predict_proba output"""
+    indices = probabilities.argmax(axis=1)
+    classes = classes[indices]
+    labels = ["Fake" if c == 1 else "Real" for c in classes]
+    return labels, probabilities[np.arange(len(indices)), indices]
 
-def predict_fake_news(text):
-    """Predict if the text is fake news"""
-    if model is None or vectorizer is None:
-        return {
-            "label": "Erreur",
-            "probability": 0.0,
-            "error": "Model or vectorizer not loaded",
-        }
-
-    try:
-        # Prétraitement du texte
-        processed_text = preprocess_text(text)
 
-        # Vectorisation
-        text_vectorized = vectorizer.transform([processed_text])
+def _init_scoring_process():
+    """Process-pool initializer: load the artifacts once per child"""
+    global _executor, _in_scoring_process
+    _executor = None
+    _in_scoring_process = True
+    ensure_models_loaded()
 
-        # Prédiction
-        prediction = model.predict(text_vectorized)[0]
-        probabilities = model.predict_proba(text_vectorized)[0]
 
-        # Probabilité de la classe prédite
-        probability = probabilities[prediction]
+def get_executor():
+    """Executor of the configured backend (created on first use), or None for inline.
 
-        # Conversion en label
-        label = "Fake" if prediction == 1 else "Real"
+    The pool is recreated after a fork, so a pool created before gunicorn
+    forks its workers is never shared.
+    """
+    global _executor, _executor_pid
+
+    if EXECUTION_BACKEND == "inline":
+        return None
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            if EXECUTION_BACKEND == "thread":
+                _executor = ThreadPoolExecutor(
+                    max_workers=EXECUTION_WORKERS, thread_name_prefix="ml-score"
+                )
+            elif EXECUTION_BACKEND == "process":
+                _executor = ProcessPoolExecutor(
+                    max_workers=EXECUTION_WORKERS,
+                    mp_context=multiprocessing.get_context(EXECUTION_START_METHOD),
+                    initializer=_init_scoring_process,
+                )
+            else:
+                raise ValueError(f"Unknown execution backend: {EXECUTION_BACKEND!r}")
+            _executor_pid = os.getpid()
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the scoring pool of this process, if any"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+atexit.register(shutdown_executor)
+
+
+def execution_backend_info():
+    """Configured scoring backend and pool size"""
+    workers = 1 if EXECUTION_BACKEND == "inline" else EXECUTION_WORKERS
+    return {"backend": EXECUTION_BACKEND, "workers": workers}
+
+
+def _score_texts(texts, timings=None, loaded=None, explain=False):
+    """Preprocess, vectorize and score `texts` in one pass (no cache, no backend).
+
+    When a `timings` dict is given, the duration of each stage is stored in it.
+    `loaded` defaults to the active model/vectorizer pair; only the active pair
+    uses the near-duplicate index, whose hits skip vectorization and inference.
+    With `explain`, each scored result also gets the top n-grams toward each
+    class from the pair that scored it (see `ml/explain.py`); near-duplicate
+    hits have no TF-IDF row and keep only their `"near_duplicate"` flag.
+    """
+    index = get_near_duplicate_index() if loaded is None else None
+    loaded = loaded or _active
+    try:
+        start = time.perf_counter()
+        processed_texts = [preprocess_text(text) for text in texts]
+        preprocessed = time.perf_counter()
+
+        signatures = matches = [None] * len(texts)
+        if index is not None:
+            signatures = [index.signature(processed.split()) for processed in processed_texts]
+            matches = [index.lookup(signature, loaded.fingerprint) for signature in signatures]
+        pending = [i for i, match in enumerate(matches) if match is None]
+        looked_up = time.perf_counter()
+
+        labels, probability = [], []
+        if pending:
+            matrix = loaded.vectorizer.transform([processed_texts[i] for i in pending])
+        vectorized = time.perf_counter()
+        if pending:
+            probabilities = loaded.model.predict_proba(matrix)
+            labels, probability = _label_from_probabilities(probabilities, loaded.model.classes_)
+        scored = time.perf_counter()
+    except Exception as e:
+        return [{"label": "Erreur", "probability": 0.0, "error": str(e)} for _ in texts]
 
-        return {
+    explanations = [None] * len(pending)
+    if explain and pending:
+        try:
+            explainer = explainer_for(loaded.model, loaded.vectorizer)
+            explanations = [
+                explainer.explain(matrix, row, processed_texts[i], EXPLANATION_TOP_K)
+                for row, i in enumerate(pending)
+            ]
+        except Exception as e:
+            print(f"⚠️  Explanations unavailable: {e}")
+    explained = time.perf_counter()
+
+    if timings is not None:
+        timings.update(preprocess=preprocessed - start)
+        if index is not None:
+            timings.update(near_duplicate=looked_up - preprocessed)
+        if pending:
+            timings.update(vectorize=vectorized - looked_up, inference=scored - vectorized)
+        if explain and pending:
+            timings.update(explain=explained - scored)
+
+    results = [None] * len(texts)
+    for i, label, p, explanation in zip(pending, labels, probability, explanations):
+        results[i] = {
             "label": label,
-            "probability": float(probability),
-            "processed_text": processed_text,
+            "probability": float(p),
+            "model_version": loaded.version,
+            "processed_text": processed_texts[i],
         }
+        if explanation is not None:
+            results[i]["explanation"] = explanation
+        if index is not None:
+            index.add(signatures[i], loaded.fingerprint, {
+                "label": label,
+                "probability": float(p),
+                "model_version": loaded.version,
+            })
+    for i, match in enumerate(matches):
+        if match is not None:
+            verdict, similarity = match
+            results[i] = {
+                **verdict,
+                "processed_text": processed_texts[i],
+                "near_duplicate": {"similarity": round(similarity, 4)},
+            }
+    return results
+
+
+def _score_texts_timed(texts, explain=False):
+    """Return (results, stage timings), so pool workers report their timings too"""
+    timings = {}
+    return _score_texts(texts, timings, explain=explain), timings
+
+
+def _run_scoring(texts, explain=False, timings=None):
+    """Score `texts` on the configured backend.
+
+    Inline scoring runs on the caller's thread; the thread backend moves it
+    off the request thread; the process backend splits the list across the
+    pool so a batch uses several cores and long articles do not hold the
+    worker's GIL. Stage timings are recorded in this process's metrics, and
+    summed into `timings` when a dict is given.
+    """
+    try:
+        executor = get_executor()
+    except Exception as e:
+        print(f"Warning: execution backend unavailable, scoring inline: {e}")
+        executor = None
 
+    score = partial(_score_texts_timed, explain=explain)
+    try:
+        if executor is None:
+            outputs = [score(texts)]
+        elif EXECUTION_BACKEND == "thread" or len(texts) < 2 * PROCESS_CHUNK_SIZE:
+            outputs = [executor.submit(score, texts).result()]
+        else:
+            chunk_size = max(PROCESS_CHUNK_SIZE, -(-len(texts) // EXECUTION_WORKERS))
+            chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            outputs = list(executor.map(score, chunks))
     except Exception as e:
-        return {"label": "Erreur", "probability": 0.0, "error": str(e)}
+        # Pool cassé (processus tué...) : il sera recréé à la prochaine requête
+        shutdown_executor()
+        return [{"label": "Erreur", "probability": 0.0, "error": str(e)} for _ in texts]
+
+    for _, stages in outputs:
+        metrics.observe_stages(stages)
+        if timings is not None:
+            for stage, seconds in stages.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+    return list(itertools.chain.from_iterable(results for results, _ in outputs))
+
+
+def _outcome(result, cached=False):
+    if "error" in result:
+        return "error"
+    if cached:
+        return "cached"
+    return "near_duplicate" if "near_duplicate" in result else "scored"
+
+
+def _cached_result(cache, key, explain):
+    """Cached prediction for `key`, or None if absent or missing a requested explanation"""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    if not explain:
+        cached.pop("explanation", None)
+    elif "explanation" not in cached:
+        return None
+    return cached
+
+
+def predict_fake_news(text, explain=False):
+    """Predict if the text is fake news.
+
+    With `explain`, the result also lists the n-grams that pushed the
+    prediction toward each class (`"explanation"`, see `ml/explain.py`).
+    """
+    start = time.perf_counter()
+    result, cached = _predict_one(text, explain)
+    metrics.observe_prediction("single", time.perf_counter() - start, [_outcome(result, cached)])
+    return result
 
 
-# Charger les modèles au démarrage du module
-if not load_models():
-    print(
-        "⚠️  Warning: Models could not be loaded. The application may not work correctly."
+def _predict_one(text, explain=False):
+    """Return (result, served from the cache) for `predict_fake_news`"""
+    if not ensure_models_loaded():
+        return {
+            "label": "Erreur",
+            "probability": 0.0,
+            "error": "Model or vectorizer not loaded",
+        }, False
+
+    # Les textes trop longs sont réduits (début + fin) avant tout traitement
+    text, analyzed = truncate_text(text)
+    metrics.observe_inputs([analyzed])
+
+    # Une fraction des appels est servie par le candidat (ab) ou rejouée (shadow)
+    candidate, comparison, shadow = _candidate, _comparison, _shadow
+    arm = None
+    if candidate is not None and random.random() < _candidate_fraction:
+        arm = "candidate" if _candidate_mode == "ab" else "shadow"
+    fingerprint = candidate.fingerprint if arm == "candidate" else model_version
+
+    # Les articles déjà analysés sont servis depuis le cache
+    cache = get_prediction_cache()
+    key = None
+    if cache is not None and isinstance(text, str):
+        key = prediction_key(text, fingerprint)
+        cached = _cached_result(cache, key, explain)
+        if cached is not None:
+            if arm == "shadow":
+                shadow.submit(text, cached)
+            cached["analyzed"] = analyzed
+            return cached, True
+
+    # Prétraitement, vectorisation et prédiction (un seul predict_proba) ;
+    # l'explication vient du modèle qui répond, hors du temps comparé
+    if arm == "candidate":
+        seconds, result = _timed_score(text, candidate, explain)
+    else:
+        timings = {}
+        start = time.perf_counter()
+        result = _run_scoring([text], explain, timings)[0]
+        seconds = time.perf_counter() - start - timings.get("explain", 0.0)
+    if candidate is not None:
+        comparison.record("candidate" if arm == "candidate" else "active", seconds, result)
+    if "error" in result:
+        return result, False
+    if arm == "shadow":
+        shadow.submit(text, result)
+
+    if key is not None:
+        cache.set(key, result)
+    result["analyzed"] = analyzed
+    return result, False
+
+
+def predict_batch(texts, explain=False):
+    """Predict a list of texts in one vectorized pass.
+
+    Texts are truncated like in `predict_fake_news` (see `ml/truncation.py`).
+    Texts found in the prediction cache are answered directly; the others are
+    preprocessed, transformed into a single sparse matrix and scored with one
+    `predict_proba` call (split across the pool with
+    ML_EXECUTION_BACKEND=process). Returns one dict per input text, in order,
+    with the same shape as `predict_fake_news(text, explain)`.
+    """
+    start = time.perf_counter()
+    texts = list(texts)
+    if not ensure_models_loaded():
+        results = [
+            {
+                "label": "Erreur",
+                "probability": 0.0,
+                "error": "Model or vectorizer not loaded",
+            }
+            for _ in texts
+        ]
+        metrics.observe_prediction("batch", time.perf_counter() - start, ["error"] * len(texts))
+        return results
+
+    texts, analyzed = zip(*map(truncate_text, texts)) if texts else ((), ())
+    metrics.observe_inputs(analyzed)
+    results = [None] * len(texts)
+    keys = [None] * len(texts)
+    cache = get_prediction_cache()
+    if cache is not None:
+        for i, text in enumerate(texts):
+            if isinstance(text, str):
+                keys[i] = prediction_key(text, model_version)
+                results[i] = _cached_result(cache, keys[i], explain)
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    scored = _run_scoring([texts[i] for i in pending], explain) if pending else []
+
+    for i, result in zip(pending, scored):
+        results[i] = result
+        if keys[i] is not None and "error" not in result:
+            cache.set(keys[i], result)
+
+    for result, report in zip(results, analyzed):
+        if "error" not in result:
+            result["analyzed"] = report
+
+    computed = set(pending)
+    metrics.observe_prediction(
+        "batch",
+        time.perf_counter() - start,
+        [_outcome(result, i not in computed) for i, result in enumerate(results)],
     )
+    return results
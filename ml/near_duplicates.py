@@ -0,0 +1,245 @@
+"""
+MinHash / LSH index of recently scored articles, to answer near-duplicates.
+
+Aggregators republish the same story with a new headline, a trimmed
+paragraph or tracking junk; the exact prediction cache (`ml/cache.py`) misses
+them and every copy is vectorized and scored again. This index works on the
+token stream produced by `preprocess_text`:
+
+- each document becomes the set of its word 3-shingles, hashed to 64 bits
+  (stable across processes: tokens are hashed with crc32);
+- its MinHash signature uses one-permutation hashing: the shingles are mixed
+  once (multiply-shift), split into `num_perm` bins by their top bits and the
+  minimum of each bin is kept (empty bins borrow the next non-empty one), so
+  two signatures agree on a position with probability close to the Jaccard
+  similarity of the shingle sets, for one hash per shingle instead of
+  `num_perm`;
+- the signature is cut into `bands` bands; documents sharing one band are
+  candidates, and a candidate matches when the estimated similarity reaches
+  `threshold`.
+
+A lookup costs one signature (vectorized numpy) and `bands` dict probes,
+well under a millisecond, instead of the TF-IDF transform and inference.
+Entries are tied to the model fingerprint that produced the verdict, held in
+LRU order and evicted beyond `max_entries`; `save` / `load` persist them to a
+`.npz` file so the index survives restarts.
+"""
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+_MASK32 = np.uint64(0xFFFFFFFF)
+_PRIME = np.uint64(0x100000001B3)
+
+
+def _encode(token):
+    return token.encode("utf-8", "surrogatepass")
+
+
+class NearDuplicateIndex:
+    """Bounded MinHash/LSH index of {signature -> verdict}"""
+
+    def __init__(
+        self,
+        threshold=0.8,
+        max_entries=50000,
+        num_perm=64,
+        bands=16,
+        shingle_size=3,
+        seed=20240601,
+    ):
+        if num_perm & (num_perm - 1) or num_perm % bands:
+            raise ValueError("num_perm must be a power of two and a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift : a impair ; les bits de poids fort choisissent le bin
+        self._a = rng.integers(1, 2**63, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, dtype=np.uint64)
+        self._bin_shift = np.uint64(64 - (num_perm.bit_length() - 1))
+        self._value_shift = np.uint64(32 - (num_perm.bit_length() - 1))
+
+        self._entries = OrderedDict()  # id -> (fingerprint, signature, verdict)
+        self._buckets = {}  # (fingerprint, band, band bytes) -> set of ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Signatures
+
+    def signature(self, tokens):
+        """MinHash signature (uint32 array) of `tokens`, or None if too short"""
+        k = self.shingle_size
+        if len(tokens) < k:
+            return None
+        hashes = np.fromiter(
+            map(zlib.crc32, map(_encode, tokens)), dtype=np.uint64, count=len(tokens)
+        )
+        # Hash 64 bits de chaque k-shingle : combinaison polynomiale des tokens
+        # (les shingles répétés ne changent pas le minimum, inutile de dédoublonner)
+        count = len(tokens) - k + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(k):
+            shingles = shingles * _PRIME + hashes[offset: offset + count]
+        mixed = shingles * self._a + self._b
+        bins = (mixed >> self._bin_shift).astype(np.intp)
+        minima = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        np.minimum.at(minima, bins, mixed)
+        # 32 bits sous ceux du bin
+        signature = ((minima >> self._value_shift) & _MASK32).astype(np.uint32)
+
+        # Densification : un bin vide reprend le bin non vide suivant (circulaire),
+        # décalé de la distance pour ne pas coïncider par hasard avec lui
+        filled = np.flatnonzero(minima != np.iinfo(np.uint64).max)
+        if len(filled) < self.num_perm:
+            positions = np.arange(self.num_perm)
+            following = filled[np.searchsorted(filled, positions) % len(filled)]
+            distance = (following - positions) % self.num_perm
+            signature = signature[following] + (distance * 0x9E3779B1).astype(np.uint32)
+        return signature
+
+    def _band_keys(self, fingerprint, signature):
+        rows = self.rows
+        return [
+            (fingerprint, band, signature[band * rows: (band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    # Lookup / insertion
+
+    def lookup(self, signature, fingerprint):
+        """Return (verdict, estimated similarity) of the closest match, or None"""
+        if signature is None:
+            return None
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(fingerprint, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best, best_similarity = None, self.threshold
+            for entry_id in candidates:
+                similarity = float(np.mean(self._entries[entry_id][1] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = entry_id, similarity
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best)
+            return dict(self._entries[best][2]), best_similarity
+
+    def add(self, signature, fingerprint, verdict):
+        """Index `verdict` (label, probability, model_version) for `signature`"""
+        if signature is None:
+            return
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (fingerprint, signature, verdict)
+            for key in self._band_keys(fingerprint, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        entry_id, (fingerprint, signature, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(fingerprint, signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # Persistence
+
+    def _parameters(self):
+        return np.array(
+            [FORMAT_VERSION, self.num_perm, self.bands, self.shingle_size, self.seed],
+            dtype=np.int64,
+        )
+
+    def save(self, path):
+        """Write the entries (oldest first) to `path` atomically.
+
+        Each process writes its own temporary file, so gunicorn workers saving
+        at exit never interleave; the last one to finish wins.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp,
+            parameters=self._parameters(),
+            signatures=np.array(
+                [signature for _, signature, _ in entries], dtype=np.uint32
+            ).reshape(len(entries), self.num_perm),
+            fingerprints=np.array([fingerprint or "" for fingerprint, _, _ in entries], dtype=str),
+            labels=np.array([verdict["label"] for _, _, verdict in entries], dtype=str),
+            probabilities=np.array(
+                [verdict["probability"] for _, _, verdict in entries], dtype=np.float64
+            ),
+            versions=np.array(
+                [verdict.get("model_version") or "" for _, _, verdict in entries], dtype=str
+            ),
+        )
+        tmp.replace(path)
+
+    def load(self, path):
+        """Add the entries saved at `path`; returns how many were loaded.
+
+        A file written with other MinHash parameters is ignored (its
+        signatures would not be comparable).
+        """
+        with np.load(path) as data:
+            if not np.array_equal(data["parameters"], self._parameters()):
+                return 0
+            rows = zip(
+                data["signatures"],
+                data["fingerprints"],
+                data["labels"],
+                data["probabilities"],
+                data["versions"],
+            )
+            count = 0
+            for signature, fingerprint, label, probability, version in rows:
+                verdict = {
+                    "label": str(label),
+                    "probability": float(probability),
+                    "model_version": str(version),
+                }
+                self.add(signature.copy(), str(fingerprint), verdict)
+                count += 1
+        return count
@@ -0,0 +1,136 @@
+"""
+Versioned model registry: trained artifacts side by side, one of them active.
+
+    ml/registry/
+        manifest.json               {"active": "20261018-140512", "versions": {...}}
+        20261018-140512/
+            fake_news_model.pkl
+            tfidf_vectorizer.pkl
+            fake_news_model.flat    (optional)
+
+`publish` copies a trained model/vectorizer pair (e.g. `ml/models/`) into a new
+version directory, then rewrites the manifest. Directories are complete
+before they appear and the manifest is replaced atomically (`os.replace`), so
+a reader only ever sees a finished version. Running workers notice the new
+active version (`ml.model.start_registry_watcher`) and swap it in without a
+restart.
+
+When the registry has no manifest, `ml/model.py` keeps loading `ml/models/`.
+
+Configuration (environment variables):
+    ML_MODEL_REGISTRY   registry directory (default: ml/registry)
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+REGISTRY_DIR = Path(os.environ.get("ML_MODEL_REGISTRY", BASE_DIR / "ml" / "registry"))
+MANIFEST_NAME = "manifest.json"
+
+# Fichiers d'une version (le fichier "flat" est facultatif)
+ARTIFACTS = {
+    "model": "fake_news_model.pkl",
+    "vectorizer": "tfidf_vectorizer.pkl",
+    "flat": "fake_news_model.flat",
+}
+REQUIRED = ("model", "vectorizer")
+
+
+class RegistryError(Exception):
+    """The registry or one of its versions is unusable"""
+
+
+def _root(root):
+    return Path(root) if root is not None else REGISTRY_DIR
+
+
+def read_manifest(root=None):
+    """Return the manifest dict, or None when the registry has none"""
+    path = _root(root) / MANIFEST_NAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise RegistryError(f"Invalid manifest {path}: {e}")
+
+
+def _write_manifest(root, manifest):
+    path = root / MANIFEST_NAME
+    tmp = path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def active_version(root=None):
+    """Name of the active version, or None without a manifest"""
+    manifest = read_manifest(root)
+    return manifest.get("active") if manifest else None
+
+
+def version_artifacts(version, root=None):
+    """{"model", "vectorizer", "flat"} paths of `version` (flat may not exist)"""
+    directory = _root(root) / version
+    paths = {kind: directory / name for kind, name in ARTIFACTS.items()}
+    missing = [kind for kind in REQUIRED if not paths[kind].exists()]
+    if missing:
+        raise RegistryError(f"Version {version!r} has no {', '.join(missing)} artifact")
+    return paths
+
+
+def active_artifacts(root=None):
+    """Return (version, artifact paths) of the active version, or None without a manifest"""
+    version = active_version(root)
+    if version is None:
+        return None
+    return version, version_artifacts(version, root)
+
+
+def publish(source_dir, version=None, root=None, activate=True, notes=""):
+    """Copy the artifacts of `source_dir` into a new version; return its name"""
+    root = _root(root)
+    source_dir = Path(source_dir)
+    version = version or time.strftime("%Y%m%d-%H%M%S")
+    target = root / version
+    if target.exists():
+        raise RegistryError(f"Version {version!r} already exists")
+
+    sources = {kind: source_dir / name for kind, name in ARTIFACTS.items()}
+    missing = [kind for kind in REQUIRED if not sources[kind].exists()]
+    if missing:
+        raise RegistryError(f"{source_dir} has no {', '.join(missing)} artifact")
+
+    # Copie dans un répertoire temporaire, renommé une fois complet
+    staging = root / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for kind, path in sources.items():
+        if path.exists():
+            shutil.copy2(path, staging / ARTIFACTS[kind])
+    os.replace(staging, target)
+
+    manifest = read_manifest(root) or {"active": None, "versions": {}}
+    manifest["versions"][version] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "source": str(source_dir),
+        "notes": notes,
+    }
+    if activate or manifest["active"] is None:
+        manifest["active"] = version
+    _write_manifest(root, manifest)
+    return version
+
+
+def activate(version, root=None):
+    """Make `version` the active one (e.g. to roll back)"""
+    root = _root(root)
+    manifest = read_manifest(root)
+    if manifest is None or version not in manifest.get("versions", {}):
+        raise RegistryError(f"Unknown version {version!r}")
+    version_artifacts(version, root)
+    manifest["active"] = version
+    _write_manifest(root, manifest)
@@ -0,0 +1,143 @@
+"""
+Offline-first resolution of the NLP resources used by the normalizer.
+
+Serving must never touch the network: in air-gapped containers every
+`nltk.download` call stalls on timeouts before failing. Resources are
+resolved in this order:
+
+- stop words: local NLTK data (``nltk_data/`` in the project, then the
+  standard NLTK paths), a download only if ``NLTK_DOWNLOAD=1``, otherwise the
+  bundled list in ``ml/resources/stopwords_english.txt``;
+- lemmas: the bundled table ``ml/resources/wordnet_noun_lemmas.tsv.gz``,
+  precomputed from WordNet 3.0 by ``ml/build_resources.py``. It lists every
+  ASCII word whose noun lemma differs from the word itself, so lookups give
+  the same result as `WordNetLemmatizer().lemmatize` without loading WordNet.
+  Set ``LEMMATIZER=wordnet`` to use NLTK's WordNet instead (local data first,
+  download only if enabled).
+"""
+
+import gzip
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+NLTK_DATA_DIR = BASE_DIR / "nltk_data"
+RESOURCES_DIR = Path(__file__).resolve().parent / "resources"
+STOPWORDS_FILE = RESOURCES_DIR / "stopwords_english.txt"
+LEMMA_TABLE_FILE = RESOURCES_DIR / "wordnet_noun_lemmas.tsv.gz"
+
+# Les téléchargements NLTK sont désactivés sauf demande explicite
+NLTK_DOWNLOAD = os.environ.get("NLTK_DOWNLOAD", "0") == "1"
+LEMMATIZER = os.environ.get("LEMMATIZER", "table")
+
+# Sources actually used by the last load_* calls, reported by /health/
+resource_sources = {}
+
+
+def nltk_data_paths():
+    """Directories searched for NLTK data, in NLTK's own order (project dir first).
+
+    Computed without importing nltk, whose import alone costs over a second.
+    """
+    paths = [NLTK_DATA_DIR]
+    paths += [Path(p) for p in os.environ.get("NLTK_DATA", "").split(os.pathsep) if p]
+    paths.append(Path.home() / "nltk_data")
+    paths += [Path(sys.prefix) / sub for sub in ("nltk_data", "share/nltk_data", "lib/nltk_data")]
+    paths += [Path(p) for p in ("/usr/share/nltk_data", "/usr/local/share/nltk_data")]
+    paths += [Path(p) for p in ("/usr/lib/nltk_data", "/usr/local/lib/nltk_data")]
+    return paths
+
+
+def locate_nltk_resource(path):
+    """Return the local directory or zip file holding NLTK resource `path`, or None"""
+    for root in nltk_data_paths():
+        for candidate in (root / path, root / f"{path}.zip"):
+            if candidate.exists():
+                return candidate
+    return None
+
+
+def find_nltk_resource(path, package):
+    """Return the local location of NLTK resource `path`, downloading it if enabled.
+
+    `package` is only downloaded when NLTK_DOWNLOAD is enabled; None is
+    returned when the resource is unavailable.
+    """
+    location = locate_nltk_resource(path)
+    if location is not None or not NLTK_DOWNLOAD:
+        return location
+
+    import nltk
+
+    try:
+        nltk.download(package, download_dir=str(NLTK_DATA_DIR), quiet=True)
+    except Exception as e:
+        print(f"Warning: Could not download NLTK resource {package}: {e}")
+    return locate_nltk_resource(path)
+
+
+def _read_nltk_stop_words(location):
+    """Read the English list from a local NLTK stopwords corpus (directory or zip)"""
+    if location.suffix == ".zip":
+        with zipfile.ZipFile(location) as archive:
+            return set(archive.read("stopwords/english").decode("utf-8").split())
+    return set((location / "english").read_text(encoding="utf-8").split())
+
+
+def read_stop_words(path=STOPWORDS_FILE):
+    """Read a stop word list (one word per line, '#' comments allowed)"""
+    with open(path, encoding="utf-8") as f:
+        return {
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        }
+
+
+def read_lemma_table(path=LEMMA_TABLE_FILE):
+    """Read the bundled `word<TAB>lemma` table into a dict"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return dict(line.rstrip("\n").split("\t", 1) for line in f)
+
+
+def load_stop_words():
+    """English stop words: local NLTK corpus first, bundled list otherwise"""
+    location = find_nltk_resource("corpora/stopwords", "stopwords")
+    if location is not None:
+        try:
+            words = _read_nltk_stop_words(location)
+            resource_sources["stop_words"] = "nltk"
+            return words
+        except (OSError, KeyError) as e:
+            print(f"Warning: unreadable NLTK stopwords at {location}: {e}")
+
+    resource_sources["stop_words"] = "bundled"
+    return read_stop_words()
+
+
+def load_lemmatizer():
+    """Return a `lemmatize(word) -> lemma` callable for nouns"""
+    if LEMMATIZER != "wordnet" and LEMMA_TABLE_FILE.exists():
+        get = read_lemma_table().get
+
+        def lemmatize(word):
+            return get(word, word)
+
+        resource_sources["lemmatizer"] = "table"
+        return lemmatize
+
+    location = find_nltk_resource("corpora/wordnet", "wordnet")
+    if location is not None:
+        import nltk
+        from nltk.stem import WordNetLemmatizer
+
+        root = str(location.parent.parent)
+        if root not in nltk.data.path:
+            nltk.data.path.insert(0, root)
+
+        resource_sources["lemmatizer"] = "wordnet"
+        return WordNetLemmatizer().lemmatize
+
+    print("Warning: no lemma table or WordNet data found, tokens are not lemmatized")
+    resource_sources["lemmatizer"] = "identity"
+    return lambda word: word
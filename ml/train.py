@@ -4,25 +4,38 @@ Train an SVM-based classifier for fake-news detection and save artifacts
 in `ml/models` using filenames expected by the application loader.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+import argparse
+import hashlib
+import itertools
+import math
 import os
-import re
+import sys
+import tempfile
+import time
 import joblib
+import numpy as np
 import pandas as pd
-import nltk
-
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.svm import LinearSVC
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import accuracy_score, classification_report
 
-# Ensure NLTK resources are present
-nltk.download("stopwords", quiet=True)
-nltk.download("wordnet", quiet=True)
+# Allow running as `python train.py` from the ml/ directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ml.engine import LinearEnsemble
+from ml.corpus_cache import corpus_key, load_corpus, save_corpus
+from ml.flat_model import export_flat, load_flat, verify_flat
+from ml.hashing import HashingTfidfVectorizer
+from ml.model import artifact_version
+from ml.normalizer import make_lemma_cache, normalize_text
+from ml.resources import load_lemmatizer, load_stop_words
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent
@@ -34,40 +47,82 @@ FAKE_FILE = DATASETS_DIR / "Fake.csv"
 
 MODEL_PATH = MODELS_DIR / "fake_news_model.pkl"  # matches ml/model.py
 VECTORIZER_PATH = MODELS_DIR / "tfidf_vectorizer.pkl"
+FLAT_MODEL_PATH = MODELS_DIR / "fake_news_model.flat"  # memory-mapped export
+EXAMPLES_DIR = BASE_DIR.parent / "examples"
 
-# Preprocessing
-stop_words = set(stopwords.words("english"))
-lemmatizer = WordNetLemmatizer()
+# Streaming mode: rows per chunk and held-out split codes (hash of the raw text)
+STREAM_CHUNK_SIZE = 5000
+MAX_CALIBRATION_SAMPLES = 100_000
+TRAIN, CALIBRATION, TEST = 0, 1, 2
+
+# Preprocessing (offline-first resources, same as ml/model.py)
+stop_words = load_stop_words()
+lemmatize = make_lemma_cache(load_lemmatizer())
 
 
 def clean_text(text: str) -> str:
     """Clean HTML/URLs, keep letters, normalize whitespace, lowercase, remove stopwords and lemmatize."""
-    if not isinstance(text, str):
-        return ""
+    return normalize_text(text, stop_words, lemmatize)
+
+
+def _clean_chunk(texts: list) -> list:
+    """Process-pool worker: clean a chunk of documents"""
+    return [clean_text(text) for text in texts]
+
+
+def preprocess_series(series: pd.Series, jobs: int = 1, pool=None) -> pd.Series:
+    """Apply `clean_text` to every document, optionally across `jobs` processes.
 
-    # Remove HTML tags
-    text = re.sub(r"<.*?>", " ", text)
+    The series is split into contiguous chunks (a few per worker, to balance
+    uneven document lengths) and reassembled in the original order, so the
+    output is identical to `series.apply(clean_text)`. Callers cleaning many
+    series pass a `pool` from `preprocessing_pool` instead of starting one
+    per call.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(series) < 2 * jobs:
+        return series.apply(clean_text)
 
-    # Remove URLs
-    text = re.sub(r"http\S+|www\S+", " ", text)
+    chunk_size = math.ceil(len(series) / (jobs * 4))
+    values = series.tolist()
+    chunks = [values[i : i + chunk_size] for i in range(0, len(values), chunk_size)]
 
-    # Keep letters and whitespace only
-    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+    if pool is None:
+        with preprocessing_pool(jobs) as pool:
+            cleaned = list(itertools.chain.from_iterable(pool.map(_clean_chunk, chunks)))
+    else:
+        cleaned = list(itertools.chain.from_iterable(pool.map(_clean_chunk, chunks)))
 
-    # Collapse whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+    return pd.Series(cleaned, index=series.index, name=series.name)
 
-    # Lowercase
-    text = text.lower()
 
-    # Tokenize, remove stop words, lemmatize
-    words = [w for w in text.split() if w not in stop_words]
-    words = [lemmatizer.lemmatize(w) for w in words]
+@contextmanager
+def preprocessing_pool(jobs: int):
+    """Process pool for `preprocess_series`, or None when `jobs` is 1"""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1:
+        yield None
+        return
 
-    return " ".join(words)
+    # Resolve lazily loaded lemma data (WordNet mode) once in the parent so
+    # forked workers inherit it
+    lemmatize("news")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield pool
 
 
-def main(sample: int | None = None):
+@contextmanager
+def timed(stage: str):
+    """Print the wall-clock duration of a training stage"""
+    start = time.perf_counter()
+    yield
+    print(f"[timing] {stage}: {time.perf_counter() - start:.2f}s")
+
+
+def load_dataset(sample: int | None = None) -> pd.DataFrame:
+    """Load True.csv and Fake.csv into a shuffled (content, label) DataFrame"""
     # Load CSVs
     df_true = pd.read_csv(TRUE_FILE)
     df_fake = pd.read_csv(FAKE_FILE)
@@ -86,16 +141,20 @@ def main(sample: int | None = None):
     if sample is not None:
         df = df.sample(n=sample, random_state=42).reset_index(drop=True)
 
-    df = df[["content", "label"]].sample(frac=1, random_state=42).reset_index(drop=True)
-
-    # Preprocess
-    df["content"] = df["content"].apply(clean_text)
+    return df[["content", "label"]].sample(frac=1, random_state=42).reset_index(drop=True)
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        df["content"], df["label"], test_size=0.2, random_state=42, stratify=df["label"]
-    )
 
-    vectorizer = TfidfVectorizer(
+def build_vectorizer(features: str = "tfidf", hash_bits: int = 18):
+    """TF-IDF over a pruned vocabulary, or hashed n-grams with a bounded-memory IDF"""
+    if features == "hashing":
+        return HashingTfidfVectorizer(
+            n_features=2**hash_bits,
+            ngram_range=(1, 3),
+            min_df=5,
+            max_df=0.6,
+            sublinear_tf=True,
+        )
+    return TfidfVectorizer(
         ngram_range=(1, 3),
         min_df=5,
         max_df=0.6,
@@ -103,29 +162,334 @@ def main(sample: int | None = None):
         max_features=5000,
     )
 
-    X_train_tfidf = vectorizer.fit_transform(X_train)
-    X_test_tfidf = vectorizer.transform(X_test)
+
+def main(
+    sample: int | None = None,
+    jobs: int = 1,
+    use_cache: bool = True,
+    features: str = "tfidf",
+    hash_bits: int = 18,
+):
+    # Réutiliser le corpus prétraité si les CSV et le normaliseur n'ont pas changé
+    key, key_inputs = corpus_key([TRUE_FILE, FAKE_FILE], stop_words, sample=sample)
+    df = load_corpus(key) if use_cache else None
+
+    if df is not None:
+        print(f"Using cached preprocessed corpus {key} ({len(df)} documents)")
+    else:
+        with timed("load"):
+            df = load_dataset(sample)
+
+        # Preprocess
+        with timed(f"preprocess (jobs={jobs})"):
+            df["content"] = preprocess_series(df["content"], jobs=jobs)
+
+        if use_cache:
+            with timed("cache corpus"):
+                save_corpus(key, df, key_inputs)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        df["content"], df["label"], test_size=0.2, random_state=42, stratify=df["label"]
+    )
+
+    vectorizer = build_vectorizer(features, hash_bits)
+
+    with timed(f"vectorize ({features})"):
+        X_train_tfidf = vectorizer.fit_transform(X_train)
+        X_test_tfidf = vectorizer.transform(X_test)
 
     svm = LinearSVC(random_state=42, max_iter=10000)
     model = CalibratedClassifierCV(svm, method="sigmoid", cv=5)
 
     print("Training SVM (this may take a few minutes)...")
-    model.fit(X_train_tfidf, y_train)
+    with timed("train"):
+        model.fit(X_train_tfidf, y_train)
 
-    y_pred = model.predict(X_test_tfidf)
-    accuracy = accuracy_score(y_test, y_pred)
+    with timed("evaluate"):
+        y_pred = model.predict(X_test_tfidf)
+        accuracy = accuracy_score(y_test, y_pred)
 
     print("Accuracy:", round(accuracy, 4))
     print(classification_report(y_test, y_pred))
 
     # Persist artifacts in ml/models with the expected filenames
-    MODELS_DIR.mkdir(parents=True, exist_ok=True)
-    joblib.dump(model, MODEL_PATH)
-    joblib.dump(vectorizer, VECTORIZER_PATH)
+    with timed("save"):
+        MODELS_DIR.mkdir(parents=True, exist_ok=True)
+        joblib.dump(model, MODEL_PATH)
+        joblib.dump(vectorizer, VECTORIZER_PATH)
 
     print(f"Saved model -> {MODEL_PATH}")
     print(f"Saved vectorizer -> {VECTORIZER_PATH}")
 
+    with timed("export flat"):
+        export_flat_model(model, vectorizer, X_test)
+
+
+def count_rows(path: Path) -> int:
+    """Number of records of a CSV, read in chunks (only the first column is kept)"""
+    return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=100_000))
+
+
+def iter_source_chunks(chunksize: int = STREAM_CHUNK_SIZE):
+    """Yield shuffled (content, label) chunks read from True.csv and Fake.csv together.
+
+    The records of each file are counted first, then every chunk takes rows
+    from each file in proportion to what it has left, so both classes stay
+    mixed until the last chunk without ever loading a whole file.
+    """
+    sources = [(TRUE_FILE, 0), (FAKE_FILE, 1)]
+    remaining = [count_rows(path) for path, _ in sources]
+    readers = [pd.read_csv(path, iterator=True) for path, _ in sources]
+
+    seed = 42
+    try:
+        while sum(remaining):
+            total = sum(remaining)
+            frames = []
+            for i, (reader, (_, label)) in enumerate(zip(readers, sources)):
+                if not remaining[i]:
+                    continue
+                size = min(remaining[i], max(1, round(chunksize * remaining[i] / total)))
+                try:
+                    chunk = reader.get_chunk(size)
+                except StopIteration:
+                    remaining[i] = 0
+                    continue
+                remaining[i] = remaining[i] - len(chunk) if len(chunk) else 0
+                content = chunk["title"].fillna("") + " " + chunk["text"].fillna("")
+                frames.append(pd.DataFrame({"content": content, "label": label}))
+            if frames:
+                yield pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed)
+                seed += 1
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def split_codes(texts, held_out: float) -> np.ndarray:
+    """Deterministic TRAIN / CALIBRATION / TEST assignment from a hash of each text"""
+    positions = np.array(
+        [
+            int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+            / 2**64
+            for text in texts
+        ]
+    )
+    codes = np.full(len(positions), TRAIN, dtype=np.int8)
+    codes[positions < held_out] = TEST
+    codes[positions < held_out / 2] = CALIBRATION
+    return codes
+
+
+def iter_spool(path: Path, chunksize: int, split: int | None = None):
+    """Re-read the preprocessed spool chunk by chunk, optionally one split only"""
+    for chunk in pd.read_csv(path, chunksize=chunksize, keep_default_na=False):
+        if split is not None:
+            chunk = chunk[chunk["split"] == split]
+        if len(chunk):
+            yield chunk
+
+
+def fit_sigmoid(decisions: np.ndarray, labels: np.ndarray):
+    """Platt scaling: (a, b) such that P(fake) = expit(-(a * d + b))"""
+    if len(np.unique(labels)) < 2:
+        raise ValueError("The calibration stream needs both classes; raise --held-out")
+    platt = LogisticRegression(C=1e6).fit(decisions.reshape(-1, 1), labels)
+    return -platt.coef_[0, 0], -platt.intercept_[0]
+
+
+def main_streaming(
+    jobs: int = 1,
+    chunksize: int = STREAM_CHUNK_SIZE,
+    epochs: int = 3,
+    hash_bits: int = 18,
+    held_out: float = 0.2,
+):
+    """Out-of-core training: memory depends on the chunk size, not on the corpus.
+
+    1. read both CSVs in chunks, preprocess them, accumulate document
+       frequencies for the hashing vectorizer and append the cleaned rows to
+       a temporary spool file;
+    2. fit an SGD hinge-loss classifier with `partial_fit` over the spool;
+    3. calibrate a sigmoid on the held-out calibration rows and evaluate on
+       the held-out test rows, both streamed.
+
+    The result is saved as a one-member `LinearEnsemble`, loadable by
+    `ml/model.py` like the batch-trained model.
+    """
+    vectorizer = build_vectorizer("hashing", hash_bits)
+
+    with tempfile.TemporaryDirectory(prefix="fakenews-train-") as spool_dir:
+        spool = Path(spool_dir) / "corpus.csv"
+
+        rows = 0
+        # Un seul pool pour tout le flux, pas un par chunk
+        with timed(f"stream preprocess + idf (jobs={jobs})"), preprocessing_pool(jobs) as pool:
+            for chunk in iter_source_chunks(chunksize):
+                chunk["split"] = split_codes(chunk["content"], held_out)
+                chunk["content"] = preprocess_series(chunk["content"], jobs=jobs, pool=pool)
+                vectorizer.partial_fit(chunk.loc[chunk["split"] == TRAIN, "content"])
+                chunk.to_csv(spool, mode="a", header=rows == 0, index=False)
+                rows += len(chunk)
+        print(f"Streamed {rows} documents ({vectorizer.n_documents_} for training)")
+
+        classifier = SGDClassifier(loss="hinge", alpha=1e-5, random_state=42)
+        print("Training SGD classifier (streaming)...")
+        with timed(f"train ({epochs} epochs)"):
+            for _ in range(epochs):
+                for chunk in iter_spool(spool, chunksize, TRAIN):
+                    classifier.partial_fit(
+                        vectorizer.transform(chunk["content"]), chunk["label"], classes=[0, 1]
+                    )
+
+        with timed("calibrate"):
+            decisions, labels = [], []
+            for chunk in iter_spool(spool, chunksize, CALIBRATION):
+                decisions.append(classifier.decision_function(vectorizer.transform(chunk["content"])))
+                labels.append(chunk["label"].to_numpy())
+                if sum(len(d) for d in labels) >= MAX_CALIBRATION_SAMPLES:
+                    break
+            a, b = fit_sigmoid(np.concatenate(decisions), np.concatenate(labels))
+
+        model = LinearEnsemble(
+            coef=classifier.coef_,
+            intercept=classifier.intercept_,
+            calibration_a=[a],
+            calibration_b=[b],
+            classes=classifier.classes_,
+        )
+
+        with timed("evaluate"):
+            confusion = np.zeros((2, 2), dtype=np.int64)
+            documents = []
+            for chunk in iter_spool(spool, chunksize, TEST):
+                probabilities = model.predict_proba(vectorizer.transform(chunk["content"]))
+                predicted = model.classes_[probabilities.argmax(axis=1)]
+                np.add.at(confusion, (chunk["label"].to_numpy(), predicted), 1)
+                if len(documents) < 1000:
+                    documents.extend(chunk["content"].head(1000 - len(documents)))
+
+    print_confusion_report(confusion)
+
+    with timed("save"):
+        MODELS_DIR.mkdir(parents=True, exist_ok=True)
+        joblib.dump(model, MODEL_PATH)
+        joblib.dump(vectorizer, VECTORIZER_PATH)
+
+    print(f"Saved model -> {MODEL_PATH}")
+    print(f"Saved vectorizer -> {VECTORIZER_PATH}")
+
+    with timed("export flat"):
+        export_flat_model(model, vectorizer, documents)
+
+
+def print_confusion_report(confusion):
+    """Accuracy and per-class precision/recall from a 2x2 confusion matrix (rows = truth)"""
+    total = confusion.sum()
+    if not total:
+        print("No held-out test documents; raise --held-out")
+        return
+
+    print("Accuracy:", round(np.trace(confusion) / total, 4))
+    for label, name in enumerate(("Real", "Fake")):
+        predicted = confusion[:, label].sum()
+        actual = confusion[label].sum()
+        precision = confusion[label, label] / predicted if predicted else 0.0
+        recall = confusion[label, label] / actual if actual else 0.0
+        print(f"  {name}: precision {precision:.4f}  recall {recall:.4f}  support {actual}")
+
+
+def export_flat_model(model, vectorizer, documents):
+    """Write the memory-mapped export and check it predicts like sklearn on `documents`"""
+    source_version = artifact_version(MODEL_PATH, VECTORIZER_PATH)
+    export_flat(model, vectorizer, FLAT_MODEL_PATH, source_version=source_version)
+
+    flat_model, flat_vectorizer, _ = load_flat(FLAT_MODEL_PATH)
+    difference = verify_flat(model, vectorizer, flat_model, flat_vectorizer, list(documents))
+    print(f"Saved flat model -> {FLAT_MODEL_PATH} (max |Δp| vs sklearn: {difference:.2g})")
+
+
+def export_existing():
+    """Export the saved joblib artifacts without retraining"""
+    model = joblib.load(MODEL_PATH)
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    documents = [clean_text(p.read_text(encoding="utf-8")) for p in EXAMPLES_DIR.glob("*.txt")]
+    export_flat_model(model, vectorizer, documents)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the fake-news SVM classifier")
+    parser.add_argument(
+        "--sample", type=int, default=None, help="train on a random sample of N articles"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="processes used for preprocessing (0 = all CPU cores)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always re-clean the corpus instead of reusing ml/.cache/corpus",
+    )
+    parser.add_argument(
+        "--features",
+        choices=("tfidf", "hashing"),
+        default="tfidf",
+        help="tfidf: pruned n-gram vocabulary; hashing: hashed n-grams, memory bounded by --hash-bits",
+    )
+    parser.add_argument(
+        "--hash-bits",
+        type=int,
+        default=18,
+        help="hashing mode: 2**N feature columns (default 18)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="out-of-core training: chunked CSV reading, hashing features and SGD partial_fit",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=STREAM_CHUNK_SIZE,
+        help="streaming mode: rows read per chunk",
+    )
+    parser.add_argument(
+        "--epochs", type=int, default=3, help="streaming mode: passes over the training rows"
+    )
+    parser.add_argument(
+        "--held-out",
+        type=float,
+        default=0.2,
+        help="streaming mode: share of documents kept for calibration and evaluation",
+    )
+    parser.add_argument(
+        "--export-only",
+        action="store_true",
+        help="only write the flat (memory-mapped) export of the saved artifacts",
+    )
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.export_only:
+        export_existing()
+    elif args.stream:
+        main_streaming(
+            jobs=args.jobs,
+            chunksize=args.chunk_size,
+            epochs=args.epochs,
+            hash_bits=args.hash_bits,
+            held_out=args.held_out,
+        )
+    else:
+        main(
+            sample=args.sample,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            features=args.features,
+            hash_bits=args.hash_bits,
+        )
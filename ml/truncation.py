@@ -0,0 +1,70 @@
+"""
+Input-length guardrail applied before preprocessing.
+
+Scoring cost grows with the text: a 10 MB scraped page pasted in the form
+would keep a worker busy for seconds. Texts longer than `MAX_ANALYZED_CHARS`
+are reduced to a head window and a tail window (the lead of an article and
+its closing paragraphs carry most of the signal), cut on whitespace so no
+word is split. Every later stage (normalizer, vectorizer, model) is linear in
+its input, so the scoring time is bounded by the limit whatever the size of
+the submission.
+
+Configuration (environment variables):
+    ML_MAX_ANALYZED_CHARS      characters analyzed at most (default 100000,
+                               0 disables truncation)
+    ML_TRUNCATION_HEAD_RATIO   share of the budget given to the head (0.75)
+"""
+
+import os
+
+MAX_ANALYZED_CHARS = int(os.environ.get("ML_MAX_ANALYZED_CHARS", "100000"))
+HEAD_RATIO = float(os.environ.get("ML_TRUNCATION_HEAD_RATIO", "0.75"))
+
+# How far a window edge may move to land on whitespace
+_BOUNDARY_SEARCH = 200
+_WHITESPACE = (" ", "\n", "\t", "\r")
+
+
+def _last_whitespace(text, start, end):
+    return max(text.rfind(ws, start, end) for ws in _WHITESPACE)
+
+
+def _first_whitespace(text, start, end):
+    positions = [p for p in (text.find(ws, start, end) for ws in _WHITESPACE) if p >= 0]
+    return min(positions) if positions else -1
+
+
+def truncate_text(text, max_chars=None, head_ratio=None):
+    """Return (text to analyze, report) with at most `max_chars` characters analyzed.
+
+    The report says what was analyzed: ``{"truncated", "original_chars",
+    "analyzed_chars"}`` plus, when truncated, the strategy and the sizes of
+    the head and tail windows.
+    """
+    max_chars = MAX_ANALYZED_CHARS if max_chars is None else max_chars
+    head_ratio = HEAD_RATIO if head_ratio is None else head_ratio
+
+    length = len(text) if isinstance(text, str) else 0
+    if not max_chars or length <= max_chars:
+        return text, {"truncated": False, "original_chars": length, "analyzed_chars": length}
+
+    head_end = int(max_chars * head_ratio)
+    cut = _last_whitespace(text, max(0, head_end - _BOUNDARY_SEARCH), head_end)
+    if cut > 0:
+        head_end = cut
+
+    tail_start = length - (max_chars - head_end)
+    cut = _first_whitespace(text, tail_start, min(length, tail_start + _BOUNDARY_SEARCH))
+    if cut >= 0:
+        tail_start = cut + 1
+
+    head, tail = text[:head_end], text[tail_start:]
+    # The newline keeps an HTML tag or URL from spanning the two windows
+    return head + "\n" + tail, {
+        "truncated": True,
+        "original_chars": length,
+        "analyzed_chars": len(head) + len(tail),
+        "strategy": "head+tail",
+        "head_chars": len(head),
+        "tail_chars": len(tail),
+    }
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from ml.batcher import MicroBatcher, batcher_for_running_loop
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Test cases for request coalescing"""
+
+    def setUp(self):
+        self.calls = []
+
+    def score(self, texts):
+        self.calls.append((list(texts), threading.current_thread().name))
+        return [text.upper() for text in texts]
+
+    def test_concurrent_submissions_share_one_call(self):
+        """Test texts submitted within the wait window are scored together, in order"""
+        batcher = MicroBatcher(self.score, max_batch_size=100, max_wait=0.05)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit(f"t{i}") for i in range(10)))
+
+        results = asyncio.run(run())
+        batcher.close()
+
+        self.assertEqual(results, [f"T{i}" for i in range(10)])
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(self.calls[0][1].startswith("ml-batcher"))
+        self.assertEqual(batcher.stats()["largest_batch"], 10)
+
+    def test_full_batch_is_flushed_without_waiting(self):
+        """Test reaching max_batch_size scores immediately"""
+        batcher = MicroBatcher(self.score, max_batch_size=4, max_wait=10)
+
+        async def run():
+            start = time.perf_counter()
+            results = await asyncio.gather(*(batcher.submit(str(i)) for i in range(8)))
+            return results, time.perf_counter() - start
+
+        results, elapsed = asyncio.run(run())
+        batcher.close()
+
+        self.assertEqual(results, [str(i) for i in range(8)])
+        self.assertEqual([len(texts) for texts, _ in self.calls], [4, 4])
+        self.assertLess(elapsed, 5)
+
+    def test_errors_reach_every_caller(self):
+        """Test a failing batch raises in each waiting coroutine"""
+
+        def fail(texts):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(fail, max_wait=0.001)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        batcher.close()
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_one_batcher_per_event_loop(self):
+        """Test each event loop gets its own batcher"""
+
+        async def get():
+            return batcher_for_running_loop(lambda: MicroBatcher(self.score))
+
+        async def same_loop():
+            return await get(), await get()
+
+        first, second = asyncio.run(same_loop())
+        other = asyncio.run(get())
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+
+if __name__ == "__main__":
+    unittest.main()
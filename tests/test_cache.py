@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ml.cache import DjangoPredictionCache, MemoryPredictionCache, prediction_key
+
+
+class TestPredictionKey(unittest.TestCase):
+    """Test cases for prediction cache keys"""
+
+    def test_whitespace_insensitive(self):
+        """Test copies differing only in whitespace share a key"""
+        self.assertEqual(
+            prediction_key("Breaking  news\n today ", "v1"),
+            prediction_key("Breaking news today", "v1"),
+        )
+
+    def test_depends_on_version(self):
+        """Test a new model version never reuses old entries"""
+        self.assertNotEqual(prediction_key("same text", "v1"), prediction_key("same text", "v2"))
+
+
+class TestMemoryPredictionCache(unittest.TestCase):
+    """Test cases for the in-process prediction cache"""
+
+    def test_hit_returns_copy(self):
+        """Test cached predictions cannot be mutated by callers"""
+        cache = MemoryPredictionCache(maxsize=10, ttl=60)
+        cache.set("k", {"label": "Real", "probability": 0.9})
+
+        first = cache.get("k")
+        first["input_preview"] = "mutated"
+        self.assertNotIn("input_preview", cache.get("k"))
+        self.assertIsNone(cache.get("missing"))
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_size_bound_evicts_least_recently_used(self):
+        """Test the cache never grows beyond maxsize"""
+        cache = MemoryPredictionCache(maxsize=2, ttl=60)
+        cache.set("a", {"label": "Real"})
+        cache.set("b", {"label": "Fake"})
+        cache.get("a")
+        cache.set("c", {"label": "Real"})
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = MemoryPredictionCache(maxsize=10, ttl=5)
+        with patch("ml.cache.time.monotonic", return_value=100.0):
+            cache.set("k", {"label": "Real"})
+        with patch("ml.cache.time.monotonic", return_value=104.0):
+            self.assertIsNotNone(cache.get("k"))
+        with patch("ml.cache.time.monotonic", return_value=106.0):
+            self.assertIsNone(cache.get("k"))
+
+
+class TestDjangoPredictionCache(TestCase):
+    """Test cases for the Django cache framework backend"""
+
+    def test_roundtrip(self):
+        """Test predictions are stored in the configured cache alias"""
+        cache = DjangoPredictionCache(alias="predictions", ttl=60)
+        cache.clear()
+        cache.set("k", {"label": "Fake", "probability": 0.7})
+
+        self.assertEqual(cache.get("k")["label"], "Fake")
+        self.assertIsNone(cache.get("other"))
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
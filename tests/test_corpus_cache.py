@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from ml.corpus_cache import corpus_key, load_corpus, save_corpus
+
+
+class TestCorpusCache(unittest.TestCase):
+    """Test cases for the persisted preprocessed-corpus cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        """Test a saved corpus is loaded back identically"""
+        df = pd.DataFrame(
+            {"content": ["senate vote bill", "", "café exposé"], "label": [0, 1, 1]}
+        )
+        save_corpus("abc", df, cache_dir=self.cache_dir)
+
+        loaded = load_corpus("abc", cache_dir=self.cache_dir)
+        self.assertEqual(loaded["content"].tolist(), df["content"].tolist())
+        self.assertEqual(loaded["label"].tolist(), [0, 1, 1])
+
+    def test_missing_entry(self):
+        """Test an unknown key is a cache miss"""
+        self.assertIsNone(load_corpus("missing", cache_dir=self.cache_dir))
+
+    def test_key_tracks_sources_and_params(self):
+        """Test the key changes with source contents and parameters"""
+        source = self.cache_dir / "True.csv"
+        source.write_text("title,text\na,b\n")
+        key, _ = corpus_key([source], {"the"}, sample=None)
+
+        self.assertEqual(key, corpus_key([source], {"the"}, sample=None)[0])
+        self.assertNotEqual(key, corpus_key([source], {"the"}, sample=100)[0])
+        self.assertNotEqual(key, corpus_key([source], {"the", "a"}, sample=None)[0])
+
+        source.write_text("title,text\na,c\n")
+        self.assertNotEqual(key, corpus_key([source], {"the"}, sample=None)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
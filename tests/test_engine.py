@@ -0,0 +1,58 @@
+import unittest
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from ml.engine import LinearEnsemble
+from ml.model import MODEL_PATH, VECTORIZER_PATH, preprocess_text
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+
+class TestLinearEnsemble(unittest.TestCase):
+    """Test cases for the collapsed linear scoring engine"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = joblib.load(MODEL_PATH)
+        cls.vectorizer = joblib.load(VECTORIZER_PATH)
+        cls.engine = LinearEnsemble.from_calibrated(cls.model)
+
+        documents = [
+            preprocess_text(p.read_text(encoding="utf-8")) for p in EXAMPLES_DIR.glob("*.txt")
+        ]
+        documents += ["", "president trump said tuesday", documents[0][:300]]
+        cls.matrix = cls.vectorizer.transform(documents)
+
+    def test_batch_matches_sklearn(self):
+        """Test batch probabilities equal CalibratedClassifierCV.predict_proba"""
+        expected = self.model.predict_proba(self.matrix)
+        actual = self.engine.predict_proba(self.matrix)
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(self.engine.classes_, self.model.classes_)
+
+    def test_single_row_matches_batch(self):
+        """Test the one-document fast path agrees with the sparse product"""
+        batch = self.engine.predict_proba(self.matrix)
+        for i in range(self.matrix.shape[0]):
+            single = self.engine.predict_proba(self.matrix[i])
+            np.testing.assert_allclose(single[0], batch[i], rtol=0, atol=1e-12)
+
+    def test_rejects_mismatched_width(self):
+        """Test a matrix of the wrong width is refused on both scoring paths"""
+        n_features = self.matrix.shape[1]
+        for matrix in (self.matrix[:, : n_features - 1], self.matrix[:1, : n_features - 1]):
+            with self.assertRaises(ValueError):
+                self.engine.predict_proba(matrix.tocsr())
+
+    def test_rejects_unsupported_models(self):
+        """Test non-sigmoid calibration is refused"""
+        model = joblib.load(MODEL_PATH)
+        model.method = "isotonic"
+        with self.assertRaises(ValueError):
+            LinearEnsemble.from_calibrated(model)
+
+
+if __name__ == "__main__":
+    unittest.main()
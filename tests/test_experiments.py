@@ -0,0 +1,172 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import joblib
+from django.test import TestCase
+from django.urls import reverse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import ml.model
+from ml import registry
+from ml.experiments import ModelComparison, ShadowScorer
+from ml.model import (
+    MODEL_PATH,
+    VECTORIZER_PATH,
+    candidate_info,
+    clear_candidate,
+    load_candidate,
+    predict_fake_news,
+)
+
+MODELS_DIR = MODEL_PATH.parent
+
+
+class TestModelComparison(unittest.TestCase):
+    """Test cases for the active/candidate statistics"""
+
+    def test_agreement_and_latency(self):
+        """Test agreement, probability gap and per-model latency are reported"""
+        comparison = ModelComparison()
+        comparison.record("active", 0.002, {"label": "Fake"})
+        comparison.record("candidate", 0.004, {"label": "Real"})
+        comparison.compare({"label": "Fake", "probability": 0.9}, {"label": "Fake", "probability": 0.7})
+        comparison.compare({"label": "Fake", "probability": 0.6}, {"label": "Real", "probability": 0.6})
+
+        stats = comparison.stats()
+        self.assertEqual(stats["compared"], 2)
+        self.assertEqual(stats["agreement"], 0.5)
+        self.assertAlmostEqual(stats["mean_probability_delta"], 0.2)
+        self.assertEqual(stats["active"]["p50_ms"], 2.0)
+        self.assertEqual(stats["candidate"]["labels"], {"Real": 1})
+
+    def test_shadow_queue_is_bounded(self):
+        """Test texts beyond the pending limit are dropped instead of queued"""
+        release = threading.Event()
+
+        def slow_score(text):
+            release.wait(5)
+            return 0.001, {"label": "Real", "probability": 0.8}
+
+        comparison = ModelComparison()
+        shadow = ShadowScorer(slow_score, comparison, max_pending=2)
+        active = {"label": "Real", "probability": 0.9}
+        accepted = [shadow.submit(f"text {i}", active) for i in range(5)]
+        release.set()
+        shadow.close()
+
+        self.assertEqual(accepted, [True, True, False, False, False])
+        self.assertEqual(shadow.stats()["dropped"], 3)
+
+
+class CandidateTestMixin:
+    """Publish ml/models as registry version "cand" in a temporary registry"""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        patcher = patch.object(registry, "REGISTRY_DIR", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(clear_candidate)
+        registry.publish(MODELS_DIR, version="cand", activate=False)
+        ml.model.ensure_models_loaded()
+
+    def wait_for_shadow(self):
+        for _ in range(500):
+            if ml.model._shadow.stats()["pending"] == 0:
+                return
+            time.sleep(0.01)
+
+
+class TestCandidateRouting(CandidateTestMixin, unittest.TestCase):
+    """Test cases for A/B and shadow evaluation of a candidate model"""
+
+    texts = [
+        "The Senate voted on Tuesday to approve the spending bill.",
+        "BREAKING: chocolate cures all diseases, doctors hate this trick!",
+        "Researchers published the trial results in a medical journal.",
+    ]
+
+    def test_ab_routes_to_candidate(self):
+        """Test A/B mode answers the sampled fraction with the candidate"""
+        self.assertTrue(load_candidate("cand", mode="ab", fraction=1.0))
+        with patch.object(ml.model, "get_prediction_cache", return_value=None):
+            results = [predict_fake_news(text) for text in self.texts]
+
+        self.assertEqual({r["model_version"] for r in results}, {"cand"})
+        info = candidate_info()
+        self.assertEqual(info["candidate"]["requests"], 3)
+        self.assertEqual(info["active"]["requests"], 0)
+
+    def test_shadow_compares_off_request_path(self):
+        """Test shadow mode answers with the active model and compares in the background"""
+        self.assertTrue(load_candidate("cand", mode="shadow", fraction=1.0))
+        with patch.object(ml.model, "get_prediction_cache", return_value=None):
+            results = [predict_fake_news(text) for text in self.texts]
+        self.wait_for_shadow()
+
+        self.assertEqual({r["model_version"] for r in results}, {ml.model.active_version})
+        info = candidate_info()
+        self.assertEqual(info["compared"], 3)
+        self.assertEqual(info["agreement"], 1.0, "same artifacts must agree")
+        self.assertEqual(info["active"]["requests"], 3)
+        self.assertEqual(info["candidate"]["requests"], 3)
+
+    def test_unknown_candidate_is_rejected(self):
+        """Test a missing version leaves the service without candidate"""
+        self.assertFalse(load_candidate("nope"))
+        self.assertIsNone(candidate_info()["version"])
+
+    def test_mismatched_candidate_is_rejected(self):
+        """Test a candidate whose vectorizer does not fit its model fails its warm-up"""
+        self.assertTrue(load_candidate("cand"))
+
+        source = Path(self.tmp) / "source"
+        source.mkdir()
+        shutil.copy2(MODEL_PATH, source / MODEL_PATH.name)
+        vectorizer = TfidfVectorizer(max_features=5).fit(self.texts)
+        joblib.dump(vectorizer, source / VECTORIZER_PATH.name)
+        registry.publish(source, version="mismatched", activate=False)
+
+        self.assertFalse(load_candidate("mismatched"))
+        self.assertEqual(candidate_info()["version"], "cand")
+
+
+class TestCandidateReporting(CandidateTestMixin, TestCase):
+    """Test cases for the candidate statistics in /health/ and /metrics"""
+
+    def test_health_and_metrics(self):
+        """Test the comparison is exposed to operators"""
+        load_candidate("cand", mode="shadow", fraction=1.0)
+        predict_fake_news("Officials confirmed the report on Monday evening.")
+        self.wait_for_shadow()
+
+        health = self.client.get(reverse("detector:health")).json()
+        self.assertEqual(health["candidate"]["version"], "cand")
+        self.assertEqual(health["candidate"]["mode"], "shadow")
+
+        body = self.client.get(reverse("detector:metrics")).content.decode()
+        self.assertIn('fakenews_experiment_requests_total{model="candidate",version="cand"}', body)
+        self.assertIn("fakenews_experiment_agreement_ratio", body)
+
+    def test_ab_routes_form_submissions(self):
+        """Test the explained web form is answered and explained by the candidate arm"""
+        load_candidate("cand", mode="ab", fraction=1.0)
+        with patch.object(ml.model, "get_prediction_cache", return_value=None):
+            response = self.client.post(
+                reverse("detector:home"), {"news_text": "Officials confirmed the report on Monday."}
+            )
+
+        prediction = response.context["prediction"]
+        self.assertEqual(prediction["model_version"], "cand")
+        self.assertIn("explanation", prediction)
+        info = candidate_info()
+        self.assertEqual(info["candidate"]["requests"], 1)
+        self.assertEqual(info["active"]["requests"], 0)
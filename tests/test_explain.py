@@ -0,0 +1,152 @@
+import json
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+
+import ml.model
+from ml.engine import LinearEnsemble
+from ml.explain import LinearExplainer
+from ml.hashing import HashingTfidfVectorizer
+from ml.model import BASE_DIR, ensure_models_loaded, predict_batch, predict_fake_news, preprocess_text
+from ml.near_duplicates import NearDuplicateIndex
+
+FAKE = (BASE_DIR / "examples" / "fake_news.txt").read_text(encoding="utf-8")
+REAL = (BASE_DIR / "examples" / "real_news.txt").read_text(encoding="utf-8")
+
+
+class TestLinearExplainer(unittest.TestCase):
+    """Test cases for the sparse-row explanations"""
+
+    @classmethod
+    def setUpClass(cls):
+        ensure_models_loaded()
+        cls.model, cls.vectorizer = ml.model.model, ml.model.vectorizer
+        cls.explainer = LinearExplainer(cls.model, cls.vectorizer)
+        cls.document = preprocess_text(REAL)
+        cls.row = cls.vectorizer.transform([cls.document])
+
+    def test_top_k_sorted_ngrams_of_the_document(self):
+        """Test each class gets at most top_k n-grams of the text, by decreasing weight"""
+        explanation = self.explainer.explain(self.row, 0, self.document, top_k=5)
+        self.assertEqual(set(explanation), {"Fake", "Real"})
+        for terms in explanation.values():
+            self.assertLessEqual(len(terms), 5)
+            weights = [term["weight"] for term in terms]
+            self.assertEqual(weights, sorted(weights, reverse=True))
+            self.assertTrue(all(weight > 0 for weight in weights))
+            for term in terms:
+                self.assertIn(term["ngram"], self.document)
+        # Dépêche Reuters : la signature de l'agence pousse vers Real
+        self.assertIn("reuters", [term["ngram"] for term in explanation["Real"]])
+
+    def test_contributions_add_up_to_the_averaged_logit(self):
+        """Test all contributions together equal the mean member logit without bias"""
+        explanation = self.explainer.explain(self.row, 0, self.document, top_k=self.row.nnz)
+        fake = sum(term["weight"] for term in explanation["Fake"])
+        real = sum(term["weight"] for term in explanation["Real"])
+        logit = -(self.row @ self.model.weights).mean(axis=1)[0]
+        self.assertAlmostEqual(fake - real, logit, delta=1e-4 * self.row.nnz)
+
+    def test_hashed_features_are_named_from_the_document(self):
+        """Test hashed columns are named by re-hashing the n-grams of the text"""
+        documents = [preprocess_text(FAKE), preprocess_text(REAL)]
+        vectorizer = HashingTfidfVectorizer(n_features=2**12).fit(documents)
+        rng = np.random.default_rng(0)
+        model = LinearEnsemble(
+            rng.normal(size=(3, 2**12)), np.zeros(3), np.ones(3), np.zeros(3), np.array([0, 1])
+        )
+        row = vectorizer.transform(documents[:1])
+
+        explanation = LinearExplainer(model, vectorizer).explain(row, 0, documents[0], top_k=5)
+        for terms in explanation.values():
+            self.assertEqual(len(terms), 5)
+            for term in terms:
+                for gram in term["ngram"].split(" | "):
+                    column = vectorizer.counts([gram]).indices[0]
+                    self.assertIn(column, row.indices)
+
+
+class TestExplainedPredictions(TestCase):
+    """Test cases for explain=True in the prediction functions and views"""
+
+    def test_explanation_only_when_requested(self):
+        """Test explanations are added on request and never leak from the cache"""
+        plain = predict_fake_news(FAKE)
+        self.assertNotIn("explanation", plain)
+
+        explained = predict_fake_news(FAKE, explain=True)
+        self.assertEqual(explained["label"], plain["label"])
+        self.assertEqual(len(explained["explanation"]["Fake"]), ml.model.EXPLANATION_TOP_K)
+
+        self.assertNotIn("explanation", predict_fake_news(FAKE))
+        self.assertIn("explanation", predict_fake_news(FAKE, explain=True))
+
+    def test_batch_explanations(self):
+        """Test predict_batch explains every text"""
+        results = predict_batch([FAKE, REAL], explain=True)
+        self.assertEqual([r["label"] for r in results], ["Fake", "Real"])
+        self.assertTrue(all("explanation" in r for r in results))
+
+    def test_near_duplicates_are_answered_when_explaining(self):
+        """Test explanation requests still use the near-duplicate shortcut, unexplained"""
+        index = NearDuplicateIndex()
+        with patch.object(ml.model, "NEAR_DUPLICATES", True), \
+                patch.object(ml.model, "_near_duplicates", index), \
+                patch.object(ml.model, "_near_duplicates_pid", os.getpid()), \
+                patch.object(ml.model, "get_prediction_cache", return_value=None):
+            first = predict_fake_news(REAL, explain=True)
+            copy = predict_fake_news("UPDATE: " + REAL, explain=True)
+        self.assertIn("explanation", first)
+        self.assertIn("near_duplicate", copy)
+        self.assertNotIn("explanation", copy)
+        self.assertEqual(copy["label"], first["label"])
+
+    def test_explanation_is_not_timed_as_scoring(self):
+        """Test the comparison latency of the active arm leaves out the explain stage"""
+        comparison = MagicMock()
+        with patch.object(ml.model, "_candidate", ml.model._active), \
+                patch.object(ml.model, "_candidate_fraction", 0.0), \
+                patch.object(ml.model, "_comparison", comparison), \
+                patch.object(ml.model, "get_prediction_cache", return_value=None), \
+                patch.object(ml.model.explainer_for(ml.model.model, ml.model.vectorizer),
+                             "explain", side_effect=lambda *a: time.sleep(0.2) or {}):
+            predict_fake_news(FAKE, explain=True)
+        arm, seconds, _ = comparison.record.call_args.args
+        self.assertEqual(arm, "active")
+        self.assertLess(seconds, 0.2)
+
+    def test_result_page_and_api(self):
+        """Test the web form renders the explanation and the APIs return it on request"""
+        response = self.client.post(reverse("detector:home"), {"news_text": REAL})
+        self.assertContains(response, "Why this verdict")
+        self.assertContains(response, "reuters")
+
+        response = self.client.post(
+            reverse("detector:predict_batch"),
+            data=json.dumps({"texts": [REAL], "explain": True}),
+            content_type="application/json",
+        )
+        self.assertIn("explanation", response.json()["results"][0])
+
+        response = self.client.post(
+            reverse("detector:predict"),
+            data=json.dumps({"text": FAKE, "explain": True}),
+            content_type="application/json",
+        )
+        self.assertIn("breaking", [t["ngram"] for t in response.json()["explanation"]["Fake"]])
+
+        response = self.client.post(
+            reverse("detector:predict"),
+            data=json.dumps({"text": FAKE}),
+            content_type="application/json",
+        )
+        self.assertNotIn("explanation", response.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
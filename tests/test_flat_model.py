@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from ml.engine import LinearEnsemble
+from ml.flat_model import export_flat, load_flat, read_flat, verify_flat, write_flat
+from ml.model import MODEL_PATH, VECTORIZER_PATH, preprocess_text
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+
+class TestFlatModel(unittest.TestCase):
+    """Test cases for the memory-mapped model export"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = joblib.load(MODEL_PATH)
+        cls.vectorizer = joblib.load(VECTORIZER_PATH)
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = Path(cls.tmp.name) / "model.flat"
+        export_flat(cls.model, cls.vectorizer, cls.path, source_version="test")
+
+        cls.documents = [
+            preprocess_text(p.read_text(encoding="utf-8")) for p in EXAMPLES_DIR.glob("*.txt")
+        ]
+        cls.documents += ["", "a", "president trump said tuesday", cls.documents[0][:300]]
+        cls.terms = sorted(cls.vectorizer.vocabulary_, key=cls.vectorizer.vocabulary_.get)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_file_roundtrip(self):
+        """Test arrays and header survive a write/read cycle"""
+        path = Path(self.tmp.name) / "arrays.flat"
+        arrays = {"a": np.arange(5, dtype=np.int64), "b": np.ones((2, 3))}
+        write_flat(path, {"name": "x"}, arrays)
+
+        header, loaded = read_flat(path)
+        self.assertEqual(header["name"], "x")
+        np.testing.assert_array_equal(loaded["a"], arrays["a"])
+        np.testing.assert_array_equal(loaded["b"], arrays["b"])
+        self.assertFalse(loaded["b"].flags.writeable)
+
+    def test_vectorizer_matches_sklearn(self):
+        """Test the flat vectorizer builds the same TF-IDF matrix"""
+        _, flat_vectorizer, _ = load_flat(self.path)
+        expected = self.vectorizer.transform(self.documents)
+        actual = flat_vectorizer.transform(self.documents)
+
+        self.assertEqual(expected.shape, actual.shape)
+        self.assertLess(abs(expected - actual).max(), 1e-12)
+
+    def test_predictions_match_sklearn(self):
+        """Test flat predictions equal the sklearn path within tolerance"""
+        flat_model, flat_vectorizer, version = load_flat(self.path)
+        self.assertEqual(version, "test")
+        np.testing.assert_array_equal(flat_model.classes_, self.model.classes_)
+
+        difference = verify_flat(
+            self.model, self.vectorizer, flat_model, flat_vectorizer, self.documents
+        )
+        self.assertLess(difference, 1e-12)
+
+    def test_loaded_arrays_are_mapped(self):
+        """Test the folded weights and the term table are used in place, not rebuilt"""
+        flat_model, flat_vectorizer, _ = load_flat(self.path)
+        for array in (flat_model.weights, flat_model.bias, flat_vectorizer._slot_terms):
+            self.assertFalse(array.flags.writeable)
+            self.assertFalse(array.flags.owndata)
+        self.assertFalse(hasattr(flat_vectorizer, "vocabulary_"))
+        self.assertEqual(flat_vectorizer.term_names([0]), [self.terms[0]])
+
+    def test_export_folds_calibration(self):
+        """Test the exported weights equal the ensemble's folded weights"""
+        flat_model, _, _ = load_flat(self.path)
+        engine = LinearEnsemble.from_calibrated(self.model)
+        np.testing.assert_array_equal(flat_model.weights, engine.weights)
+        np.testing.assert_array_equal(flat_model.bias, engine.bias)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.svm import LinearSVC
+
+from ml.flat_model import export_flat, load_flat, verify_flat
+from ml.hashing import HashingTfidfVectorizer
+from ml.model import preprocess_text
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+
+class TestHashingTfidfVectorizer(unittest.TestCase):
+    """Test cases for the hashing feature pipeline"""
+
+    @classmethod
+    def setUpClass(cls):
+        examples = [
+            preprocess_text(p.read_text(encoding="utf-8")) for p in EXAMPLES_DIR.glob("*.txt")
+        ]
+        words = " ".join(examples).split()
+        # Overlapping windows give a small corpus with varied document frequencies
+        cls.documents = [" ".join(words[i : i + 40]) for i in range(0, len(words), 15)]
+
+    def test_matches_tfidf_transformer(self):
+        """Test output equals TfidfTransformer over the same hashed counts"""
+        vectorizer = HashingTfidfVectorizer(n_features=2**12)
+        actual = vectorizer.fit_transform(self.documents)
+
+        counts = HashingVectorizer(
+            n_features=2**12, ngram_range=(1, 3), alternate_sign=False, norm=None
+        ).transform(self.documents)
+        expected = TfidfTransformer(sublinear_tf=True).fit_transform(counts)
+
+        self.assertLess(abs(actual - expected).max(), 1e-12)
+
+    def test_incremental_fit_equals_full_fit(self):
+        """Test document frequencies learned batch by batch equal a single pass"""
+        full = HashingTfidfVectorizer(n_features=2**12).fit(self.documents, batch_size=10**6)
+        streamed = HashingTfidfVectorizer(n_features=2**12).fit(iter(self.documents), batch_size=3)
+
+        self.assertEqual(streamed.n_documents_, len(self.documents))
+        np.testing.assert_array_equal(streamed.document_counts_, full.document_counts_)
+        np.testing.assert_array_equal(streamed.idf_, full.idf_)
+
+    def test_document_frequency_pruning(self):
+        """Test min_df/max_df drop columns from the output"""
+        vectorizer = HashingTfidfVectorizer(n_features=2**12, min_df=3, max_df=0.5)
+        X = vectorizer.fit_transform(self.documents)
+        df = vectorizer.document_counts_[X.indices]
+
+        self.assertTrue(len(df))
+        self.assertTrue((df >= 3).all())
+        self.assertTrue((df <= 0.5 * len(self.documents)).all())
+
+    def test_flat_export_roundtrip(self):
+        """Test a hashing model survives the flat export with identical predictions"""
+        vectorizer = HashingTfidfVectorizer(n_features=2**12)
+        X = vectorizer.fit_transform(self.documents)
+        y = np.arange(len(self.documents)) % 2
+        model = CalibratedClassifierCV(LinearSVC(random_state=42), method="sigmoid", cv=2)
+        model.fit(X, y)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "hashing.flat"
+            export_flat(model, vectorizer, path, source_version="hashing")
+            flat_model, flat_vectorizer, version = load_flat(path)
+
+            self.assertEqual(version, "hashing")
+            self.assertEqual(flat_vectorizer.kind, "hashing")
+            difference = verify_flat(model, vectorizer, flat_model, flat_vectorizer, self.documents)
+            self.assertLess(difference, 1e-12)
+
+    def test_import_does_not_load_sklearn(self):
+        """Test sklearn is only imported when a hasher is first used"""
+        code = (
+            "import sys, numpy; from ml.hashing import HashingTfidfVectorizer as H; "
+            "v = H.from_idf(numpy.ones(16)); print('sklearn' in sys.modules); "
+            "v.transform(['a b']); print('sklearn' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.split(), ["False", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ml import metrics
+from ml.model import predict_batch, predict_fake_news
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for the histograms, counters and text exposition"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the first bucket at or above them"""
+        histogram = metrics.Histogram("test_seconds", "Test.", (0.1, 1.0), ("stage",))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "a")
+
+        samples = {(name, labels): value for name, labels, value in histogram.samples()}
+        self.assertEqual(samples[("test_seconds_bucket", (("stage", "a"), ("le", "0.1")))], 2)
+        self.assertEqual(samples[("test_seconds_bucket", (("stage", "a"), ("le", "1")))], 3)
+        self.assertEqual(samples[("test_seconds_bucket", (("stage", "a"), ("le", "+Inf")))], 4)
+        self.assertEqual(samples[("test_seconds_count", (("stage", "a"),))], 4)
+        self.assertAlmostEqual(samples[("test_seconds_sum", (("stage", "a"),))], 3.65)
+
+    def test_render_exposition_format(self):
+        """Test the output follows the Prometheus text format"""
+        counter = metrics.Counter("test_requests", "Requests.", ("outcome",))
+        counter.inc('say "hi"')
+        text = metrics.render(
+            [("test_entries", "gauge", "Entries.", [((("cache", "lemma"),), 3)])]
+        )
+        self.assertTrue(text.endswith("\n"))
+        self.assertIn('test_entries{cache="lemma"} 3', text)
+        self.assertIn("# TYPE test_entries gauge", text)
+
+        lines = list(metrics._family_lines("test_requests", "counter", "Requests.", counter.samples()))
+        self.assertEqual(lines[-1], 'test_requests_total{outcome="say \\"hi\\""} 1')
+
+
+class TestPredictionMetrics(unittest.TestCase):
+    """Test cases for the instrumentation of the scoring hot path"""
+
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def test_stages_and_outcomes_are_recorded(self):
+        """Test a prediction records each stage, its latency and its outcome"""
+        with patch("ml.model.get_prediction_cache", return_value=None):
+            result = predict_fake_news("The senate passed the budget bill on Tuesday.")
+        self.assertNotIn("error", result)
+
+        for stage in ("preprocess", "vectorize", "inference"):
+            self.assertEqual(metrics.stage_seconds.count(stage), 1)
+        self.assertEqual(metrics.prediction_seconds.count("single"), 1)
+        self.assertEqual(metrics.predictions.value("scored"), 1)
+        self.assertEqual(metrics.input_chars.count(), 1)
+
+    def test_batch_counts_every_text(self):
+        """Test a batch records one latency and one outcome per text"""
+        with patch("ml.model.get_prediction_cache", return_value=None):
+            predict_batch(["first article text", "second article text", 42])
+
+        self.assertEqual(metrics.prediction_seconds.count("batch"), 1)
+        self.assertEqual(metrics.predictions.value("scored"), 3)
+        self.assertEqual(metrics.stage_seconds.count("inference"), 1)
+
+    def test_disabled_metrics_record_nothing(self):
+        """Test ML_METRICS=0 turns the instrumentation off"""
+        with patch("ml.metrics.METRICS_ENABLED", False), patch(
+            "ml.model.get_prediction_cache", return_value=None
+        ):
+            predict_fake_news("The senate passed the budget bill on Tuesday.")
+
+        self.assertEqual(metrics.stage_seconds.count("inference"), 0)
+        self.assertEqual(metrics.predictions.value("scored"), 0)
+
+
+class TestMetricsView(TestCase):
+    """Test cases for the /metrics endpoint"""
+
+    def test_metrics_endpoint(self):
+        """Test /metrics serves the stage histograms and cache statistics"""
+        predict_fake_news("Scientists confirm the findings in a peer-reviewed study.")
+        response = self.client.get(reverse("detector:metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn('fakenews_stage_duration_seconds_bucket{stage="inference"', body)
+        self.assertIn('fakenews_cache_hits_total{cache="lemma"}', body)
+        self.assertIn("fakenews_coalesced_batches_total", body)
+
+    def test_metrics_can_be_disabled(self):
+        """Test /metrics answers 404 when ML_METRICS=0"""
+        with patch("ml.metrics.METRICS_ENABLED", False):
+            response = self.client.get(reverse("detector:metrics"))
+        self.assertEqual(response.status_code, 404)
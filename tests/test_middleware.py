@@ -0,0 +1,67 @@
+import pstats
+import tempfile
+from pathlib import Path
+
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.urls import reverse
+
+from detector.middleware import server_timing_header
+
+
+class TestServerTiming(TestCase):
+    """Test cases for the Server-Timing middleware"""
+
+    def test_header_format(self):
+        """Test stages are reported in milliseconds, in pipeline order"""
+        header = server_timing_header({"inference": 0.0005, "preprocess": 0.002}, 0.01)
+        self.assertEqual(header, "preprocess;dur=2.00, inference;dur=0.50, total;dur=10.00")
+
+    def test_home_reports_each_stage(self):
+        """Test an analysis reports the scoring stages and template rendering"""
+        response = Client().post(
+            reverse("detector:home"),
+            {"news_text": "The central bank kept interest rates unchanged on Thursday."},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        names = [metric.split(";")[0] for metric in response["Server-Timing"].split(", ")]
+        self.assertEqual(names, ["preprocess", "vectorize", "inference", "explain", "template", "total"])
+
+    async def test_async_view_gets_header(self):
+        """Test async views are timed without being run through a thread"""
+        response = await AsyncClient().post(
+            reverse("detector:predict"),
+            data={"text": "Officials confirmed the report on Monday."},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_can_be_disabled(self):
+        """Test SERVER_TIMING=0 removes the header"""
+        response = Client().get(reverse("detector:about"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class TestSamplingProfiler(TestCase):
+    """Test cases for the opt-in sampling profiler"""
+
+    def test_sampled_request_writes_profile(self):
+        """Test a sampled request leaves a readable cProfile dump"""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(PROFILE_SAMPLE_RATE=1.0, PROFILE_DIR=directory):
+                response = Client().get(reverse("detector:about"))
+            self.assertEqual(response.status_code, 200)
+
+            profiles = list(Path(directory).glob("*.prof"))
+            self.assertEqual(len(profiles), 1)
+            self.assertIn("-GET-about-", profiles[0].name)
+            self.assertGreater(pstats.Stats(str(profiles[0])).total_calls, 0)
+
+    def test_disabled_by_default(self):
+        """Test nothing is written with PROFILE_SAMPLE_RATE=0"""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(PROFILE_SAMPLE_RATE=0, PROFILE_DIR=directory):
+                Client().get(reverse("detector:about"))
+            self.assertEqual(list(Path(directory).iterdir()), [])
@@ -1,6 +1,12 @@
+import subprocess
+import sys
+import threading
 import unittest
-from ml.model import load_models, predict_fake_news, preprocess_text
 from pathlib import Path
+from unittest.mock import patch
+
+import ml.model
+from ml.model import load_models, predict_batch, predict_fake_news, preprocess_text
 
 
 class TestMLModel(unittest.TestCase):
@@ -81,6 +87,24 @@ class TestMLModel(unittest.TestCase):
         self.assertGreaterEqual(result["probability"], 0.0)
         self.assertLessEqual(result["probability"], 1.0)
 
+    def test_predict_batch_matches_single(self):
+        """Test batch prediction returns the same results as single predictions"""
+        texts = [
+            "The Senate voted on Tuesday to approve the spending bill.",
+            "BREAKING: chocolate cures all diseases, doctors hate this trick!",
+            "",
+        ]
+
+        results = predict_batch(texts)
+        self.assertEqual(len(results), len(texts))
+
+        for text, result in zip(texts, results):
+            single = predict_fake_news(text)
+            self.assertEqual(result["label"], single["label"])
+            self.assertAlmostEqual(result["probability"], single["probability"])
+
+        self.assertEqual(predict_batch([]), [])
+
     def test_model_files_exist(self):
         """Test that model files exist"""
         base_dir = Path(__file__).resolve().parent.parent
@@ -91,5 +115,89 @@ class TestMLModel(unittest.TestCase):
         self.assertTrue(vectorizer_path.exists(), f"Vectorizer file should exist at {vectorizer_path}")
 
 
+class TestLazyLoading(unittest.TestCase):
+    """Test cases for lazy, thread-safe model loading"""
+
+    def test_import_does_not_load_models(self):
+        """Test importing ml.model leaves the artifacts unloaded"""
+        code = "import ml.model as m; print(m.models_loaded(), m._load_attempted)"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "False False")
+
+    def test_import_does_not_load_sklearn(self):
+        """Test importing ml.model leaves sklearn unimported until a pickle or hasher needs it"""
+        code = "import sys, ml.model; print('sklearn' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "False")
+
+    def test_concurrent_first_use_loads_once(self):
+        """Test concurrent callers trigger a single load"""
+        calls = []
+
+        def fake_load():
+            calls.append(1)
+            ml.model._load_attempted = True
+            return False
+
+        with patch.object(ml.model, "model", None), patch.object(
+            ml.model, "_load_attempted", False
+        ), patch.object(ml.model, "load_models", side_effect=fake_load):
+            threads = [
+                threading.Thread(target=ml.model.ensure_models_loaded) for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+
+
+class TestExecutionBackend(unittest.TestCase):
+    """Test cases for the inline / thread / process scoring backends"""
+
+    texts = [
+        "The Senate voted on Tuesday to approve the spending bill.",
+        "BREAKING: chocolate cures all diseases, doctors hate this trick!",
+    ] * 10
+
+    def score_with(self, backend):
+        with patch.object(ml.model, "EXECUTION_BACKEND", backend), patch.object(
+            ml.model, "EXECUTION_WORKERS", 2
+        ), patch.object(ml.model, "get_prediction_cache", return_value=None):
+            try:
+                return predict_batch(self.texts), predict_fake_news(self.texts[0])
+            finally:
+                ml.model.shutdown_executor()
+
+    def test_backends_agree(self):
+        """Test thread and process backends return the inline results"""
+        inline_batch, inline_single = self.score_with("inline")
+
+        for backend in ("thread", "process"):
+            batch, single = self.score_with(backend)
+            self.assertEqual([r["label"] for r in batch], [r["label"] for r in inline_batch])
+            for result, expected in zip(batch, inline_batch):
+                self.assertAlmostEqual(result["probability"], expected["probability"])
+            self.assertEqual(single, inline_single)
+
+    def test_unknown_backend_scores_inline(self):
+        """Test a misconfigured backend falls back to inline scoring"""
+        batch, _ = self.score_with("gpu")
+        self.assertNotIn("error", batch[0])
+
+
 if __name__ == "__main__":
     unittest.main()
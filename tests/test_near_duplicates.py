@@ -0,0 +1,171 @@
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+import ml.model
+from ml.model import BASE_DIR, predict_batch, predict_fake_news, preprocess_text
+from ml.near_duplicates import NearDuplicateIndex
+
+ARTICLE = (BASE_DIR / "examples" / "fake_news.txt").read_text(encoding="utf-8")
+VERDICT = {"label": "Fake", "probability": 0.93, "model_version": "v1"}
+
+
+def light_edit(text, seed=0):
+    """Swap the headline and replace one word in two hundred, like a republished copy"""
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(max(1, len(words) // 200)):
+        words[rng.randrange(len(words))] = "exclusive"
+    return "UPDATED: " + " ".join(words[3:])
+
+
+def tokens(text):
+    return preprocess_text(text).split()
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    """Test cases for the MinHash/LSH index"""
+
+    def setUp(self):
+        self.index = NearDuplicateIndex(threshold=0.8, max_entries=100)
+        self.signature = self.index.signature(tokens(ARTICLE))
+
+    def test_edited_copy_matches(self):
+        """Test a lightly edited copy returns the stored verdict"""
+        self.index.add(self.signature, "fp", VERDICT)
+        match = self.index.lookup(self.index.signature(tokens(light_edit(ARTICLE))), "fp")
+        self.assertIsNotNone(match)
+        verdict, similarity = match
+        self.assertEqual(verdict, VERDICT)
+        self.assertGreaterEqual(similarity, 0.8)
+        self.assertLess(similarity, 1.0)
+
+    def test_different_article_or_model_does_not_match(self):
+        """Test unrelated text and verdicts of another model are not returned"""
+        self.index.add(self.signature, "fp", VERDICT)
+        other = "The city council approved the new budget for schools and roads on Monday evening."
+        self.assertIsNone(self.index.lookup(self.index.signature(tokens(other)), "fp"))
+        self.assertIsNone(self.index.lookup(self.signature, "other-model"))
+        self.assertEqual(self.index.stats()["misses"], 2)
+
+    def test_short_text_has_no_signature(self):
+        """Test texts shorter than one shingle are never indexed"""
+        self.assertIsNone(self.index.signature(["breaking", "news"]))
+        self.assertIsNone(self.index.lookup(None, "fp"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test the index never holds more than max_entries"""
+        index = NearDuplicateIndex(max_entries=3)
+        signatures = [index.signature(f"story {i} about topic {i} number {i}".split()) for i in range(5)]
+        for i in range(3):
+            index.add(signatures[i], "fp", {**VERDICT, "model_version": str(i)})
+        index.lookup(signatures[0], "fp")  # 0 devient le plus récent
+        index.add(signatures[3], "fp", VERDICT)
+        index.add(signatures[4], "fp", VERDICT)
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.stats()["evictions"], 2)
+        self.assertIsNotNone(index.lookup(signatures[0], "fp"))
+        self.assertIsNone(index.lookup(signatures[1], "fp"))
+        self.assertIsNone(index.lookup(signatures[2], "fp"))
+
+    def test_save_and_load(self):
+        """Test the persisted index answers the same lookups after a restart"""
+        self.index.add(self.signature, "fp", VERDICT)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.npz"
+            self.index.save(path)
+            self.assertEqual(list(Path(tmp).iterdir()), [path])
+
+            restored = NearDuplicateIndex(threshold=0.8)
+            self.assertEqual(restored.load(path), 1)
+            verdict, similarity = restored.lookup(self.signature, "fp")
+            self.assertEqual(verdict, VERDICT)
+            self.assertEqual(similarity, 1.0)
+
+            # D'autres paramètres MinHash rendent les signatures incomparables
+            self.assertEqual(NearDuplicateIndex(num_perm=32, bands=8).load(path), 0)
+
+    def test_signature_is_stable(self):
+        """Test signatures do not depend on the process (hash randomization)"""
+        other = NearDuplicateIndex()
+        np.testing.assert_array_equal(other.signature(tokens(ARTICLE)), self.signature)
+
+
+class TestNearDuplicatePredictions(unittest.TestCase):
+    """Test cases for near-duplicate answers in predict_fake_news"""
+
+    def setUp(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        patchers = [
+            patch.object(ml.model, "NEAR_DUPLICATES", True),
+            patch.object(ml.model, "_near_duplicates", index),
+            patch.object(ml.model, "_near_duplicates_pid", os.getpid()),
+            # Sans cache exact : chaque appel passe par le scoring
+            patch.object(ml.model, "get_prediction_cache", return_value=None),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.index = index
+
+    def test_edited_copy_reuses_verdict(self):
+        """Test an edited copy is answered from the index and flagged"""
+        original = predict_fake_news(ARTICLE)
+        self.assertNotIn("near_duplicate", original)
+        self.assertEqual(len(self.index), 1)
+
+        copy = predict_fake_news(light_edit(ARTICLE))
+        self.assertIn("near_duplicate", copy)
+        self.assertGreaterEqual(copy["near_duplicate"]["similarity"], 0.8)
+        self.assertEqual(copy["label"], original["label"])
+        self.assertEqual(copy["probability"], original["probability"])
+        self.assertEqual(copy["model_version"], original["model_version"])
+
+    def test_batch_reuses_verdict(self):
+        """Test predict_batch answers near-duplicates and scores the rest"""
+        predict_fake_news(ARTICLE)
+        results = predict_batch([light_edit(ARTICLE, seed=1), "Short unrelated text about the weather today."])
+        self.assertIn("near_duplicate", results[0])
+        self.assertNotIn("near_duplicate", results[1])
+        self.assertIn(results[1]["label"], ("Fake", "Real"))
+
+    def test_index_belongs_to_the_process_that_built_it(self):
+        """Test a forked worker builds its own index and only the builder saves it"""
+        signature = self.index.signature(tokens(ARTICLE))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.npz"
+            with patch.object(ml.model, "NEAR_DUPLICATE_PATH", path):
+                self.index.add(signature, "fp", VERDICT)
+                # Après un fork, os.getpid() change : le parent ne sauvegarde plus
+                with patch.object(ml.model.os, "getpid", return_value=os.getpid() + 1):
+                    ml.model.save_near_duplicate_index()
+                    self.assertFalse(path.exists())
+
+                    child = ml.model.get_near_duplicate_index()
+                    self.assertIsNot(child, self.index)
+                    child.add(signature, "fp", VERDICT)
+                    child.add(self.index.signature(tokens(light_edit(ARTICLE))), "fp", VERDICT)
+                    ml.model.save_near_duplicate_index()
+                self.assertEqual(NearDuplicateIndex().load(path), 2)
+
+    def test_warm_up_does_not_build_the_index(self):
+        """Test the preloading gunicorn master never owns an index"""
+        with patch.object(ml.model, "_near_duplicates", None):
+            ml.model.warm_up()
+            self.assertIsNone(ml.model._near_duplicates)
+
+    def test_disabled_by_default(self):
+        """Test the index is off unless ML_NEAR_DUPLICATES=1"""
+        with patch.object(ml.model, "NEAR_DUPLICATES", False):
+            self.assertIsNone(ml.model.get_near_duplicate_index())
+            self.assertEqual(ml.model.near_duplicate_info(), {"enabled": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import random
+import re
+import time
+import unittest
+
+from ml.normalizer import (
+    lemma_cache_stats,
+    make_lemma_cache,
+    normalize_text,
+    strip_tags,
+    tokenize,
+)
+
+
+def legacy_clean_text(text, stop_words):
+    """Reference implementation the normalizer must stay aligned with"""
+    text = re.sub(r"<.*?>", " ", text)
+    text = re.sub(r"http\S+|www\S+", " ", text)
+    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return " ".join(w for w in text.split() if w not in stop_words)
+
+
+class TestNormalizer(unittest.TestCase):
+    """Test cases for the shared text normalizer"""
+
+    def test_matches_legacy_pipeline(self):
+        """Test normalizer output is identical to the legacy re.sub chain"""
+        samples = [
+            "Plain TEXT with numbers 123 and symbols @#$!",
+            "<p>Some <b>bold</b> news</p> here",
+            "Read more at https://example.com/a?b=c or www.site.org/page now",
+            "abchttp://glued.example and HTTP://UPPER.example",
+            "http://x<b>tail</b> www <i>http</i> end",
+            "unclosed < tag http://a<b and\nnext <line>",
+            "Café naïve Kelvin İstanbul nbsp sep",
+            "   ",
+            "",
+        ]
+        stop_words = {"and", "the", "or", "at"}
+
+        for text in samples:
+            with self.subTest(text=text):
+                self.assertEqual(
+                    normalize_text(text, stop_words), legacy_clean_text(text, stop_words)
+                )
+
+    def test_lemmatize_applied_after_stopwords(self):
+        """Test lemmatize callable is applied only to kept tokens"""
+        seen = []
+
+        def lemmatize(word):
+            seen.append(word)
+            return word.rstrip("s")
+
+        result = normalize_text("The cats and dogs", {"the", "and"}, lemmatize)
+        self.assertEqual(result, "cat dog")
+        self.assertEqual(seen, ["cats", "dogs"])
+
+    def test_non_string_input(self):
+        """Test non-string input yields an empty string"""
+        self.assertEqual(normalize_text(None), "")
+        self.assertEqual(normalize_text(42), "")
+
+    def test_strip_tags_matches_regex(self):
+        """Test the linear tag scan equals re.sub(r"<.*?>", " ", text)"""
+        rng = random.Random(0)
+        for _ in range(5000):
+            text = "".join(rng.choice("<<>>\n ab") for _ in range(rng.randint(0, 40)))
+            self.assertEqual(strip_tags(text), re.sub(r"<.*?>", " ", text), repr(text))
+
+    def test_strip_tags_is_linear_on_hostile_input(self):
+        """Test runs of unclosed "<" no longer take quadratic time"""
+        start = time.perf_counter()
+        strip_tags("<" * 200_000)
+        strip_tags("<\n" * 100_000 + ">")
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_tokenize(self):
+        """Test tokenize lowercases and drops tags and URLs"""
+        self.assertEqual(tokenize("<b>Hello</b> World http://x.y"), ["hello", "world"])
+
+    def test_lemma_cache_counts_and_evicts(self):
+        """Test lemma cache reuses results and stays within its size limit"""
+        calls = []
+
+        def lemmatize(word):
+            calls.append(word)
+            return word.rstrip("s")
+
+        cached = make_lemma_cache(lemmatize, maxsize=2)
+        self.assertEqual(normalize_text("cats cats dogs cats", lemmatize=cached), "cat cat dog cat")
+        self.assertEqual(calls, ["cats", "dogs"])
+
+        normalize_text("birds", lemmatize=cached)
+        stats = lemma_cache_stats(cached)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["maxsize"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from detector.models import PredictionLog
+from detector.prediction_log import PredictionLogWriter, log_predictions
+
+
+def make_record(i=0):
+    return {
+        "created_at": timezone.now(),
+        "source": "api",
+        "label": "Fake",
+        "probability": 0.9,
+        "model_version": "v1",
+        "text_hash": f"{i:032x}",
+        "text_preview": f"article {i}",
+        "input_chars": 100,
+        "truncated": False,
+    }
+
+
+class TestPredictionLogWriter(TestCase):
+    """Test cases for the buffered prediction log writer"""
+
+    def setUp(self):
+        # Pas de flush périodique : les tests écrivent depuis leur propre thread
+        self.writer = PredictionLogWriter(batch_size=1000, flush_interval=3600)
+        self.addCleanup(self.writer.close)
+
+    def test_records_are_buffered_until_flush(self):
+        """Test adding records never touches the database"""
+        self.writer.add([make_record(i) for i in range(10)])
+        self.assertEqual(PredictionLog.objects.count(), 0)
+        self.assertEqual(self.writer.stats()["pending"], 10)
+
+        self.writer.flush()
+        self.assertEqual(PredictionLog.objects.count(), 10)
+        self.assertEqual(self.writer.stats()["written"], 10)
+        self.assertEqual(self.writer.stats()["pending"], 0)
+
+    def test_buffer_is_bounded(self):
+        """Test records beyond max_pending are dropped, not queued"""
+        writer = PredictionLogWriter(batch_size=1000, flush_interval=3600, max_pending=3)
+        self.addCleanup(writer.close)
+        writer.add([make_record(1), make_record(2)])
+        writer.add([make_record(3), make_record(4)])
+        self.assertEqual(writer.stats()["pending"], 2)
+        self.assertEqual(writer.stats()["dropped"], 2)
+
+    @override_settings(PREDICTION_LOG=True)
+    def test_views_log_predictions(self):
+        """Test the web form and the batch API queue one record per scored text"""
+        text = "The central bank kept interest rates unchanged on Thursday."
+        with patch("detector.prediction_log.get_writer", return_value=self.writer):
+            self.client.post(reverse("detector:home"), {"news_text": text})
+            self.client.post(
+                reverse("detector:predict_batch"),
+                data={"texts": ["First article text.", "Second article text."]},
+                content_type="application/json",
+            )
+        self.writer.flush()
+
+        web = PredictionLog.objects.get(source="web")
+        self.assertEqual(web.text_preview, text)
+        self.assertEqual(web.input_chars, len(text))
+        self.assertIn(web.label, ("Fake", "Real"))
+        self.assertTrue(web.model_version)
+        self.assertEqual(PredictionLog.objects.filter(source="batch").count(), 2)
+
+    @override_settings(PREDICTION_LOG=False)
+    def test_disabled(self):
+        """Test PREDICTION_LOG=0 logs nothing"""
+        with patch("detector.prediction_log.get_writer") as get_writer:
+            log_predictions(["text"], [{"label": "Real", "probability": 0.8}], "web")
+        get_writer.assert_not_called()
+
+
+class TestBackgroundFlush(TransactionTestCase):
+    """Test cases for the writer thread"""
+
+    def test_flush_on_batch_size(self):
+        """Test a full batch is written by the background thread"""
+        writer = PredictionLogWriter(batch_size=5, flush_interval=3600)
+        self.addCleanup(writer.close)
+        writer.add([make_record(i) for i in range(5)])
+
+        deadline = time.monotonic() + 5
+        while writer.stats()["written"] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(PredictionLog.objects.count(), 5)
+        self.assertEqual(writer.stats()["flushes"], 1)
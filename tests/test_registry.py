@@ -0,0 +1,196 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import joblib
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import ml.model
+from ml import registry
+from ml.hashing import HashingTfidfVectorizer
+from ml.model import MODEL_PATH, VECTORIZER_PATH, predict_batch, reload_models
+
+MODELS_DIR = MODEL_PATH.parent
+
+
+class RegistryTestMixin:
+    """Point the registry at a temporary directory for the duration of a test"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        patcher = patch.object(registry, "REGISTRY_DIR", self.root)
+        patcher.start()
+        self.addCleanup(self._restore)
+        self.addCleanup(patcher.stop)
+
+    def _restore(self):
+        # Revenir aux artefacts de ml/models pour les autres tests
+        with patch.object(registry, "REGISTRY_DIR", self.root / "missing"):
+            reload_models(force=True)
+        self.tmp.cleanup()
+
+
+class TestRegistry(RegistryTestMixin, unittest.TestCase):
+    """Test cases for the versioned model registry"""
+
+    def test_publish_and_activate(self):
+        """Test versions are copied in full and the manifest tracks the active one"""
+        self.assertIsNone(registry.active_version())
+
+        registry.publish(MODELS_DIR, version="v1")
+        registry.publish(MODELS_DIR, version="v2", activate=False, notes="candidate")
+
+        manifest = json.loads((self.root / "manifest.json").read_text())
+        self.assertEqual(manifest["active"], "v1")
+        self.assertEqual(manifest["versions"]["v2"]["notes"], "candidate")
+        self.assertTrue((self.root / "v2" / "tfidf_vectorizer.pkl").exists())
+
+        registry.activate("v2")
+        version, paths = registry.active_artifacts()
+        self.assertEqual(version, "v2")
+        self.assertEqual(paths["model"], self.root / "v2" / "fake_news_model.pkl")
+
+        with self.assertRaises(registry.RegistryError):
+            registry.publish(MODELS_DIR, version="v2")
+        with self.assertRaises(registry.RegistryError):
+            registry.activate("v3")
+
+    def test_reload_swaps_version(self):
+        """Test a reload activates the new version, reported in each prediction"""
+        registry.publish(MODELS_DIR, version="v1")
+        self.assertTrue(reload_models())
+        self.assertEqual(ml.model.active_version, "v1")
+        self.assertFalse(reload_models(), "reloading the active version is a no-op")
+
+        registry.publish(MODELS_DIR, version="v2")
+        self.assertTrue(reload_models())
+        with patch.object(ml.model, "get_prediction_cache", return_value=None):
+            result = ml.model.predict_fake_news("Lawmakers approved the measure on Friday.")
+        self.assertEqual(result["model_version"], "v2")
+
+    def test_failed_reload_keeps_current_version(self):
+        """Test an incomplete version is rejected and the current one keeps serving"""
+        registry.publish(MODELS_DIR, version="v1")
+        reload_models()
+        registry.publish(MODELS_DIR, version="broken")
+        (self.root / "broken" / "tfidf_vectorizer.pkl").unlink()
+
+        self.assertFalse(reload_models())
+        self.assertEqual(ml.model.active_version, "v1")
+        self.assertNotIn("error", ml.model.predict_fake_news("Markets closed higher today."))
+
+    def test_mismatched_pair_keeps_current_version(self):
+        """Test a model/vectorizer pair that cannot predict together is rejected at warm-up"""
+        registry.publish(MODELS_DIR, version="v1")
+        reload_models()
+
+        source = self.root / "source"
+        source.mkdir()
+        shutil.copy2(MODEL_PATH, source / MODEL_PATH.name)
+        vectorizer = HashingTfidfVectorizer(n_features=2**18).fit(["markets closed higher"])
+        joblib.dump(vectorizer, source / VECTORIZER_PATH.name)
+        registry.publish(source, version="mismatched")
+
+        self.assertFalse(reload_models())
+        self.assertEqual(ml.model.active_version, "v1")
+        self.assertNotIn("error", ml.model.predict_fake_news("Markets closed higher today."))
+
+    def test_predictions_during_swaps(self):
+        """Test concurrent predictions never fail while versions are swapped"""
+        registry.publish(MODELS_DIR, version="a")
+        registry.publish(MODELS_DIR, version="b")
+        errors = []
+        stop = threading.Event()
+
+        def score():
+            while not stop.is_set():
+                for result in predict_batch([f"Officials said on day {i}." for i in range(8)]):
+                    if "error" in result:
+                        errors.append(result["error"])
+
+        threads = [threading.Thread(target=score) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        try:
+            for version in ("a", "b") * 3:
+                registry.activate(version)
+                self.assertTrue(reload_models())
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+
+    def test_publish_command(self):
+        """Test `manage.py publish_model` publishes, lists and switches versions"""
+        out = io.StringIO()
+        call_command("publish_model", "--source", str(MODELS_DIR), "--name", "v1", stdout=out)
+        call_command("publish_model", "--name", "v2", "--no-activate", stdout=out)
+        self.assertIn("Version v1 active", out.getvalue())
+        self.assertIn("Version v2 published", out.getvalue())
+
+        call_command("publish_model", "--activate", "v2", stdout=out)
+        listing = io.StringIO()
+        call_command("publish_model", "--list", stdout=listing)
+        self.assertIn("* v2", listing.getvalue())
+
+
+class TestReloadView(RegistryTestMixin, TestCase):
+    """Test cases for the admin-triggered reload and the reported version"""
+
+    def test_reload_requires_authorization(self):
+        """Test anonymous callers cannot trigger a reload"""
+        response = self.client.post(reverse("detector:reload_model"))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(MODEL_RELOAD_TOKEN="s3cret")
+    def test_reload_with_token(self):
+        """Test a reload with the bearer token activates the registry version"""
+        registry.publish(MODELS_DIR, version="v7")
+        response = self.client.post(
+            reverse("detector:reload_model"), HTTP_AUTHORIZATION="Bearer s3cret"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["reloaded"])
+
+        health = self.client.get(reverse("detector:health")).json()
+        self.assertEqual(health["model_version"]["active"], "v7")
+        self.assertEqual(health["model_version"]["source"], "registry")
+
+
+class TestRegistryWatcher(unittest.TestCase):
+    """Test cases for where the registry watcher runs"""
+
+    def test_preloaded_master_leaves_the_watcher_to_workers(self):
+        """Test AppConfig.ready does not start the watcher under gunicorn_conf.py"""
+        config = apps.get_app_config("detector")
+        with override_settings(ML_WARMUP="off", ML_REGISTRY_WATCHER="post_fork"), \
+                patch.object(ml.model, "start_registry_watcher") as start:
+            config.ready()
+        start.assert_not_called()
+
+        with override_settings(ML_WARMUP="off", ML_REGISTRY_WATCHER="ready"), \
+                patch.object(ml.model, "start_registry_watcher") as start:
+            config.ready()
+        start.assert_called_once_with()
+
+    def test_fork_during_reload_does_not_deadlock(self):
+        """Test a child forked while a reload holds the lock can still reload"""
+        with ml.model._reload_lock:
+            pid = os.fork()
+            if pid == 0:
+                acquired = ml.model._reload_lock.acquire(timeout=5)
+                os._exit(0 if acquired else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
@@ -0,0 +1,41 @@
+import unittest
+from unittest.mock import patch
+
+import ml.resources
+from ml.resources import load_lemmatizer, load_stop_words, read_lemma_table
+
+
+class TestResources(unittest.TestCase):
+    """Test cases for offline-first NLP resource resolution"""
+
+    def test_bundled_lemma_table(self):
+        """Test the bundled table reproduces WordNet noun lemmas"""
+        table = read_lemma_table()
+        self.assertEqual(table["dogs"], "dog")
+        self.assertEqual(table["churches"], "church")
+        self.assertEqual(table["children"], "child")
+        self.assertEqual(table["was"], "wa")  # same quirk as WordNetLemmatizer
+        self.assertNotIn("news", table)
+
+    def test_lemmatizer_leaves_unknown_words(self):
+        """Test words absent from the table are returned unchanged"""
+        with patch.object(ml.resources, "LEMMATIZER", "table"):
+            lemmatize = load_lemmatizer()
+        self.assertEqual(lemmatize("states"), "state")
+        self.assertEqual(lemmatize("trump"), "trump")
+
+    def test_no_download_unless_enabled(self):
+        """Test missing NLTK data falls back to bundled files without network"""
+        with patch.object(ml.resources, "NLTK_DOWNLOAD", False), patch.object(
+            ml.resources, "locate_nltk_resource", return_value=None
+        ), patch("nltk.download") as download:
+            stop_words = load_stop_words()
+
+        download.assert_not_called()
+        self.assertEqual(ml.resources.resource_sources["stop_words"], "bundled")
+        self.assertIn("the", stop_words)
+        self.assertEqual(len(stop_words), 179)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+
+class TestScoreFileCommand(unittest.TestCase):
+    """Test cases for `manage.py score_file`"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.tmp.name)
+        cls.articles = [
+            (EXAMPLES_DIR / name).read_text(encoding="utf-8")
+            for name in ("fake_news.txt", "real_news.txt")
+        ]
+
+        with open(cls.root / "input.jsonl", "w", encoding="utf-8") as f:
+            for i in range(25):
+                f.write(json.dumps({"id": f"doc{i}", "text": f"{cls.articles[i % 2]} {i}"}) + "\n")
+            f.write("\n{broken\n")
+
+        with open(cls.root / "input.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["title", "text"])
+            writer.writeheader()
+            for i in range(10):
+                writer.writerow({"title": f"Title {i}", "text": cls.articles[i % 2]})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def score(self, *args):
+        stderr = io.StringIO()
+        call_command("score_file", *args, "--progress-every", "0", stderr=stderr)
+        return stderr.getvalue()
+
+    def test_jsonl_in_order_with_processes(self):
+        """Test JSONL scoring keeps input order and ids across worker processes"""
+        output = self.root / "out.jsonl"
+        report = self.score(
+            str(self.root / "input.jsonl"),
+            "--output",
+            str(output),
+            "--id-field",
+            "id",
+            "--batch-size",
+            "4",
+            "--jobs",
+            "2",
+        )
+
+        rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(rows), 26)
+        self.assertEqual([r["id"] for r in rows[:25]], [f"doc{i}" for i in range(25)])
+        self.assertEqual({r["label"] for r in rows[:25]}, {"Fake", "Real"})
+        self.assertEqual(rows[25]["label"], "Erreur")
+        self.assertIn("invalid JSON", rows[25]["error"])
+        self.assertIn("docs/sec", report)
+
+    def test_csv_to_csv_in_process(self):
+        """Test CSV input with joined text fields and CSV output"""
+        output = self.root / "out.csv"
+        self.score(
+            str(self.root / "input.csv"),
+            "--output",
+            str(output),
+            "--text-field",
+            "title",
+            "--text-field",
+            "text",
+            "--jobs",
+            "1",
+        )
+
+        with open(output, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["id"] for r in rows], [str(i) for i in range(1, 11)])
+        self.assertTrue(all(r["label"] in ("Fake", "Real") for r in rows))
+
+    def test_stdout_output_is_clean_jsonl(self):
+        """Test results written to stdout contain only JSON lines"""
+        stdout = io.StringIO()
+        call_command(
+            "score_file",
+            str(self.root / "input.jsonl"),
+            "--jobs",
+            "1",
+            stdout=stdout,
+            stderr=io.StringIO(),
+        )
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 26)
+        for line in lines:
+            json.loads(line)
+
+    def test_missing_file(self):
+        """Test a missing input file raises CommandError"""
+        with self.assertRaises(CommandError):
+            self.score(str(self.root / "missing.jsonl"))
+
+
+if __name__ == "__main__":
+    unittest.main()
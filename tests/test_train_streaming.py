@@ -0,0 +1,108 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ml import train
+from ml.engine import LinearEnsemble
+from ml.flat_model import load_flat, verify_flat
+
+
+def write_corpus(path, n, marker, seed, length=60):
+    """Synthetic news CSV (title, text) whose texts contain a class marker"""
+    rng = random.Random(seed)
+    words = "president said election government report people state official market vote".split()
+    rows = [
+        {
+            "title": " ".join(rng.choices(words, k=5)),
+            "text": " ".join(rng.choices(words + [marker] * 3, k=length)),
+        }
+        for _ in range(n)
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+class TestStreamingTraining(unittest.TestCase):
+    """Test cases for the out-of-core training mode"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        write_corpus(root / "True.csv", 300, "reuters", seed=1)
+        write_corpus(root / "Fake.csv", 250, "shocking", seed=2)
+
+        paths = {
+            "TRUE_FILE": root / "True.csv",
+            "FAKE_FILE": root / "Fake.csv",
+            "MODELS_DIR": root / "models",
+            "MODEL_PATH": root / "models" / "model.pkl",
+            "VECTORIZER_PATH": root / "models" / "vectorizer.pkl",
+            "FLAT_MODEL_PATH": root / "models" / "model.flat",
+        }
+        for name, value in paths.items():
+            patcher = mock.patch.object(train, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunks_cover_both_files(self):
+        """Test chunked reading yields every row once with both classes mixed in"""
+        chunks = list(train.iter_source_chunks(chunksize=100))
+        labels = pd.concat(chunks)["label"]
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(labels), 550)
+        self.assertEqual(int(labels.sum()), 250)
+        self.assertTrue(all(c["label"].nunique() == 2 for c in chunks))
+
+    def test_chunks_stay_mixed_with_uneven_row_sizes(self):
+        """Test the file with longer articles does not run alone at the end of the stream"""
+        write_corpus(train.FAKE_FILE, 250, "shocking", seed=2, length=600)
+        chunks = list(train.iter_source_chunks(chunksize=100))
+
+        self.assertEqual(len(pd.concat(chunks)), 550)
+        self.assertTrue(all(c["label"].nunique() == 2 for c in chunks))
+
+    def test_one_preprocessing_pool_for_the_stream(self):
+        """Test --jobs starts a single process pool, not one per chunk"""
+        pools = mock.Mock(wraps=train.ProcessPoolExecutor)
+        with mock.patch.object(train, "ProcessPoolExecutor", pools):
+            train.main_streaming(jobs=2, chunksize=100, epochs=1, hash_bits=12, held_out=0.3)
+        self.assertEqual(pools.call_count, 1)
+
+    def test_split_is_deterministic(self):
+        """Test held-out assignment depends only on the text"""
+        texts = [f"article {i}" for i in range(2000)]
+        codes = train.split_codes(texts, held_out=0.2)
+
+        np.testing.assert_array_equal(codes, train.split_codes(texts, held_out=0.2))
+        self.assertAlmostEqual(float(np.mean(codes != train.TRAIN)), 0.2, delta=0.05)
+
+    def test_streaming_artifacts_are_loadable(self):
+        """Test streamed training writes artifacts the application can score with"""
+        train.main_streaming(chunksize=100, epochs=2, hash_bits=12, held_out=0.3)
+
+        model = joblib.load(train.MODEL_PATH)
+        vectorizer = joblib.load(train.VECTORIZER_PATH)
+        self.assertIsInstance(LinearEnsemble.from_calibrated(model), LinearEnsemble)
+
+        documents = [
+            train.clean_text("shocking shocking report said president shocking"),
+            train.clean_text("reuters reuters report said president reuters"),
+        ]
+        probabilities = model.predict_proba(vectorizer.transform(documents))
+        self.assertEqual(list(model.classes_[probabilities.argmax(axis=1)]), [1, 0])
+
+        flat_model, flat_vectorizer, _ = load_flat(train.FLAT_MODEL_PATH)
+        self.assertLess(verify_flat(model, vectorizer, flat_model, flat_vectorizer, documents), 1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
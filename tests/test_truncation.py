@@ -0,0 +1,96 @@
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import ml.model
+from ml.model import predict_batch, predict_fake_news
+from ml.truncation import MAX_ANALYZED_CHARS, truncate_text
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+
+class TestTruncation(unittest.TestCase):
+    """Test cases for the input-length guardrail"""
+
+    def test_short_text_is_untouched(self):
+        """Test texts under the limit are analyzed in full"""
+        text, report = truncate_text("short article", max_chars=100)
+        self.assertEqual(text, "short article")
+        self.assertEqual(
+            report, {"truncated": False, "original_chars": 13, "analyzed_chars": 13}
+        )
+
+    def test_head_and_tail_windows(self):
+        """Test long texts keep a head and a tail window cut on whitespace"""
+        words = [f"word{i}" for i in range(5000)]
+        text, report = truncate_text(" ".join(words), max_chars=1000, head_ratio=0.75)
+
+        self.assertTrue(report["truncated"])
+        self.assertEqual(report["strategy"], "head+tail")
+        self.assertLessEqual(report["analyzed_chars"], 1000)
+        self.assertEqual(report["head_chars"] + report["tail_chars"], report["analyzed_chars"])
+        self.assertGreater(report["head_chars"], report["tail_chars"])
+
+        kept = text.split()
+        self.assertEqual(kept[0], "word0")
+        self.assertEqual(kept[-1], "word4999")
+        self.assertTrue(set(kept) <= set(words), "a word was split at a window edge")
+
+    def test_unbroken_text_is_still_bounded(self):
+        """Test a text without whitespace is cut at the exact budget"""
+        _, report = truncate_text("x" * 10_000, max_chars=1000)
+        self.assertEqual(report["analyzed_chars"], 1000)
+
+
+class TestScoringUpperBound(unittest.TestCase):
+    """Test that scoring cost is bounded whatever the input size"""
+
+    @classmethod
+    def setUpClass(cls):
+        ml.model.ensure_models_loaded()
+        article = (EXAMPLES_DIR / "fake_news.txt").read_text(encoding="utf-8")
+        cls.huge = ((article + "\n<p>") * (10_000_000 // len(article) + 1))[:10_000_000]
+
+    def test_preprocessing_never_sees_more_than_the_limit(self):
+        """Test at most ML_MAX_ANALYZED_CHARS reach the regex pipeline"""
+        seen = []
+        original = ml.model.preprocess_text
+
+        def spy(text):
+            seen.append(len(text))
+            return original(text)
+
+        with patch.object(ml.model, "preprocess_text", side_effect=spy), patch.object(
+            ml.model, "get_prediction_cache", return_value=None
+        ):
+            result = predict_fake_news(self.huge)
+            batch = predict_batch([self.huge, "short"])
+
+        # +1: the newline joining the head and tail windows
+        self.assertTrue(seen)
+        self.assertTrue(all(n <= MAX_ANALYZED_CHARS + 1 for n in seen))
+        self.assertTrue(result["analyzed"]["truncated"])
+        self.assertEqual(result["analyzed"]["original_chars"], 10_000_000)
+        self.assertLessEqual(result["analyzed"]["analyzed_chars"], MAX_ANALYZED_CHARS)
+        self.assertFalse(batch[1]["analyzed"]["truncated"])
+
+    def test_latency_does_not_grow_with_input(self):
+        """Test a 10 MB page and a hostile page score about as fast as the limit itself"""
+        hostile = "<" * 10_000_000
+
+        def elapsed(text):
+            start = time.perf_counter()
+            predict_fake_news(text)
+            return time.perf_counter() - start
+
+        with patch.object(ml.model, "get_prediction_cache", return_value=None):
+            at_limit = elapsed(self.huge[:MAX_ANALYZED_CHARS])
+            worst = max(elapsed(self.huge), elapsed(hostile))
+
+        # Generous bound: slicing 10 MB is cheap next to scoring the window
+        self.assertLess(worst, max(1.0, 5 * at_limit))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import json
-from django.test import TestCase, Client
+from asgiref.testing import ApplicationCommunicator
+from django.test import SimpleTestCase, TestCase, Client
 from django.urls import reverse
 from unittest.mock import patch
 
@@ -45,7 +46,7 @@ class TestViews(TestCase):
         self.assertEqual(response.context['submitted_text'], test_text)
 
         # Verify prediction was called
-        mock_predict.assert_called_once_with(test_text)
+        mock_predict.assert_called_once_with(test_text, explain=True)
 
     def test_home_view_post_empty(self):
         """Test home view with empty POST data"""
@@ -104,6 +105,12 @@ class TestViews(TestCase):
         self.assertIn(data['model'], ['loaded', 'not loaded'])
         self.assertIn(data['vectorizer'], ['loaded', 'not loaded'])
 
+        # Lemma cache counters are reported
+        self.assertIn('lemma_cache', data)
+        self.assertIn('hits', data['lemma_cache'])
+        self.assertIn('misses', data['lemma_cache'])
+        self.assertIn('prediction_cache', data)
+
     def test_health_view_direct_url(self):
         """Test health endpoint with direct URL"""
         response = self.client.get('/health/')
@@ -112,6 +119,142 @@ class TestViews(TestCase):
         data = json.loads(response.content)
         self.assertEqual(data['status'], 'OK')
 
+    @patch('detector.views.predict_batch')
+    def test_predict_batch_api(self, mock_predict_batch):
+        """Test batch prediction API returns one result per text"""
+        mock_predict_batch.return_value = [
+            {"label": "Real", "probability": 0.9, "processed_text": "first"},
+            {"label": "Fake", "probability": 0.8, "processed_text": "second"},
+        ]
+
+        response = self.client.post(
+            reverse('detector:predict_batch'),
+            data=json.dumps({"texts": ["first text", "second text"]}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([r['label'] for r in data['results']], ['Real', 'Fake'])
+        self.assertNotIn('processed_text', data['results'][0])
+        mock_predict_batch.assert_called_once_with(["first text", "second text"], explain=False)
+
+    def test_predict_batch_api_invalid_payload(self):
+        """Test batch prediction API rejects malformed input"""
+        url = reverse('detector:predict_batch')
+
+        response = self.client.post(url, data="not json", content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url, data=json.dumps({"texts": "single"}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url, data=json.dumps({"texts": ["ok", 3]}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_batch_api_get_not_allowed(self):
+        """Test batch prediction API only accepts POST"""
+        response = self.client.get(reverse('detector:predict_batch'))
+        self.assertEqual(response.status_code, 405)
+
+    @patch('detector.views.predict_batch')
+    def test_predict_api(self, mock_predict_batch):
+        """Test async prediction API scores the text through the batcher"""
+        mock_predict_batch.return_value = [
+            {"label": "Fake", "probability": 0.7, "processed_text": "text"},
+        ]
+
+        response = self.client.post(
+            reverse('detector:predict'),
+            data=json.dumps({"text": "some text"}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)
+        self.assertEqual(data['label'], 'Fake')
+        self.assertNotIn('processed_text', data)
+        mock_predict_batch.assert_called_once_with(["some text"], explain=False)
+
+    def test_predict_api_invalid_payload(self):
+        """Test async prediction API rejects malformed input and GET"""
+        url = reverse('detector:predict')
+
+        response = self.client.post(url, data="not json", content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url, data=json.dumps({"text": ["a"]}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+
+class TestAsgiPredictEndpoint(SimpleTestCase):
+    """Test cases for the ASGI fast path of /api/predict"""
+
+    async def call(self, application, body, method="POST", host=b"testserver"):
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": reverse('detector:predict'),
+            "headers": [(b"content-type", b"application/json"), (b"host", host)],
+        }
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({"type": "http.request", "body": body})
+        start = await communicator.receive_output()
+        response_body = await communicator.receive_output()
+        return start["status"], json.loads(response_body["body"])
+
+    @patch('detector.views.predict_batch')
+    async def test_post_is_answered_before_django(self, mock_predict_batch):
+        """Test POST /api/predict is scored without reaching the Django application"""
+        from detector.asgi import with_prediction_endpoint
+
+        async def django_application(scope, receive, send):
+            raise AssertionError("request should not reach Django")
+
+        mock_predict_batch.return_value = [
+            {"label": "Real", "probability": 0.6, "processed_text": "x"},
+        ]
+        application = with_prediction_endpoint(django_application)
+
+        status, data = await self.call(application, json.dumps({"text": "hello"}).encode())
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {"label": "Real", "probability": 0.6})
+
+        status, data = await self.call(application, b"not json")
+        self.assertEqual(status, 400)
+
+    @patch('detector.views.predict_batch')
+    async def test_disallowed_host_is_rejected(self, mock_predict_batch):
+        """Test the fast path enforces ALLOWED_HOSTS like Django does"""
+        from detector.asgi import with_prediction_endpoint
+
+        async def django_application(scope, receive, send):
+            raise AssertionError("request should not reach Django")
+
+        mock_predict_batch.return_value = [
+            {"label": "Real", "probability": 0.6, "processed_text": "x"},
+        ]
+        application = with_prediction_endpoint(django_application)
+        body = json.dumps({"text": "hello"}).encode()
+
+        with self.settings(ALLOWED_HOSTS=["example.com"]):
+            status, data = await self.call(application, body, host=b"evil.test")
+            self.assertEqual(status, 400)
+            self.assertIn("error", data)
+            mock_predict_batch.assert_not_called()
+
+            status, _ = await self.call(application, body, host=b"example.com:8000")
+            self.assertEqual(status, 200)
+
 
 if __name__ == "__main__":
     import unittest